@@ -0,0 +1,56 @@
+import struct
+import numpy as np
+from core.disk_cache import DiskCache, cache_key, content_hash
+
+# Decoded audio at the session rate, keyed by the content of the source
+# file, so reopening a project maps the samples instead of decoding and
+# resampling them again. File: a 32-byte header, then interleaved float32
+# frames that np.memmap reads in place. Sources stay mapped, so a session
+# can be larger than RAM; the engine's SourcePrefetcher pages them in.
+
+FILE_MAGIC = b"PYDAWAU1"
+HEADER = struct.Struct("<8sIIQ8x") # magic, channels, sample rate, frames
+AUDIO_CACHE_LIMIT = 4 << 30
+
+audio_cache = DiskCache("audio", AUDIO_CACHE_LIMIT, ".f32")
+
+def audio_cache_key(file_path, target_sr):
+    return cache_key(content_hash(file_path), target_sr)
+
+def read_audio(file_path, target_sr):
+    # Read-only (frames, channels) memmap, None if not a valid entry
+    try:
+        with open(file_path, "rb") as f:
+            magic, channels, sample_rate, frames = HEADER.unpack(f.read(HEADER.size))
+        if magic != FILE_MAGIC or sample_rate != target_sr or channels == 0:
+            return None
+        if frames == 0:
+            return np.zeros((0, channels), dtype='float32')
+        return np.memmap(file_path, dtype='<f4', mode='r', offset=HEADER.size, shape=(frames, channels))
+    except (OSError, ValueError, struct.error):
+        return None # Truncated or unreadable
+
+def write_audio_stream(f, blocks, channels, sample_rate):
+    # Blocks straight from the decoder, the frame count is filled in last
+    f.write(HEADER.pack(FILE_MAGIC, channels, sample_rate, 0))
+    frames = 0
+    for block in blocks:
+        np.ascontiguousarray(block, dtype='<f4').tofile(f)
+        frames += len(block)
+    f.seek(0)
+    f.write(HEADER.pack(FILE_MAGIC, channels, sample_rate, frames))
+
+def _pinned(key, data):
+    # Entries stay while mapped, the engine server maps them again by name
+    if data is not None and len(data):
+        audio_cache.pin(key, data)
+    return data
+
+def cached_audio(key, target_sr):
+    path = audio_cache.get(key)
+    return _pinned(key, read_audio(path, target_sr)) if path else None
+
+def store_audio(key, blocks, channels, sample_rate):
+    # Decodes into the cache and maps the result, None if it could not be stored
+    path = audio_cache.put(key, lambda f: write_audio_stream(f, blocks, channels, sample_rate))
+    return _pinned(key, read_audio(path, sample_rate)) if path else None
@@ -1,10 +1,24 @@
-import sounddevice as sd
+import os
+import threading
+from collections import deque
+import time as _time
 import numpy as np
-from PySide6.QtCore import QObject
+from core.batch_mixer import BatchMixer, pan_gains
+from core.effects.base import SILENCE_THRESHOLD
+from core.tracing import tracer
+from core.prefetcher import SourcePrefetcher
 
-class AudioEngine(QObject):
+# Draft playback: trades quality for CPU when the callback cannot keep up
+DRAFT_ENTER_LOAD = 0.8 # Smoothed DSP load that switches "auto" into draft
+DRAFT_EXIT_LOAD = 0.3 # Load (while in draft) that switches back
+DRAFT_MIN_BLOCKS = 100 # Stay in a state at least this many blocks
+DRAFT_DECIMATION = 2 # Internal rate divider for expensive effects
+DRAFT_MAX_TAIL = 1.0 # Seconds, longer tails are cut short
+DRAFT_SILENCE_THRESHOLD = 1e-3 # About -60 dBFS
+
+# No Qt here: the engine also runs headless in the engine server process
+class AudioEngine:
     def __init__(self):
-        super().__init__()
 
         self.sample_rate = 44100
         self.channels = 2
@@ -21,76 +35,359 @@ class AudioEngine(QObject):
         self.is_playing = False
         self.stream = None
         self.is_looping = False
+        self.loop_region = None # (start, end) in seconds, None = auto
+        self.loop_start_sample = 0
         self.loop_end_sample = 0
+        self.blocksize = 2048
+        
+        # Clip audio right after the loop start, rendered ahead of the wrap
+        self.loop_head = {} # Map track object to (clip signature, buffer)
+        self.loop_head_frames = self.blocksize
+        
+        # Sub-mix of unchanged tracks over the loop region
+        from core.loop_cache import LoopRenderCache
+        self.loop_cache = LoopRenderCache()
+        
+        # Vectorized mixing of all tracks, the per-track loop is kept for reference
+        self.batch_mixer = BatchMixer(self)
+        self.batch_mixing = True
+        
+        # Tracks whose effect chain runs as a multi-core pipeline (live only).
+        # (pipelines by track, delay line for the other tracks, latency in samples),
+        # swapped as a whole so the callback never sees a half-built state.
+        self.pipeline_state = ({}, None, 0)
+        
+        # Output timestamps of the last rendered blocks, used to find the
+        # sample that is actually heard: (dac_time, start, frames, loop_start,
+        # loop_end, estimated)
+        self.block_times = [None] * 16
+        self.block_times_index = 0
+        self.playback_start_sample = 0
+        self.output_latency = 0.0 # Seconds, as reported by the stream
+        
+        # Silent input samples each effect chain has processed, None while asleep
+        self.fx_silence = {}
+        
+        # Callback time / block duration, smoothed
+        self.dsp_load = 0.0
+        self.rendered_frames = 0 # Audio time the effect timers are measured against
+        self.xruns = 0 # Callbacks the device reported an under/overflow for
+        
+        # Debug: real-time safety checker around the callback
+        self.rt_checker = None
+        if os.environ.get("PYDAW_RT_CHECK") == "1":
+            self.enable_rt_check()
+        
+        # Sampling profiler for the audio threads, found through this ident
+        self.callback_thread = None
+        self.profiler = None
+        if os.environ.get("PYDAW_PROFILE") == "1":
+            self.start_profiler()
+        
+        # Pages of memory-mapped sources ahead of the playhead, while playing
+        self.prefetcher = SourcePrefetcher(self)
+        
+        # Draft playback ("off", "auto", "on"), live playback only
+        self.draft_mode = "auto"
+        self.draft_active = False
+        self.draft_mono = True # Run track effects on a mono downmix
+        self.draft_blocks = 0 # Blocks since the last switch
         
         # Metering
         self.track_peaks = {} # Map track object to float 0.0-1.0
+        self.removed_tracks = deque() # Per-track state to drop at the next block start
+        self.last_chunk_end = -1 # End of the last live block, tells a loop wrap from a seek
+        self.full_pass = False # Current loop pass has played contiguously from the loop start
         self.master_peak = 0.0
         self.master_peak_L = 0.0
         self.master_peak_R = 0.0
 
     def add_track_data(self, track_obj):
         self.tracks.append(track_obj)
+        self.loop_cache.invalidate()
+        self.batch_mixer.invalidate()
+
+    def insert_track_data(self, index, track_obj):
+        self.tracks.insert(index, track_obj)
+        self.loop_cache.invalidate()
+        self.batch_mixer.invalidate()
 
     def remove_track(self, index):
         if 0 <= index < len(self.tracks):
-            del self.tracks[index]
+            self.forget_track(self.tracks.pop(index))
+            self.loop_cache.invalidate()
+            self.batch_mixer.invalidate()
+
+    def forget_track(self, track):
+        # Per-track state would keep the audio of a deleted track alive. A
+        # callback in the middle of a block still writes the track's meter
+        # and sleep state, so a running stream drops it at the next block.
+        self.removed_tracks.append(track)
+        if self.stream is None:
+            self._drop_removed_tracks()
+
+    def _drop_removed_tracks(self):
+        while self.removed_tracks:
+            track = self.removed_tracks.popleft()
+            self.track_peaks.pop(track, None)
+            self.fx_silence.pop(track, None)
+            self.loop_head.pop(track, None)
+            self.loop_cache.live_tracks.discard(track)
 
     def toggle_mute(self, index):
         if 0 <= index < len(self.tracks): 
             self.tracks[index].is_muted = not self.tracks[index].is_muted
+            self.loop_cache.mark_dirty(self.tracks[index])
+            self.batch_mixer.update_track(self.tracks[index])
 
     def toggle_solo(self, index):
         if 0 <= index < len(self.tracks): 
             self.tracks[index].is_soloed = not self.tracks[index].is_soloed
+            self.loop_cache.invalidate() # Solo changes what every track sounds like
+            self.batch_mixer.invalidate()
 
     def set_track_volume(self, index, volume):
         if 0 <= index < len(self.tracks):
             self.tracks[index].volume = max(0.0, min(1.0, volume))
+            self.loop_cache.mark_dirty(self.tracks[index])
+            self.batch_mixer.update_track(self.tracks[index])
 
     def set_track_pan(self, index, pan):
         if 0 <= index < len(self.tracks):
             self.tracks[index].pan = max(-1.0, min(1.0, pan))
+            self.loop_cache.mark_dirty(self.tracks[index])
+            self.batch_mixer.update_track(self.tracks[index])
+
+    def on_command_applied(self, command):
+        # Dirty tracking for the loop cache, fed by the undo stack
+        tracks = self._tracks_for_command(command)
+        if tracks is None:
+            self.loop_cache.invalidate()
+            self.batch_mixer.invalidate()
+        else:
+            for track in tracks:
+                self.loop_cache.mark_dirty(track)
+                self.batch_mixer.update_track(track)
+
+    def on_source_loaded(self, track):
+        # Decoded audio replaced the placeholder of a progressively loaded track
+        self.loop_cache.mark_dirty(track)
+        self.batch_mixer.update_track(track)
+        self.prepare_loop_head()
+
+    def _tracks_for_command(self, command):
+        if getattr(command, 'affects_all_tracks', False):
+            return None # Track list or solo changed
+
+        if hasattr(command, 'master_track'):
+            return [] # Master is applied after the cached sum
+
+        track = getattr(command, 'track', None)
+        if track is not None:
+            return [] if track is self.master_track else [track]
+
+        effect = getattr(command, 'effect', None)
+        if effect is not None:
+            if effect in self.master_track.effects: return []
+            return [t for t in self.tracks if effect in t.effects]
+
+        for attr in ('track_index', 'lane_index'):
+            index = getattr(command, attr, None)
+            if index is None: continue
+            if index == -1: return [] # Master FX bypass
+            if 0 <= index < len(self.tracks):
+                return [self.tracks[index]]
+
+        return None # Unknown scope (BPM, track list...)
 
     def set_bpm(self, bpm):
         self.bpm = max(20, min(999, bpm))
 
     def _kill_stream(self):
+        self.prefetcher.stop()
         if self.is_playing:
             self.is_playing = False
             if self.stream:
                 self.stream.stop()
                 self.stream.close()
                 self.stream = None
+            self.loop_cache.streaming = False
+            self.loop_cache.apply_pending()
+            self._drop_removed_tracks()
 
     def pause_playback(self):
+        # Resume from what was heard, not from what was rendered ahead
+        audible = self.get_audible_sample()
         self._kill_stream()
+        self.playhead = audible
 
     def stop_playback(self):
         self._kill_stream()
         self.playhead = 0
 
+    def enable_rt_check(self):
+        from core.rt_checker import RealtimeChecker
+        if self.rt_checker is None:
+            self.rt_checker = RealtimeChecker(self)
+            print("Real-time safety checker enabled")
+
+    def start_profiler(self):
+        from core.sampling_profiler import SamplingProfiler
+        if self.profiler is None:
+            self.profiler = SamplingProfiler(self)
+            self.profiler.start()
+            print("Audio thread profiler started")
+        return self.profiler
+
+    def stop_profiler(self):
+        # Returns the stopped profiler with its samples
+        profiler = self.profiler
+        if profiler is not None:
+            profiler.stop()
+            self.profiler = None
+        return profiler
+
+    def shutdown(self):
+        self._kill_stream()
+        if self.profiler is not None and os.environ.get("PYDAW_PROFILE") == "1":
+            file_path = os.environ.get("PYDAW_PROFILE_FILE", f"audio_profile_{os.getpid()}.folded")
+            samples = self.stop_profiler().write_folded(file_path)
+            print(f"Wrote {samples} profiler samples to {file_path}")
+        if self.rt_checker is not None:
+            print(self.rt_checker.report())
+            self.rt_checker.close()
+            self.rt_checker = None
+        for pipeline in self.pipeline_state[0].values():
+            pipeline.close()
+        self.pipeline_state = ({}, None, 0)
+
+    def tick(self):
+        # Periodic housekeeping from the GUI thread
+        self.prepare_loop_head()
+        self.update_pipelines()
+        self.prepare_effects()
+
+    def prepare_effects(self):
+        # Effect state is allocated here rather than in the callback. Draft
+        # playback may switch track effects to mono, so that layout too.
+        mono = self.draft_mode != "off" and self.draft_mono
+        for track in list(self.tracks):
+            for effect in list(track.effects):
+                effect.prepare(self.sample_rate, 2)
+                if mono:
+                    effect.prepare(self.sample_rate, 1)
+        for effect in list(self.master_track.effects):
+            effect.prepare(self.sample_rate, 2) # Master stays stereo in draft
+
+    def set_draft_mode(self, mode):
+        if mode not in ("off", "auto", "on"): return
+        self.draft_mode = mode
+        if mode != "auto":
+            self._set_draft_active(mode == "on")
+
+    def _set_draft_active(self, active):
+        if active == self.draft_active: return
+        self.draft_active = active
+        self.draft_blocks = 0
+        self.loop_cache.invalidate() # Cached audio was rendered at the other quality
+
+    def _update_draft(self, load):
+        self.dsp_load += (load - self.dsp_load) * 0.05
+        self.draft_blocks += 1
+        if self.draft_mode != "auto" or self.draft_blocks < DRAFT_MIN_BLOCKS:
+            return
+        if not self.draft_active and self.dsp_load > DRAFT_ENTER_LOAD:
+            self._set_draft_active(True)
+        elif self.draft_active and self.dsp_load < DRAFT_EXIT_LOAD:
+            self._set_draft_active(False)
+
+    def set_track_pipelined(self, index, enabled):
+        if 0 <= index < len(self.tracks):
+            self.tracks[index].pipelined = enabled
+            self.update_pipelines()
+
+    def update_pipelines(self, force=False):
+        pipelines = self.pipeline_state[0]
+        # A single effect gains nothing from a pipeline
+        wanted = [t for t in self.tracks if getattr(t, 'pipelined', False) and len(t.effects) > 1]
+        if not force and len(wanted) == len(pipelines) and \
+                all(t in pipelines and pipelines[t].matches(t) for t in wanted):
+            return
+
+        from core.effect_pipeline import EffectPipeline, DelayLine
+        latency = max((len(t.effects) * self.blocksize for t in wanted), default=0)
+        new_pipelines = {}
+        for track in wanted:
+            new_pipelines[track] = EffectPipeline(track, self.blocksize, self.sample_rate, latency)
+            self.loop_cache.mark_dirty(track) # Rendered live, never from the cache
+        delay_line = DelayLine(latency, self.blocksize * 4) if new_pipelines else None
+
+        self.pipeline_state = (new_pipelines, delay_line, latency)
+        for pipeline in pipelines.values():
+            pipeline.close()
+        if pipelines or new_pipelines:
+            print(f"Effect pipelines: {len(new_pipelines)} track(s), latency {latency} samples")
+
     def start_playback(self):
         if self.is_playing: return
+        import sounddevice as sd
         
         if self.is_looping:
             self.calculate_loop_end()
+            self.prepare_loop_head()
             
+        self.update_pipelines(force=True) # Start with empty pipelines
+        self.prepare_effects()
+        self.prefetcher.prefetch() # First window resident before the first callback
+        self.prefetcher.start()
+        self.block_times = [None] * len(self.block_times)
+        self.playback_start_sample = self.playhead
         self.is_playing = True
+        self.loop_cache.streaming = True
         self.stream = sd.OutputStream(
             samplerate=self.sample_rate, channels=2,
-            callback=self.audio_callback, blocksize=2048
+            callback=self.audio_callback, blocksize=self.blocksize
         )
+        self.output_latency = getattr(self.stream, 'latency', 0.0) or 0.0
         self.stream.start()
 
 
 
     def set_looping(self, enabled):
         self.is_looping = enabled
+        self.loop_cache.reset()
         if enabled:
             self.calculate_loop_end()
+        self.prepare_loop_head()
+
+    def set_loop_region(self, region):
+        # region: (start_sec, end_sec) or None to loop the whole arrangement
+        if region is not None:
+            start, end = region
+            if end <= start:
+                region = None
+            else:
+                region = (max(0.0, float(start)), float(end))
+
+        self.loop_region = region
+        self.loop_head = {}
+        self.loop_cache.reset()
+        self.calculate_loop_end()
+        self.prepare_loop_head()
+
+    def scale_loop_region(self, scale_factor):
+        if self.loop_region is not None:
+            start, end = self.loop_region
+            self.set_loop_region((start * scale_factor, end * scale_factor))
 
     def calculate_loop_end(self):
+        if self.loop_region is not None:
+            start, end = self.loop_region
+            self.loop_start_sample = int(start * self.sample_rate)
+            self.loop_end_sample = int(end * self.sample_rate)
+            return
+
+        self.loop_start_sample = 0
         max_end_time = 0.0
         for track in self.tracks:
             for clip in track.clips:
@@ -115,6 +412,28 @@ class AudioEngine(QObject):
         loop_end_time = next_free_bar * bar_duration
         self.loop_end_sample = int(loop_end_time * self.sample_rate)
 
+    def _clip_signature(self, track):
+        return tuple((id(c.data), c.start_time, c.start_offset, c.duration) for c in track.clips)
+
+    def prepare_loop_head(self):
+        # Called from the GUI thread. Only stale tracks are re-rendered.
+        if not self.is_looping or self.loop_end_sample <= self.loop_start_sample:
+            self.loop_head = {}
+            return
+
+        frames = min(self.loop_head_frames, self.loop_end_sample - self.loop_start_sample)
+        head = {}
+        for track in self.tracks:
+            signature = self._clip_signature(track)
+            cached = self.loop_head.get(track)
+            if cached is not None and cached[0] == signature and len(cached[1]) == frames:
+                head[track] = cached
+            else:
+                buffer = self._render_clips(track, self.loop_start_sample, frames, use_head=False)
+                head[track] = (signature, buffer)
+
+        self.loop_head = head
+
 
     # MIXING ENGINE 
     
@@ -125,72 +444,146 @@ class AudioEngine(QObject):
     def get_playhead_time(self):
         return self.playhead / self.sample_rate
 
-    def mix_chunk(self, start_sample, num_frames):
-        mix_buffer = np.zeros((num_frames, 2), dtype='float32')
+    def get_audible_sample(self):
+        if not self.is_playing or self.stream is None:
+            return self.playhead
         
-        any_solo = any(t.is_soloed for t in self.tracks)
+        try:
+            stream_now = self.stream.time
+        except Exception:
+            stream_now = None
+        perf_now = _time.perf_counter()
+        
+        # Latest block that has started playing on the device
+        current = None
+        for entry in self.block_times:
+            if entry is None: continue
+            now = perf_now if entry[5] else stream_now
+            if now is None or entry[0] > now: continue
+            if current is None or entry[0] > current[0]:
+                current = entry
+        
+        if current is None:
+            return self.playback_start_sample # Nothing heard yet
+        
+        dac_time, start, frames, loop_start, loop_end, estimated = current
+        now = perf_now if estimated else stream_now
+        offset = min(frames, max(0, int((now - dac_time) * self.sample_rate)))
+        position = start + offset - self.pipeline_state[2]
+        
+        if loop_end > loop_start:
+            if position >= loop_end:
+                position = loop_start + (position - loop_end) % (loop_end - loop_start)
+            elif position < loop_start:
+                position = loop_end - (loop_start - position) % (loop_end - loop_start)
+        else:
+            position = max(position, self.playback_start_sample)
+        return position
 
-        for track in self.tracks:
-            if any_solo:
-                if not track.is_soloed: continue
-            else:
-                if track.is_muted: continue
+    def get_audible_time(self):
+        return self.get_audible_sample() / self.sample_rate
 
-            # Sum Clips into Track Buffer
+    def _render_clips(self, track, start_sample, num_frames, use_head=True, out=None):
+        # Use the pre-rendered loop start if the clips did not change since
+        if use_head and start_sample == self.loop_start_sample:
+            head = self.loop_head.get(track)
+            if head is not None and len(head[1]) >= num_frames and head[0] == self._clip_signature(track):
+                if out is None:
+                    return head[1][:num_frames].copy()
+                out[:] = head[1][:num_frames]
+                return out
+
+        if out is None:
             track_buffer = np.zeros((num_frames, 2), dtype='float32')
+        else:
+            track_buffer = out
+            track_buffer.fill(0.0)
+        
+        for clip in track.clips:
+            clip_start_sample = int(clip.start_time * self.sample_rate)
+            clip_end_sample = clip_start_sample + int(clip.duration * self.sample_rate)
             
-            for clip in track.clips:
-                clip_start_sample = int(clip.start_time * self.sample_rate)
-                clip_end_sample = clip_start_sample + int(clip.duration * self.sample_rate)
-                
-                buffer_start = start_sample
-                buffer_end = start_sample + num_frames
+            buffer_start = start_sample
+            buffer_end = start_sample + num_frames
+            
+            start_overlap = max(clip_start_sample, buffer_start)
+            end_overlap = min(clip_end_sample, buffer_end)
+            
+            if start_overlap < end_overlap:
+                overlap_len = end_overlap - start_overlap
+                buffer_offset = start_overlap - buffer_start
                 
-                start_overlap = max(clip_start_sample, buffer_start)
-                end_overlap = min(clip_end_sample, buffer_end)
+                offset_in_visible_clip = start_overlap - clip_start_sample
+                offset_in_source_data = int(clip.start_offset * self.sample_rate) + offset_in_visible_clip
                 
-                if start_overlap < end_overlap:
-                    overlap_len = end_overlap - start_overlap
-                    buffer_offset = start_overlap - buffer_start
-                    
-                    offset_in_visible_clip = start_overlap - clip_start_sample
-                    offset_in_source_data = int(clip.start_offset * self.sample_rate) + offset_in_visible_clip
+                data = clip.data # Read once, progressive loading may swap it
+                source_len = len(data)
+                if offset_in_source_data < source_len:
+                    read_len = min(overlap_len, source_len - offset_in_source_data)
                     
-                    source_len = len(clip.data)
-                    if offset_in_source_data < source_len:
-                        read_len = min(overlap_len, source_len - offset_in_source_data)
-                        
-                        # Add raw clip audio to track buffer
-                        track_buffer[buffer_offset : buffer_offset + read_len] += \
-                            clip.data[offset_in_source_data : offset_in_source_data + read_len]
-            
-            # Process Effects Chain
-            if hasattr(track, 'effects') and not getattr(track, 'fx_bypass', False):
-                for effect in track.effects:
-                    if effect.active:
-                        track_buffer = effect.process(track_buffer, self.sample_rate)
+                    # Add raw clip audio to track buffer
+                    track_buffer[buffer_offset : buffer_offset + read_len] += \
+                        data[offset_in_source_data : offset_in_source_data + read_len]
 
-            # Apply Track Volume & Pan
-            pan = track.pan
-            left_gain = 1.0 if pan <= 0 else (1.0 - pan)
-            right_gain = 1.0 if pan >= 0 else (1.0 + pan)
-            
-            gains = np.array([left_gain, right_gain], dtype='float32') * track.volume
-            
-            # Mix to Master
-            mix_buffer += track_buffer * gains
+        return track_buffer
+
+    def mix_chunk(self, start_sample, num_frames, realtime=False):
+        mix_buffer = np.zeros((num_frames, 2), dtype='float32')
+        self.rendered_frames += num_frames
+        
+        any_solo = any(t.is_soloed for t in self.tracks)
+
+        # Loop Cache (live playback only, exports always render everything)
+        cache = None
+        use_cache = False
+        recording = False
+        after_full_pass = False
+        if realtime:
+            self.loop_cache.apply_pending()
+            if self.removed_tracks:
+                self._drop_removed_tracks()
+            # Effect tails of the previous pass ring into the next one, so only
+            # a pass that follows a complete pass sounds like every later pass
+            after_full_pass = self.full_pass and self.last_chunk_end == self.loop_end_sample
+            if start_sample == self.loop_start_sample:
+                self.full_pass = True
+            elif start_sample != self.last_chunk_end:
+                self.full_pass = False # Seeked, this pass misses its start
+            self.last_chunk_end = start_sample + num_frames
+        if realtime and self.is_looping and self.loop_end_sample > self.loop_start_sample:
+            cache = self.loop_cache
+            if cache.covers(start_sample, num_frames, self.loop_start_sample, self.loop_end_sample):
+                use_cache = True
+                mix_buffer += cache.read(start_sample, num_frames, self.track_peaks)
+            else:
+                if start_sample == self.loop_start_sample and after_full_pass and cache.state != cache.RECORDING:
+                    cache.begin(self.tracks, self.loop_start_sample, self.loop_end_sample, self.sample_rate)
+                recording = cache.is_recording_at(start_sample)
+                if cache.state == cache.RECORDING and not recording:
+                    cache.invalidate() # Seeked away mid-pass, applied next block
+
+        pipelines, delay_line, _ = self.pipeline_state if realtime else ({}, None, 0)
+        draft = realtime and self.draft_active # Exports always render at full quality
+
+        if self.batch_mixing:
+            self.batch_mixer.mix(start_sample, num_frames, mix_buffer, cache, use_cache, recording, pipelines, draft)
+        else:
+            self._mix_tracks(start_sample, num_frames, mix_buffer, any_solo, cache, use_cache, recording, pipelines, draft)
             
-            # Capture Peak Metering
-            peak = np.max(np.abs(track_buffer)) * track.volume
-            self.track_peaks[track] = float(peak)
+        if recording:
+            cache.advance(num_frames)
             
+        if delay_line is not None:
+            # Hold the rest back by the pipeline latency, then add the pipelined tracks
+            mix_buffer = delay_line.process(mix_buffer)
+            self._mix_pipelined(pipelines, start_sample, num_frames, mix_buffer, any_solo)
             
         # MASTER TRACK PROCESSING
         if hasattr(self, 'master_track'):
              if not getattr(self.master_track, 'fx_bypass', False):
                  for effect in self.master_track.effects:
                      if effect.active:
-                         mix_buffer = effect.process(mix_buffer, self.sample_rate)
+                         mix_buffer = effect.run(mix_buffer, self.sample_rate)
              
              mix_buffer *= self.master_track.volume
              
@@ -215,6 +608,131 @@ class AudioEngine(QObject):
 
         return mix_buffer
 
+    def _mix_tracks(self, start_sample, num_frames, mix_buffer, any_solo, cache, use_cache, recording, skip=(), draft=False):
+        # Track-by-track path, used when batch_mixing is off
+        for track in self.tracks:
+            if use_cache and cache.is_clean(track): continue
+            if track in skip: continue
+            
+            if any_solo:
+                if not track.is_soloed: continue
+            else:
+                if track.is_muted: continue
+
+            # Sum Clips into Track Buffer
+            track_buffer = self._render_clips(track, start_sample, num_frames)
+            
+            # Process Effects Chain
+            track_buffer = self._process_effects(track, track_buffer, draft)
+
+            # Apply Track Volume & Pan
+            pan = track.pan
+            left_gain = 1.0 if pan <= 0 else (1.0 - pan)
+            right_gain = 1.0 if pan >= 0 else (1.0 + pan)
+            
+            gains = np.array([left_gain, right_gain], dtype='float32') * track.volume
+            
+            # Mix to Master
+            contribution = track_buffer * gains
+            mix_buffer += contribution
+            
+            # Capture Peak Metering
+            peak = np.max(np.abs(track_buffer)) * track.volume
+            self.track_peaks[track] = float(peak)
+            
+            if recording and cache.is_clean(track):
+                cache.write(track, start_sample, contribution, peak)
+
+    def _process_effects(self, track, track_buffer, draft=False):
+        if track.fx_bypass: return track_buffer
+        effects = [e for e in track.effects if e.active]
+        if not effects: return track_buffer
+        
+        # Tail-aware sleep: once the input has been silent for longer than the
+        # chain's tail and the output died out, skip the chain until audio returns
+        input_silent = not track_buffer.any()
+        if input_silent:
+            silent = self.fx_silence.get(track, 0)
+            if silent is None:
+                return track_buffer # Asleep, silence in, silence out
+        else:
+            self.fx_silence[track] = 0
+        
+        trace_start = tracer.start()
+        if draft:
+            track_buffer = self._process_draft(effects, track_buffer)
+        else:
+            for effect in effects:
+                track_buffer = effect.run(track_buffer, self.sample_rate)
+        tracer.end(track.name, "track", trace_start)
+        
+        if input_silent:
+            silent += len(track_buffer)
+            tail = sum(e.get_tail_length(self.sample_rate) for e in effects)
+            threshold = SILENCE_THRESHOLD
+            if draft:
+                tail = min(tail, int(DRAFT_MAX_TAIL * self.sample_rate))
+                threshold = DRAFT_SILENCE_THRESHOLD
+                if silent >= tail:
+                    # Cut the tail however loud it still is, faded out over
+                    # this block so the cut does not click
+                    fade = np.linspace(1.0, 0.0, len(track_buffer), dtype='float32')
+                    track_buffer = track_buffer * fade[:, None]
+                    threshold = np.inf
+            if silent >= tail and (len(track_buffer) == 0 or np.max(np.abs(track_buffer)) < threshold):
+                for effect in effects:
+                    effect.reset()
+                silent = None
+            self.fx_silence[track] = silent
+        return track_buffer
+
+    def _process_draft(self, effects, track_buffer):
+        num_frames = len(track_buffer)
+        if self.draft_mono and track_buffer.ndim == 2 and track_buffer.shape[1] == 2:
+            track_buffer = (track_buffer[:, 0:1] + track_buffer[:, 1:2]) * 0.5
+        
+        # Consecutive expensive effects share one trip to the reduced rate
+        factor = DRAFT_DECIMATION
+        i = 0
+        while i < len(effects):
+            if not effects[i].expensive or num_frames < factor:
+                track_buffer = effects[i].run(track_buffer, self.sample_rate)
+                i += 1
+                continue
+            
+            run_end = i
+            while run_end < len(effects) and effects[run_end].expensive:
+                run_end += 1
+            
+            # Box-filter down, process at the lower rate, hold back up
+            low_frames = -(-num_frames // factor)
+            padded = np.zeros((low_frames * factor, track_buffer.shape[1]), dtype='float32')
+            padded[:num_frames] = track_buffer
+            low = padded.reshape(low_frames, factor * padded.shape[1])
+            low = low.reshape(low_frames, factor, -1).sum(axis=1) * (1.0 / factor)
+            for effect in effects[i:run_end]:
+                low = effect.run(low, self.sample_rate // factor)
+            track_buffer = np.repeat(low, factor, axis=0)[:num_frames]
+            i = run_end
+        
+        return track_buffer
+
+    def _mix_pipelined(self, pipelines, start_sample, num_frames, mix_buffer, any_solo):
+        for track, pipeline in pipelines.items():
+            audible = track.is_soloed if any_solo else not track.is_muted
+            if not audible:
+                pipeline.reset()
+                continue
+
+            track_buffer = pipeline.process(self._render_clips(track, start_sample, num_frames))
+            
+            left_gain, right_gain = pan_gains(track.pan)
+            gains = np.array([left_gain, right_gain], dtype='float32') * track.volume
+            mix_buffer += track_buffer * gains
+            
+            peak = np.max(np.abs(track_buffer)) * track.volume if num_frames else 0.0
+            self.track_peaks[track] = float(peak)
+
     def export_audio(self, file_path, duration_sec):
         import soundfile as sf
         
@@ -232,13 +750,56 @@ class AudioEngine(QObject):
         print("Export complete.")
 
     def audio_callback(self, outdata, frames, time, status):
-        if status: print(status)
+        if status:
+            self.xruns += 1 # Counted, printing here could block the callback
+            tracer.instant("xrun", "audio")
+        self.callback_thread = threading.get_ident()
+        trace_start = tracer.start()
+        checker = self.rt_checker
+        if checker is not None:
+            checker.run(self._render_callback, outdata, frames, time)
+        else:
+            self._render_callback(outdata, frames, time)
+        tracer.end("audio_callback", "audio", trace_start)
+
+    def _render_callback(self, outdata, frames, time):
+        callback_start = _time.perf_counter()
         
-        mix_buffer = self.mix_chunk(self.playhead, frames)
+        looping = self.is_looping and self.loop_end_sample > self.loop_start_sample
+        if looping and self.playhead >= self.loop_end_sample:
+            self.playhead = self.loop_start_sample
         
-        outdata[:] = mix_buffer
-        self.playhead += frames
+        # Timestamp the block with the time its first frame reaches the DAC.
+        # Backends that report 0 get an estimate on the perf_counter clock:
+        # now plus the latency the stream reported when it was opened.
+        dac_time = getattr(time, 'outputBufferDacTime', 0.0) if time is not None else 0.0
+        estimated = dac_time <= 0
+        if estimated:
+            dac_time = callback_start + self.output_latency
+        entry = (dac_time, self.playhead, frames,
+                 self.loop_start_sample if looping else 0,
+                 self.loop_end_sample if looping else 0, estimated)
+        self.block_times[self.block_times_index] = entry
+        self.block_times_index = (self.block_times_index + 1) % len(self.block_times)
+        
+        # Split the block at the loop end and continue from the loop start.
+        # Effects keep their state, so tails carry over the seam.
+        written = 0
+        while written < frames:
+            segment = frames - written
+            
+            if looping:
+                if self.playhead >= self.loop_end_sample:
+                    self.playhead = self.loop_start_sample
+                segment = min(segment, self.loop_end_sample - self.playhead)
+            
+            outdata[written:written + segment] = self.mix_chunk(self.playhead, segment, realtime=True)
+            self.playhead += segment
+            written += segment
 
-        if self.is_looping and self.loop_end_sample > 0:
-            if self.playhead >= self.loop_end_sample:
-                self.playhead = 0
\ No newline at end of file
+        if looping and self.playhead >= self.loop_end_sample:
+            self.playhead = self.loop_start_sample
+        
+        if frames:
+            elapsed = _time.perf_counter() - callback_start
+            self._update_draft(elapsed * self.sample_rate / frames)
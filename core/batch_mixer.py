@@ -0,0 +1,105 @@
+import numpy as np
+
+def pan_gains(pan):
+    left_gain = 1.0 if pan <= 0 else (1.0 - pan)
+    right_gain = 1.0 if pan >= 0 else (1.0 + pan)
+    return left_gain, right_gain
+
+class BatchMixer:
+    # Mixes every track in one pass: each track renders into its slot of a
+    # (tracks, frames, 2) block, then a single matmul against the gain
+    # matrix sums them into the master and axis reductions give all peaks.
+    def __init__(self, engine):
+        self.engine = engine
+        self.storage = np.zeros(0, dtype='float32') # Backing memory of the block
+
+        # Gain matrix for a snapshot of the track list: (tracks, gains,
+        # volumes, audible). Only the audio thread builds it, always
+        # as a new tuple, the GUI thread just raises the dirty flag.
+        self.state = None
+        self.dirty = True
+
+    def invalidate(self):
+        self.dirty = True
+
+    def update_track(self, track):
+        # Volume, pan or mute edit: the next block rebuilds the gains
+        self.dirty = True
+
+    def _is_audible(self, track, any_solo):
+        if any_solo:
+            return track.is_soloed
+        return not track.is_muted
+
+    def _build(self, tracks):
+        count = len(tracks)
+        any_solo = any(t.is_soloed for t in tracks)
+        gains = np.zeros((count, 2), dtype='float32') # Post-fader L/R gain, 0 for silenced tracks
+        volumes = np.zeros(count, dtype='float32')
+        audible = [] # Indices of the tracks that get rendered
+        for i, track in enumerate(tracks):
+            if self._is_audible(track, any_solo):
+                left_gain, right_gain = pan_gains(track.pan)
+                gains[i] = (left_gain * track.volume, right_gain * track.volume)
+                volumes[i] = track.volume
+                audible.append(i)
+        return (tracks, gains, volumes, audible)
+
+    def _get_block(self, count, num_frames):
+        # Always a contiguous view so the gain product runs as a plain GEMM
+        size = count * num_frames * 2
+        if len(self.storage) < size:
+            self.storage = np.zeros(size, dtype='float32')
+        return self.storage[:size].reshape(count, num_frames, 2)
+
+    def mix(self, start_sample, num_frames, mix_buffer, cache=None, use_cache=False, recording=False, skip=(), draft=False):
+        engine = self.engine
+        # The GUI thread edits engine.tracks, only the copy is indexed.
+        # List comparison is by identity, cheap enough to run every block.
+        live = list(engine.tracks)
+        state = self.state
+        if self.dirty or state is None or state[0] != live:
+            self.dirty = False # Cleared first, edits from now on flag the next block
+            state = self.state = self._build(live)
+        tracks, all_gains, volumes, audible = state
+
+        block = self._get_block(len(audible), num_frames)
+
+        rows = []
+        for i in audible:
+            track = tracks[i]
+            if use_cache and cache.is_clean(track): continue
+            if track in skip: continue
+
+            slot = block[len(rows)]
+            engine._render_clips(track, start_sample, num_frames, out=slot)
+
+            track_buffer = engine._process_effects(track, slot, draft)
+            if track_buffer is not slot:
+                slot[:] = track_buffer
+
+            rows.append(i)
+
+        if not rows or num_frames == 0:
+            for i in rows:
+                engine.track_peaks[tracks[i]] = 0.0
+            return
+
+        count = len(rows)
+        block = block[:count]
+        gains = all_gains[rows]
+
+        # (2, tracks) @ (tracks, frames * 2): row 0 holds the left-weighted
+        # sum in its even columns, row 1 the right-weighted sum in its odd ones
+        summed = gains.T @ block.reshape(count, num_frames * 2)
+        mix_buffer[:, 0] += summed[0, 0::2]
+        mix_buffer[:, 1] += summed[1, 1::2]
+
+        peaks = np.maximum(block.max(axis=(1, 2)), -block.min(axis=(1, 2))) * volumes[rows]
+        mixed = [tracks[i] for i in rows]
+        engine.track_peaks.update(zip(mixed, peaks.tolist()))
+
+        if recording:
+            for k, track in enumerate(mixed):
+                if cache.is_clean(track):
+                    cache.write(track, start_sample, block[k] * gains[k], peaks[k])
@@ -1,4 +1,5 @@
 from PySide6.QtCore import QObject, Signal
+from core.tracing import tracer
 
 class Command:
     def execute(self):
@@ -9,6 +10,7 @@ class Command:
 
 class UndoStack(QObject):
     stack_changed = Signal()
+    command_applied = Signal(object) # Executed, undone or redone command
 
     def __init__(self, limit=50):
         super().__init__()
@@ -18,26 +20,32 @@ class UndoStack(QObject):
 
     def push(self, command):
         self._redo_stack.clear()
-        command.execute()
+        with tracer.span(type(command).__name__, "command"):
+            command.execute()
         self._undo_stack.append(command)
         if len(self._undo_stack) > self.limit:
             self._undo_stack.pop(0)
+        self.command_applied.emit(command)
         self.stack_changed.emit()
 
     def undo(self):
         if not self._undo_stack:
             return
         command = self._undo_stack.pop()
-        command.undo()
+        with tracer.span("undo " + type(command).__name__, "command"):
+            command.undo()
         self._redo_stack.append(command)
+        self.command_applied.emit(command)
         self.stack_changed.emit()
 
     def redo(self):
         if not self._redo_stack:
             return
         command = self._redo_stack.pop()
-        command.execute()
+        with tracer.span("redo " + type(command).__name__, "command"):
+            command.execute()
         self._undo_stack.append(command)
+        self.command_applied.emit(command)
         self.stack_changed.emit()
 
     def can_undo(self):
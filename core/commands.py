@@ -1,6 +1,8 @@
 from core.command_stack import Command
 
 class AddTrackCommand(Command):
+    affects_all_tracks = True
+
     def __init__(self, track_manager, track_data):
         self.track_manager = track_manager
         self.track_data = track_data
@@ -13,6 +15,8 @@ class AddTrackCommand(Command):
         self.track_manager.perform_delete_track(self.track_index)
 
 class DeleteTrackCommand(Command):
+    affects_all_tracks = True
+
     def __init__(self, track_manager, track_index):
         self.track_manager = track_manager
         self.track_index = track_index
@@ -126,6 +130,8 @@ class ToggleMuteCommand(Command):
         self.track_manager.perform_toggle_mute(self.track_index)
 
 class ToggleSoloCommand(Command):
+    affects_all_tracks = True
+
     def __init__(self, track_manager, track_index):
         self.track_manager = track_manager
         self.track_index = track_index
@@ -185,6 +191,18 @@ class ToggleLoopCommand(Command):
     def undo(self):
         self.main_window.perform_loop_toggle(not self.enabled)
 
+class SetLoopRegionCommand(Command):
+    def __init__(self, main_window, old_region, new_region):
+        self.main_window = main_window
+        self.old_region = old_region
+        self.new_region = new_region
+
+    def execute(self):
+        self.main_window.perform_loop_region_change(self.new_region)
+
+    def undo(self):
+        self.main_window.perform_loop_region_change(self.old_region)
+
 class ToggleSnapCommand(Command):
     def __init__(self, main_window, enabled):
         self.main_window = main_window
@@ -0,0 +1,44 @@
+import time
+from collections import deque
+
+class CpuMeter:
+    # Per-effect CPU load over a sliding window. Effects accumulate the time
+    # spent in process (AudioEffect.run), the engine counts rendered frames;
+    # the load is effect time / audio time between the oldest and newest
+    # snapshot, so 1.0 means the effect alone would use the whole budget.
+    def __init__(self, window=2.0):
+        self.window = window
+        self.snapshots = deque() # (wall time, rendered frames, {effect: cpu_time})
+        self.loads = {} # Map effect object to load
+
+    def reset(self):
+        self.snapshots.clear()
+        self.loads = {}
+
+    def update(self, engine):
+        now = time.perf_counter()
+        effects = [e for t in engine.tracks for e in t.effects]
+        effects.extend(engine.master_track.effects)
+        times = {e: e.cpu_time for e in effects}
+        self.snapshots.append((now, engine.rendered_frames, times))
+
+        while len(self.snapshots) > 2 and now - self.snapshots[0][0] > self.window:
+            self.snapshots.popleft()
+
+        _, old_frames, old_times = self.snapshots[0]
+        audio_seconds = (engine.rendered_frames - old_frames) / engine.sample_rate
+        if audio_seconds <= 0:
+            self.loads = {} # Nothing rendered, nothing to show
+            return
+
+        self.loads = {
+            e: (cpu - old_times[e]) / audio_seconds
+            for e, cpu in times.items() if e in old_times
+        }
+
+    def effect_load(self, effect):
+        return self.loads.get(effect)
+
+    def chain_load(self, track):
+        loads = [self.loads[e] for e in track.effects if e in self.loads]
+        return sum(loads) if loads else None
@@ -0,0 +1,220 @@
+import heapq
+import itertools
+import os
+import time
+import soundfile as sf
+from PySide6.QtCore import QObject, QRunnable, QThreadPool, QTimer, Signal
+from core.track_loader import load_track, cached_peaks
+from core.sample_pool import SamplePool, sample_key, share
+
+# Shared, bounded pool for decoding audio files. Jobs are started in
+# priority order while both a worker and enough of the memory budget are
+# free, so a large project decodes a few files at a time instead of all at
+# once. Results are delivered on the GUI thread through the job's signals.
+# Requests for a file that is already loaded or still decoding share that
+# source (core.sample_pool) instead of decoding it again.
+
+MEMORY_OVERHEAD = 2.0 # Peak decode memory relative to the decoded array
+
+# Decoded float32 bytes per byte of file, for the first guess made on the
+# GUI thread without opening the file. Workers replace it with the size
+# from the file's header before decoding.
+DECODED_PER_FILE_BYTE = {".mp3": 22.0, ".ogg": 22.0, ".opus": 22.0, ".flac": 3.5}
+DEFAULT_DECODED_PER_FILE_BYTE = 2.0 # 16-bit PCM
+
+def default_memory_budget():
+    # A quarter of physical memory, 1 GiB where that cannot be read
+    try:
+        return os.sysconf("SC_PHYS_PAGES") * os.sysconf("SC_PAGE_SIZE") // 4
+    except (AttributeError, ValueError, OSError):
+        return 1 << 30
+
+class DecodeJob(QObject):
+    loaded = Signal(object) # AudioTrackData
+    failed = Signal(str)
+    peaks = Signal(object) # Cached peak pyramid, ahead of the decoded audio
+
+    def __init__(self, file_path, target_sr, priority, group, estimate, key=None):
+        super().__init__()
+        self.key = key # Sample pool key, jobs with the same key share one decode
+        self.file_path = file_path
+        self.target_sr = target_sr
+        self.priority = priority
+        self.group = group
+        self.estimate = estimate # Bytes reserved against the budget
+        self.cancelled = False
+
+class _DecodeTask(QRunnable):
+    def __init__(self, pool, job):
+        super().__init__()
+        self.pool = pool
+        self.job = job
+
+    def run(self):
+        self.pool.job_estimated.emit(self.job, self.pool.estimate(self.job.file_path, self.job.target_sr))
+        # Hashing the file for the peak cache stays off the GUI thread
+        waveform = cached_peaks(self.job.file_path, self.job.target_sr)
+        if waveform is not None:
+            self.pool.job_peaks.emit(self.job, waveform)
+        try:
+            result, error = load_track(self.job.file_path, self.job.target_sr), ""
+        except Exception as e:
+            result, error = None, str(e)
+        self.pool.job_done.emit(self.job, result, error) # Queued to the GUI thread
+
+class DecodePool(QObject):
+    job_done = Signal(object, object, str)
+    job_estimated = Signal(object, int) # Header-based estimate from a worker
+    job_peaks = Signal(object, object) # Cached peaks found by a worker
+    idle = Signal(str) # Throughput summary once the queue drains
+
+    def __init__(self, workers=None, memory_budget=None, parent=None):
+        super().__init__(parent)
+        self.workers = workers or max(1, os.cpu_count() or 1)
+        self.memory_budget = memory_budget or default_memory_budget()
+        self.threads = QThreadPool(self)
+        self.threads.setMaxThreadCount(self.workers)
+
+        self.pending = [] # Heap of (priority, seq, job)
+        self.sequence = itertools.count()
+        self.running = set()
+        self.reserved = 0
+        self.samples = SamplePool()
+        self.waiting = {} # key -> jobs sharing the queued or running decode
+
+        # Throughput since the pool last went idle
+        self.batch_start = None
+        self.batch_files = 0
+        self.batch_bytes = 0
+        self.batch_seconds = 0.0
+
+        self.job_done.connect(self._on_job_done)
+        self.job_estimated.connect(self._on_job_estimated)
+        self.job_peaks.connect(self._on_job_peaks)
+
+    def quick_estimate(self, file_path):
+        # From the file size alone, sf.info would open the file on the GUI thread
+        try:
+            size = os.path.getsize(file_path)
+        except OSError:
+            return 0 # Missing, fails fast
+        ratio = DECODED_PER_FILE_BYTE.get(os.path.splitext(file_path)[1].lower(), DEFAULT_DECODED_PER_FILE_BYTE)
+        return int(size * ratio * MEMORY_OVERHEAD)
+
+    def estimate(self, file_path, target_sr):
+        try:
+            info = sf.info(file_path)
+            frames = info.frames * target_sr / max(1, info.samplerate)
+            return int(frames * info.channels * 4 * MEMORY_OVERHEAD)
+        except Exception:
+            return 0 # Unreadable, fails fast
+
+    def submit(self, file_path, target_sr, priority=0, group=None):
+        # Lower priority values start first, equal ones in submission order
+        key = sample_key(file_path, target_sr)
+        shared = self.samples.get(key) if key is not None else None
+        if shared is not None:
+            job = DecodeJob(file_path, target_sr, priority, group, 0, key)
+            QTimer.singleShot(0, lambda: self._deliver(job, shared, "")) # After the caller connects
+            return job
+        if key is not None and key in self.waiting:
+            job = DecodeJob(file_path, target_sr, priority, group, 0, key)
+            self.waiting[key].append(job)
+            return job
+
+        job = DecodeJob(file_path, target_sr, priority, group, self.quick_estimate(file_path), key)
+        if key is not None:
+            self.waiting[key] = [job]
+        heapq.heappush(self.pending, (priority, next(self.sequence), job))
+        if self.batch_start is None:
+            self.batch_start = time.perf_counter()
+        self._dispatch()
+        return job
+
+    def cancel(self, group=None):
+        # Discards the results of the group's jobs (all if None). A queued
+        # decode is dropped once no job waits for it anymore, running ones
+        # finish.
+        for jobs in self.waiting.values():
+            for job in jobs:
+                if group is None or job.group == group:
+                    job.cancelled = True
+        for job in self.running:
+            if group is None or job.group == group:
+                job.cancelled = True
+
+        kept = []
+        for entry in self.pending:
+            job = entry[2]
+            if group is None or job.group == group:
+                job.cancelled = True
+            if all(j.cancelled for j in self.waiting.get(job.key, [job])):
+                for dropped in self.waiting.pop(job.key, [job]):
+                    dropped.deleteLater()
+            else:
+                kept.append(entry)
+        heapq.heapify(kept)
+        self.pending = kept
+
+    def _dispatch(self):
+        while self.pending and len(self.running) < self.workers:
+            job = self.pending[0][2]
+            # Always let one job run, even if it alone exceeds the budget
+            if self.running and self.reserved + job.estimate > self.memory_budget:
+                break
+            heapq.heappop(self.pending)
+            self.running.add(job)
+            self.reserved += job.estimate
+            self.threads.start(_DecodeTask(self, job))
+
+    def _on_job_estimated(self, job, estimate):
+        if job not in self.running: return
+        self.reserved += estimate - job.estimate
+        job.estimate = estimate
+        self._dispatch() # The guess may have been too high
+
+    def _on_job_peaks(self, job, waveform):
+        jobs = self.waiting.get(job.key, [job]) if job.key is not None else [job]
+        for waiting_job in jobs:
+            if not waiting_job.cancelled:
+                waiting_job.peaks.emit(waveform)
+
+    def _on_job_done(self, job, result, error):
+        self.running.discard(job)
+        self.reserved -= job.estimate
+
+        if result is not None:
+            self.batch_files += 1
+            self.batch_bytes += result.source_data.nbytes
+            self.batch_seconds += len(result.source_data) / result.sample_rate
+
+        jobs = self.waiting.pop(job.key, [job]) if job.key is not None else [job]
+        if result is not None:
+            self.samples.add(job.key, result)
+        for i, waiting_job in enumerate(jobs):
+            # Every job gets its own track object on the shared audio
+            self._deliver(waiting_job, result if i == 0 or result is None else share(result), error)
+
+        self._dispatch()
+        if not self.running and not self.pending:
+            self._report()
+
+    def _deliver(self, job, result, error):
+        if not job.cancelled:
+            if result is not None:
+                job.loaded.emit(result)
+            else:
+                job.failed.emit(error)
+        job.deleteLater() # Drops the connected slots and what they hold
+
+    def _report(self):
+        if self.batch_start is None: return
+        elapsed = max(time.perf_counter() - self.batch_start, 1e-6)
+        summary = (f"Decoded {self.batch_files} files, {self.batch_seconds:.0f}s of audio in {elapsed:.1f}s "
+                   f"({self.batch_seconds / elapsed:.0f}x realtime, {self.batch_bytes / elapsed / 1e6:.0f} MB/s)")
+        print(f"[DecodePool] {summary}")
+        self.batch_start = None
+        self.batch_files = 0
+        self.batch_bytes = 0
+        self.batch_seconds = 0.0
+        self.idle.emit(summary)
@@ -0,0 +1,158 @@
+import hashlib
+import os
+import threading
+import time
+import weakref
+
+# Directory of derived files (peaks, decoded audio) that are expensive to
+# rebuild. Entries are written to a temporary name and renamed into place,
+# so other app instances sharing the directory never see half a file. Every
+# hit touches the file's mtime, and eviction removes the least recently used
+# entries once the directory grows past its limit.
+
+FINGERPRINT_BYTES = 65536 # Read from each end of a source file
+STALE_TEMP_SECONDS = 3600 # Temp files untouched this long belong to a crashed writer
+
+def default_cache_dir():
+    path = os.environ.get("PYDAW_CACHE_DIR")
+    if path:
+        return path
+    root = os.environ.get("XDG_CACHE_HOME") or os.environ.get("LOCALAPPDATA") or os.path.join(os.path.expanduser("~"), ".cache")
+    return os.path.join(root, "pydaw")
+
+def file_fingerprint(file_path):
+    # Content hash of the size and both ends of the file, cheap enough for
+    # the GUI thread and robust against touched or re-saved files
+    digest = hashlib.blake2b(digest_size=16)
+    size = os.path.getsize(file_path)
+    digest.update(str(size).encode())
+    with open(file_path, "rb") as f:
+        digest.update(f.read(FINGERPRINT_BYTES))
+        if size > FINGERPRINT_BYTES:
+            f.seek(max(FINGERPRINT_BYTES, size - FINGERPRINT_BYTES))
+            digest.update(f.read(FINGERPRINT_BYTES))
+    return digest.hexdigest()
+
+def content_hash(file_path):
+    # Hash of the whole file, remembered per path, size and mtime in the
+    # hash index so only changed files are read again
+    st = os.stat(file_path)
+    stat_key = cache_key(os.path.abspath(file_path), st.st_size, st.st_mtime_ns)
+    path = hash_index.get(stat_key)
+    if path:
+        try:
+            with open(path) as f:
+                value = f.read().strip()
+            if len(value) == 32:
+                return value
+        except OSError:
+            pass
+
+    digest = hashlib.blake2b(digest_size=16)
+    with open(file_path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    value = digest.hexdigest()
+    hash_index.put(stat_key, lambda f: f.write(value.encode()))
+    return value
+
+def cache_key(*parts):
+    return hashlib.blake2b("|".join(str(p) for p in parts).encode(), digest_size=16).hexdigest()
+
+class DiskCache:
+    def __init__(self, name, limit, suffix, root=None):
+        self.directory = os.path.join(root or default_cache_dir(), name)
+        self.limit = limit # Bytes
+        self.suffix = suffix
+        self.lock = threading.Lock() # Eviction runs from decode workers
+        self.pinned = {} # key -> number of live objects mapping the entry
+
+    def path_for(self, key):
+        return os.path.join(self.directory, key + self.suffix)
+
+    def get(self, key):
+        # Path of the entry or None. Marks it as recently used.
+        path = self.path_for(key)
+        try:
+            os.utime(path)
+        except OSError:
+            return None
+        return path
+
+    def put(self, key, write):
+        # write(file_object) produces the entry. Returns its path, or None
+        # when the cache directory is not writable.
+        path = self.path_for(key)
+        temp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            with open(temp_path, "wb") as f:
+                write(f)
+            os.replace(temp_path, path) # Atomic, concurrent writers of a key produce the same bytes
+        except OSError as e:
+            print(f"[DiskCache] Could not write {path}: {e}")
+            self._discard(temp_path)
+            return None
+        except BaseException:
+            self._discard(temp_path) # write() failed, e.g. a decoder error
+            raise
+        self.evict()
+        return path
+
+    def pin(self, key, holder):
+        # Keeps the entry out of eviction while `holder` (e.g. the memmap of
+        # the file) is alive. Other processes may open it again by name.
+        with self.lock:
+            self.pinned[key] = self.pinned.get(key, 0) + 1
+        weakref.finalize(holder, self._unpin, key)
+
+    def _unpin(self, key):
+        with self.lock:
+            count = self.pinned.get(key, 0) - 1
+            if count > 0:
+                self.pinned[key] = count
+            else:
+                self.pinned.pop(key, None)
+
+    def _discard(self, temp_path):
+        try:
+            os.remove(temp_path)
+        except OSError:
+            pass
+
+    def evict(self):
+        with self.lock:
+            entries = []
+            total = 0
+            try:
+                names = os.listdir(self.directory)
+            except OSError:
+                return
+            now = time.time()
+            for name in names:
+                is_temp = name.endswith(".tmp")
+                if not is_temp and not name.endswith(self.suffix): continue
+                try:
+                    st = os.stat(os.path.join(self.directory, name))
+                except OSError:
+                    continue # Evicted by another instance
+                if is_temp:
+                    if now - st.st_mtime > STALE_TEMP_SECONDS:
+                        self._discard(os.path.join(self.directory, name))
+                    continue
+                entries.append((st.st_mtime, st.st_size, name))
+                total += st.st_size
+
+            entries.sort()
+            pinned = {key + self.suffix for key in self.pinned}
+            for mtime, size, name in entries:
+                if total <= self.limit: break
+                if name in pinned: continue # Mapped by this session
+                try:
+                    # Open maps keep their pages until released
+                    os.remove(os.path.join(self.directory, name))
+                except OSError:
+                    continue # In use (Windows) or already gone
+                total -= size
+
+hash_index = DiskCache("hashes", 16 << 20, ".hash")
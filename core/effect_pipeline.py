@@ -0,0 +1,146 @@
+import queue
+import threading
+import numpy as np
+
+class SampleFifo:
+    # Preallocated stereo FIFO, grows only if a block does not fit
+    def __init__(self, capacity, prefill=0):
+        self.buffer = np.zeros((max(capacity, prefill + 1), 2), dtype='float32')
+        self.read_pos = 0
+        self.size = 0
+        if prefill:
+            self.write(np.zeros((prefill, 2), dtype='float32'))
+
+    def write(self, data):
+        count = len(data)
+        capacity = len(self.buffer)
+        if self.size + count > capacity:
+            grown = np.zeros((max(capacity * 2, self.size + count), 2), dtype='float32')
+            grown[:self.size] = self.read(self.size)
+            self.buffer = grown
+            self.read_pos = 0
+            capacity = len(grown)
+
+        start = (self.read_pos + self.size) % capacity
+        first = min(count, capacity - start)
+        self.buffer[start:start + first] = data[:first]
+        self.buffer[:count - first] = data[first:]
+        self.size += count
+
+    def read(self, count, out=None):
+        if out is None:
+            out = np.empty((count, 2), dtype='float32')
+        capacity = len(self.buffer)
+        first = min(count, capacity - self.read_pos)
+        out[:first] = self.buffer[self.read_pos:self.read_pos + first]
+        out[first:count] = self.buffer[:count - first]
+        self.read_pos = (self.read_pos + count) % capacity
+        self.size -= count
+        return out
+
+class DelayLine:
+    # Fixed delay for everything that does not go through a pipeline, so it
+    # lines up with the pipelined tracks
+    def __init__(self, delay, capacity):
+        self.delay = delay
+        self.fifo = SampleFifo(delay + capacity, prefill=delay)
+
+    def process(self, buffer):
+        self.fifo.write(buffer)
+        return self.fifo.read(len(buffer))
+
+class StageWorker:
+    # Runs one effect of the chain on its own thread
+    def __init__(self, effect, sample_rate, name):
+        self.effect = effect
+        self.sample_rate = sample_rate
+        self.jobs = queue.Queue()
+        self.results = queue.Queue()
+        self.lock = threading.Lock()
+        self.closed = False
+        self.thread = threading.Thread(target=self.run, name=name, daemon=True)
+        self.thread.start()
+
+    def apply(self, chunk):
+        if chunk is None or not self.effect.active:
+            return chunk
+        try:
+            return self.effect.run(chunk, self.sample_rate)
+        except Exception as e:
+            print(f"Pipeline stage {self.effect.name} failed: {e}")
+            return chunk
+
+    def run(self):
+        while True:
+            job = self.jobs.get()
+            if job is self: break # Stop marker
+            chunk, bypass = job
+            self.results.put(chunk if bypass else self.apply(chunk))
+
+    def submit(self, chunk, bypass):
+        with self.lock:
+            if self.closed:
+                self.results.put(chunk if bypass else self.apply(chunk))
+            else:
+                self.jobs.put((chunk, bypass))
+
+    def result(self):
+        return self.results.get()
+
+    def close(self):
+        with self.lock:
+            self.closed = True
+            self.jobs.put(self)
+
+class EffectPipeline:
+    # Effect chain split into one stage per effect. On every tick each stage
+    # works on the chunk the previous stage finished on the tick before, so
+    # a long chain is spread over several cores. Audio is re-blocked into
+    # fixed chunks, which makes the latency constant: stages * chunk_size.
+    def __init__(self, track, chunk_size, sample_rate, delay=None):
+        self.track = track
+        self.effects = list(track.effects)
+        self.chunk_size = chunk_size
+        self.latency = len(self.effects) * chunk_size
+        self.workers = [
+            StageWorker(effect, sample_rate, f"fx-{track.name}-{i}")
+            for i, effect in enumerate(self.effects)
+        ]
+        self.set_delay(self.latency if delay is None else delay)
+
+    def set_delay(self, delay):
+        # delay >= latency, the extra pads this track to the engine-wide latency
+        self.delay = delay
+        self.in_fifo = SampleFifo(self.chunk_size * 4)
+        self.out_fifo = SampleFifo(delay + self.chunk_size * 4, prefill=delay)
+        self.carry = [None] * len(self.workers)
+        self.idle = True
+
+    def reset(self):
+        if not self.idle:
+            self.set_delay(self.delay)
+
+    def matches(self, track):
+        return track.effects == self.effects
+
+    def _tick(self, chunk, bypass):
+        inputs = [chunk] + self.carry[:-1]
+        for worker, stage_input in zip(self.workers, inputs):
+            worker.submit(stage_input, bypass)
+        self.carry = [worker.result() for worker in self.workers]
+        return self.carry[-1]
+
+    def process(self, buffer):
+        self.idle = False
+        bypass = self.track.fx_bypass
+        self.in_fifo.write(buffer)
+        while self.in_fifo.size >= self.chunk_size:
+            chunk = self.in_fifo.read(self.chunk_size)
+            output = self._tick(chunk, bypass)
+            if output is not None:
+                self.out_fifo.write(output)
+        return self.out_fifo.read(len(buffer))
+
+    def close(self):
+        for worker in self.workers:
+            worker.close()
@@ -2,3 +2,9 @@ from .base import AudioEffect
 from .eq import EQ3Band
 from .delay import SimpleDelay
 from .distortion import Distortion
+
+EFFECT_TYPES = {cls.__name__: cls for cls in (EQ3Band, SimpleDelay, Distortion)}
+
+def create_effect(type_name):
+    effect_class = EFFECT_TYPES.get(type_name)
+    return effect_class() if effect_class else None
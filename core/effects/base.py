@@ -1,20 +1,65 @@
 
+import time
 import numpy as np
 from abc import ABC, abstractmethod
+from core.tracing import tracer
+
+# Recursive paths (filter state, feedback buffers) decay into denormal
+# floats once the input stops, which is very slow on x86. Anything this
+# far below full scale is flushed to zero.
+DENORMAL_THRESHOLD = 1e-15
+denormal_protection = True
+
+# Output below this (about -100 dBFS) counts as decayed
+SILENCE_THRESHOLD = 1e-5
+
+def flush_denormals(array, threshold=DENORMAL_THRESHOLD):
+    if denormal_protection:
+        array[np.abs(array) < threshold] = 0.0
+    return array
 
 class AudioEffect(ABC):
+    expensive = False # Draft playback runs expensive effects at a reduced rate
+
     def __init__(self, name="Effect"):
         self.name = name
         self.active = True
         self.parameters = {}
+        self.revision = 0 # Bumped on every parameter change
+        self.cpu_time = 0.0 # Seconds spent in process, read by the CPU meter
 
     @abstractmethod
     def process(self, buffer, sample_rate):
         pass
+
+    def run(self, buffer, sample_rate):
+        # What the engine calls: process plus a timer for the CPU meter
+        start = time.perf_counter()
+        output = self.process(buffer, sample_rate)
+        end = time.perf_counter()
+        self.cpu_time += end - start
+        if tracer.enabled:
+            tracer.add(self.name, "effect", start, end)
+        return output
+
+    def get_tail_length(self, sample_rate):
+        # Samples the output keeps ringing after the input goes silent
+        return 0
+
+    def prepare(self, sample_rate, channels):
+        # Allocate state for a channel layout ahead of time, from outside
+        # the audio thread (draft playback switches tracks to mono)
+        pass
+
+    def reset(self):
+        # Drop internal state (filter memory, delay lines), called once the
+        # tail has decayed so a sleeping effect resumes from silence
+        pass
     
     def set_param(self, name, value):
         if name in self.parameters:
             self.parameters[name] = value
+            self.revision += 1
 
     def get_param(self, name):
         return self.parameters.get(name, 0.0)
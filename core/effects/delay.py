@@ -1,6 +1,9 @@
 
 import numpy as np
-from .base import AudioEffect
+import math
+from .base import AudioEffect, flush_denormals, SILENCE_THRESHOLD
+
+MIN_DELAY_SECONDS = 0.001
 
 class SimpleDelay(AudioEffect):
     def __init__(self):
@@ -10,7 +13,8 @@ class SimpleDelay(AudioEffect):
             "feedback": 0.4, # 0.0 - 0.95
             "mix": 0.3 # 0.0 - 1.0 (Wet amount)
         }
-        self.buffer = None
+        self.buffer = None # Delay line of the current channel layout
+        self.buffers = {} # channels -> delay line, see prepare()
         self.write_ptr = 0
         
     def process(self, input_buffer, sample_rate):
@@ -23,34 +27,79 @@ class SimpleDelay(AudioEffect):
         
         # Ensure buffer exists (Alloc max 2 seconds)
         max_delay_samples = int(2.0 * sample_rate)
-        if self.buffer is None or self.buffer.shape[1] != channels:
-            self.buffer = np.zeros((max_delay_samples, channels), dtype='float32')
-            self.write_ptr = 0
+        if self.buffer is None or self.buffer.shape[1] != channels or len(self.buffer) < max_delay_samples:
+            self._switch_layout(channels, max_delay_samples)
             
-        # Limit delay
+        # Limit delay. Below a millisecond the comb would need too many
+        # slices per block (see below) for the audio thread.
         delay_samples = min(delay_samples, max_delay_samples - 1)
-        delay_samples = max(1, delay_samples)
+        delay_samples = max(int(MIN_DELAY_SECONDS * sample_rate), 1, delay_samples)
         
         feedback = self.parameters["feedback"]
         wet_mix = self.parameters["mix"]
         
-        # Output Buffer
-        output = input_buffer.copy()
-        
-        # Read Pointer
-        read_ptr_start = self.write_ptr - delay_samples
-        
-        read_indices = (np.arange(num_samples) + (self.write_ptr - delay_samples)) % max_delay_samples
-        write_indices = (np.arange(num_samples) + self.write_ptr) % max_delay_samples
-        
-        delayed_signal = self.buffer[read_indices]
-        
-        to_write = input_buffer + (delayed_signal * feedback)
-        
-        self.buffer[write_indices] = to_write
+        # Echoes shorter than the block would read samples this block has not
+        # written yet, so the comb runs over delay-sized slices
+        output = np.empty_like(input_buffer)
+        for start in range(0, num_samples, delay_samples):
+            end = min(start + delay_samples, num_samples)
+            chunk = input_buffer[start:end]
+            
+            read_indices = (np.arange(end - start) + (self.write_ptr - delay_samples)) % max_delay_samples
+            write_indices = (np.arange(end - start) + self.write_ptr) % max_delay_samples
+            
+            delayed_signal = self.buffer[read_indices]
+            
+            to_write = chunk + (delayed_signal * feedback)
+            flush_denormals(to_write)
+            
+            self.buffer[write_indices] = to_write
+            
+            self.write_ptr = (self.write_ptr + end - start) % max_delay_samples
+            
+            output[start:end] = (chunk * (1.0 - wet_mix)) + (delayed_signal * wet_mix)
         
-        self.write_ptr = (self.write_ptr + num_samples) % max_delay_samples
+        return output
+
+    def get_tail_length(self, sample_rate):
+        if self.parameters["mix"] <= 0.001: return 0
         
-        output = (input_buffer * (1.0 - wet_mix)) + (delayed_signal * wet_mix)
+        max_delay_samples = int(2.0 * sample_rate)
+        delay_samples = max(int(MIN_DELAY_SECONDS * sample_rate), 1, min(int(self.parameters["time"] * sample_rate), max_delay_samples - 1))
         
-        return output
+        # Each repeat is scaled by feedback, count repeats until inaudible
+        feedback = self.parameters["feedback"]
+        if feedback >= 1.0: return math.inf
+        repeats = 1
+        if feedback > 0.0:
+            repeats += math.ceil(math.log(SILENCE_THRESHOLD) / math.log(feedback))
+        return delay_samples * repeats
+
+    def prepare(self, sample_rate, channels):
+        if channels not in self.buffers:
+            self.buffers[channels] = np.zeros((int(2.0 * sample_rate), channels), dtype='float32')
+
+    def _switch_layout(self, channels, length):
+        buffer = self.buffers.get(channels)
+        if buffer is None or len(buffer) < length:
+            buffer = np.zeros((length, channels), dtype='float32') # Not prepared
+            self.buffers[channels] = buffer
+        previous = self.buffer
+        if previous is None or len(previous) < length:
+            buffer.fill(0.0)
+            self.write_ptr = 0
+        elif previous.shape[1] == 1:
+            buffer[:length] = previous[:length] # Mono echoes on every channel
+        else:
+            # Downmix in place, np.mean would allocate a temporary
+            mono = buffer[:length, :1]
+            mono[:] = previous[:length, :1]
+            for c in range(1, previous.shape[1]):
+                mono += previous[:length, c:c + 1]
+            mono *= 1.0 / previous.shape[1]
+            buffer[:length, 1:] = mono
+        self.buffer = buffer
+
+    def reset(self):
+        for buffer in self.buffers.values():
+            buffer.fill(0.0)
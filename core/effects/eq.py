@@ -1,9 +1,11 @@
 
 import numpy as np
 from scipy.signal import sosfilt, iirfilter, zpk2sos
-from .base import AudioEffect
+from .base import AudioEffect, flush_denormals
 
 class EQ3Band(AudioEffect):
+    expensive = True
+
     def __init__(self):
         super().__init__("EQ 3-Band")
         # Gains in dB (-12 to +12 typical)
@@ -24,6 +26,7 @@ class EQ3Band(AudioEffect):
 
     def _design_biquad(self, type, freq, fs, gain_db, q=0.707):
         A = 10 ** (gain_db / 40.0)
+        freq = min(freq, 0.45 * fs) # Stay below Nyquist at reduced (draft) rates
         omega = 2 * np.pi * freq / fs
         sn = np.sin(omega)
         cs = np.cos(omega)
@@ -64,6 +67,16 @@ class EQ3Band(AudioEffect):
         
         return np.array([[b[0], b[1], b[2], 1.0, a[1], a[2]]])
 
+    def get_tail_length(self, sample_rate):
+        # The lowest band rings longest, allow ~12 time constants (< -100 dB)
+        lowest = min(self.parameters["low_freq"], self.parameters["high_freq"])
+        return int(12 * sample_rate / (2 * np.pi * max(lowest, 10.0)))
+
+    def reset(self):
+        self.state_low = None
+        self.state_mid = None
+        self.state_high = None
+
     def process(self, buffer, sample_rate):
         if not self.active: return buffer
         
@@ -79,11 +92,12 @@ class EQ3Band(AudioEffect):
         # 1. Low Shelf
         if abs(self.parameters["low_gain"]) > 0.01:
             sos_low = self._design_biquad("low_shelf", self.parameters["low_freq"], sample_rate, self.parameters["low_gain"])
-            if self.state_low is None or self.state_low.shape[1] != out.shape[1]:
+            if self.state_low is None or self.state_low.shape[2] != out.shape[1]:
                 self.state_low = np.zeros((1, 2, out.shape[1])) # SOS State
             
             # Apply (axis=0 is samples)
             out, self.state_low = sosfilt(sos_low, out, axis=0, zi=self.state_low)
+            flush_denormals(self.state_low)
 
         # 2. Mid Peaking
         if abs(self.parameters["mid_gain"]) > 0.01:
@@ -91,17 +105,19 @@ class EQ3Band(AudioEffect):
              center = (self.parameters["low_freq"] + self.parameters["high_freq"]) / 2
              sos_mid = self._design_biquad("peaking", center, sample_rate, self.parameters["mid_gain"], q=1.0)
              
-             if self.state_mid is None or self.state_mid.shape[1] != out.shape[1]:
+             if self.state_mid is None or self.state_mid.shape[2] != out.shape[1]:
                 self.state_mid = np.zeros((1, 2, out.shape[1]))
              
              out, self.state_mid = sosfilt(sos_mid, out, axis=0, zi=self.state_mid)
+             flush_denormals(self.state_mid)
 
         # 3. High Shelf
         if abs(self.parameters["high_gain"]) > 0.01:
             sos_high = self._design_biquad("high_shelf", self.parameters["high_freq"], sample_rate, self.parameters["high_gain"])
-            if self.state_high is None or self.state_high.shape[1] != out.shape[1]:
+            if self.state_high is None or self.state_high.shape[2] != out.shape[1]:
                 self.state_high = np.zeros((1, 2, out.shape[1])) 
                 
             out, self.state_high = sosfilt(sos_high, out, axis=0, zi=self.state_high)
+            flush_denormals(self.state_high)
             
         return out
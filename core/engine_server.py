@@ -0,0 +1,513 @@
+import itertools
+import weakref
+import multiprocessing as mp
+from multiprocessing import shared_memory
+import numpy as np
+
+from core.audio_engine import AudioEngine
+from core.models import AudioClip, AudioTrackData
+from core.effects import create_effect
+
+# Engine-server mode: mixing runs in its own process so the GUI (painting,
+# rebuilding racks...) can no longer starve the audio callback.
+#
+#   GUI process                          engine process
+#   RemoteAudioEngine --- messages ----> EngineServer (AudioEngine + stream)
+#   source audio -------- shared memory --^
+#   mapped sources ------ same file ------^
+#   status ring  <------- shared memory -- meters, playhead
+
+MAX_TRACKS = 512
+STATUS_SLOTS = 8
+STATUS_FIELDS = 11 # seq, playhead, audible, master_L, master_R, master_peak, is_playing, dsp_load, draft_active, xruns, n_tracks
+
+def _attach(name):
+    # The GUI process owns (and unlinks) every segment. Spawned children share
+    # its resource tracker, so on older Pythons a plain attach is harmless.
+    try:
+        return shared_memory.SharedMemory(name=name, track=False)
+    except TypeError:
+        return shared_memory.SharedMemory(name=name)
+
+class StatusRing:
+    # Single writer (engine), single reader (GUI). Each slot carries its
+    # sequence number so the reader can detect a slot overwritten mid-read.
+    def __init__(self, buf, max_tracks=MAX_TRACKS):
+        self.slot_size = STATUS_FIELDS + max_tracks
+        self.max_tracks = max_tracks
+        self.data = np.ndarray((1 + STATUS_SLOTS * self.slot_size,), dtype='float64', buffer=buf)
+        self.slots = self.data[1:].reshape(STATUS_SLOTS, self.slot_size)
+
+    @staticmethod
+    def size(max_tracks=MAX_TRACKS):
+        return 8 * (1 + STATUS_SLOTS * (STATUS_FIELDS + max_tracks))
+
+    def write(self, playhead, audible, master_l, master_r, master_peak, is_playing, dsp_load, draft_active, xruns, peaks):
+        counter = int(self.data[0])
+        slot = self.slots[counter % STATUS_SLOTS]
+        n = min(len(peaks), self.max_tracks)
+
+        slot[0] = -1.0
+        slot[1:STATUS_FIELDS] = (playhead, audible, master_l, master_r, master_peak, is_playing, dsp_load, draft_active, xruns, n)
+        slot[STATUS_FIELDS:STATUS_FIELDS + n] = peaks[:n]
+        slot[0] = counter
+        self.data[0] = counter + 1
+
+    def read(self):
+        counter = int(self.data[0]) - 1
+        if counter < 0:
+            return None
+        slot = self.slots[counter % STATUS_SLOTS]
+        values = slot.copy()
+        if slot[0] != counter or values[0] != counter:
+            return None # Overwritten while copying, try again next tick
+        return values
+
+class EngineServer:
+    def __init__(self, conn, status_name, max_tracks=MAX_TRACKS):
+        self.conn = conn
+        self.status_shm = _attach(status_name)
+        self.ring = StatusRing(self.status_shm.buf, max_tracks)
+        self.engine = AudioEngine()
+        self.running = True
+
+        self.sources = {} # source_id -> (SharedMemory or None if mapped, ndarray)
+        self.retired = [] # (SharedMemory, weakref to its ndarray) dropped but maybe still read
+        self.tracks = {} # track_id -> AudioTrackData
+        self.effects = {} # effect_id -> AudioEffect (keeps DSP state across edits)
+        self.peaks = np.zeros(max_tracks)
+
+    def serve(self):
+        while self.running:
+            while self.conn.poll(0.01):
+                message = self.conn.recv()
+                getattr(self, "on_" + message[0])(*message[1:])
+                if not self.running: break
+
+            self.engine.tick()
+            self.release_sources()
+            self.publish_status()
+
+        self.engine.shutdown()
+        self.engine.tracks = []
+        self.tracks = {}
+        for shm, _ in self.sources.values():
+            if shm is not None:
+                self.retired.append((shm, None))
+        self.sources = {}
+        self.release_sources()
+        self.status_shm.close()
+
+    def publish_status(self):
+        engine = self.engine
+        tracks = engine.tracks
+        n = min(len(tracks), len(self.peaks))
+        for i in range(n):
+            self.peaks[i] = engine.track_peaks.get(tracks[i], 0.0)
+
+        self.ring.write(
+            engine.playhead, engine.get_audible_sample(),
+            engine.master_peak_L, engine.master_peak_R, engine.master_peak,
+            1.0 if engine.is_playing else 0.0, engine.dsp_load,
+            1.0 if engine.draft_active else 0.0, engine.xruns, self.peaks[:n]
+        )
+
+    # Messages
+
+    def on_source(self, source_id, shm_name, shape, dtype):
+        shm = _attach(shm_name)
+        data = np.ndarray(shape, dtype=dtype, buffer=shm.buf)
+        self.sources[source_id] = (shm, data)
+
+    def on_mapped_source(self, source_id, file_path, offset, shape):
+        # Memory-mapped source, mapped again here instead of copied
+        try:
+            data = np.memmap(file_path, dtype='<f4', mode='r', offset=offset, shape=tuple(shape))
+        except (OSError, ValueError) as e:
+            # Evicted by another instance sharing the cache: ask for a copy
+            print(f"[EngineServer] Could not map {file_path}: {e}")
+            self.conn.send(("unmapped_source", source_id))
+            return
+        self.sources[source_id] = (None, data)
+
+    def on_drop_source(self, source_id):
+        entry = self.sources.pop(source_id, None)
+        if entry is not None and entry[0] is not None:
+            # Clips, or a callback in the middle of a block, may still read
+            # the array. Closed once the last of them has let go.
+            self.retired.append((entry[0], weakref.ref(entry[1])))
+
+    def release_sources(self):
+        for item in list(self.retired):
+            shm, data_ref = item
+            if data_ref is not None and data_ref() is not None: continue
+            try:
+                shm.close()
+            except BufferError:
+                continue # A view of the buffer is still alive
+            self.retired.remove(item)
+
+    def on_track(self, state):
+        track_id, volume, pan, is_muted, is_soloed, fx_bypass, pipelined, clips, effects = state
+
+        track = self.tracks.get(track_id)
+        if track is None:
+            track = AudioTrackData(str(track_id), None, None, self.engine.sample_rate)
+            self.tracks[track_id] = track
+
+        track.volume = volume
+        track.pan = pan
+        track.is_muted = is_muted
+        solo_changed = track.is_soloed != is_soloed
+        track.is_soloed = is_soloed
+        track.fx_bypass = fx_bypass
+        track.pipelined = pipelined
+        track.effects = self._build_effects(effects)
+
+        new_clips = []
+        for source_id, start_time, start_offset, duration in clips:
+            source = self.sources.get(source_id)
+            if source is None: continue
+            new_clips.append(AudioClip(source[1], start_time, start_offset, duration, ""))
+        track.clips = new_clips
+
+        if solo_changed:
+            self.engine.loop_cache.invalidate() # Solo changes what every track sounds like
+        else:
+            self.engine.loop_cache.mark_dirty(track)
+        self.engine.batch_mixer.invalidate()
+        self._prune_effects()
+
+    def on_master(self, state):
+        volume, pan, fx_bypass, effects = state
+        master = self.engine.master_track
+        master.volume = volume
+        master.pan = pan
+        master.fx_bypass = fx_bypass
+        master.effects = self._build_effects(effects)
+        self._prune_effects()
+
+    def on_order(self, track_ids):
+        self.engine.tracks = [self.tracks[t] for t in track_ids if t in self.tracks]
+        for track_id in list(self.tracks):
+            if track_id not in track_ids:
+                self.engine.forget_track(self.tracks.pop(track_id))
+        self.engine.loop_cache.invalidate()
+        self.engine.batch_mixer.invalidate()
+        self._prune_effects()
+
+    def on_transport(self, action, *args):
+        engine = self.engine
+        if action == "play":
+            engine.start_playback()
+        elif action == "pause":
+            engine.pause_playback()
+            self.conn.send(("playhead", engine.playhead))
+        elif action == "stop":
+            engine.stop_playback()
+        elif action == "seek":
+            engine.playhead = args[0]
+
+    def on_loop(self, enabled, region):
+        self.engine.set_loop_region(region)
+        self.engine.set_looping(enabled)
+
+    def on_draft(self, mode):
+        self.engine.set_draft_mode(mode)
+
+    def on_bpm(self, bpm):
+        self.engine.set_bpm(bpm)
+
+    def on_quit(self):
+        self.running = False
+
+    def _build_effects(self, effects):
+        chain = []
+        for effect_id, type_name, active, parameters in effects:
+            effect = self.effects.get(effect_id)
+            if effect is None:
+                effect = create_effect(type_name)
+                if effect is None: continue
+                self.effects[effect_id] = effect
+            effect.active = active
+            for name, value in parameters:
+                if effect.parameters.get(name) != value:
+                    effect.parameters[name] = value
+                    effect.revision += 1
+            chain.append(effect)
+        return chain
+
+    def _prune_effects(self):
+        # Forget effects no chain uses any more
+        used = {id(e) for e in self.engine.master_track.effects}
+        for track in self.tracks.values():
+            used.update(id(e) for e in track.effects)
+        for effect_id, effect in list(self.effects.items()):
+            if id(effect) not in used:
+                del self.effects[effect_id]
+
+def run_engine_server(conn, status_name, max_tracks=MAX_TRACKS):
+    EngineServer(conn, status_name, max_tracks).serve()
+
+class RemoteAudioEngine(AudioEngine):
+    # GUI-side stand-in for AudioEngine. The model (tracks, clips, effects)
+    # stays here and is edited as usual; changes are diffed and sent to the
+    # engine process, which owns the audio stream. Exports still render
+    # locally.
+    def __init__(self, max_tracks=MAX_TRACKS):
+        super().__init__()
+        self.max_tracks = max_tracks
+        if self.rt_checker is not None: # The callback runs in the server process
+            self.rt_checker.close()
+            self.rt_checker = None
+        if self.profiler is not None: # Same for the profiler
+            self.stop_profiler()
+
+        self.status_shm = shared_memory.SharedMemory(create=True, size=StatusRing.size(max_tracks))
+        self.ring = StatusRing(self.status_shm.buf, max_tracks)
+        self.ring.data[:] = 0.0
+
+        ctx = mp.get_context("spawn") # Never fork a Qt process
+        self.conn, child_conn = ctx.Pipe()
+        self.process = ctx.Process(
+            target=run_engine_server,
+            args=(child_conn, self.status_shm.name, max_tracks),
+            daemon=True
+        )
+        self.process.start()
+        print(f"Engine server started (pid {self.process.pid})")
+
+        self._ids = itertools.count(1)
+        self._object_ids = {} # id(obj) -> (obj, remote id)
+        self._sources = {} # source_id -> (ndarray, SharedMemory or None if mapped)
+        self._sent_tracks = {} # track_id -> state
+        self._sent_order = []
+        self._sent_master = None
+        self._order_tracks = [] # Track objects in the order the server knows them
+
+    def _remote_id(self, obj):
+        entry = self._object_ids.get(id(obj))
+        if entry is None or entry[0] is not obj:
+            entry = (obj, next(self._ids))
+            self._object_ids[id(obj)] = entry
+        return entry[1]
+
+    def _send(self, *message):
+        try:
+            self.conn.send(message)
+        except (BrokenPipeError, OSError):
+            print("Engine server is not running")
+
+    # Model sync
+
+    def _mapped_offset(self, data):
+        # Byte offset of a memmap view in its file. numpy keeps the offset
+        # of the map a slice was taken from, so it is recomputed from the
+        # data pointers. None if the server cannot map it the same way.
+        if not isinstance(data, np.memmap) or not data.filename:
+            return None
+        if data.dtype != np.dtype('<f4') or not data.flags.c_contiguous:
+            return None
+        root = data
+        while isinstance(root.base, np.memmap):
+            root = root.base
+        return root.offset + (data.__array_interface__['data'][0] - root.__array_interface__['data'][0])
+
+    def _share_source(self, data):
+        source_id = self._remote_id(data)
+        offset = self._mapped_offset(data) if source_id not in self._sources else None
+        if offset is not None:
+            self._sources[source_id] = (data, None)
+            self._send("mapped_source", source_id, data.filename, offset, data.shape)
+        elif source_id not in self._sources:
+            self._copy_source(source_id, data)
+        return source_id
+
+    def _copy_source(self, source_id, data):
+        array = np.ascontiguousarray(data, dtype='float32')
+        shm = shared_memory.SharedMemory(create=True, size=max(1, array.nbytes))
+        np.ndarray(array.shape, dtype=array.dtype, buffer=shm.buf)[:] = array
+        self._sources[source_id] = (data, shm)
+        self._send("source", source_id, shm.name, array.shape, str(array.dtype))
+
+    def _on_reply(self, message):
+        if message[0] == "unmapped_source":
+            # The server could not open the file, send the audio itself and
+            # the tracks again, their clips on it were skipped
+            entry = self._sources.get(message[1])
+            if entry is not None and entry[1] is None:
+                self._copy_source(message[1], entry[0])
+                self._sent_tracks.clear()
+
+    def _receive(self, wanted=None, timeout=0.0):
+        # Handles replies from the server, returns the first `wanted` one
+        try:
+            while self.conn.poll(timeout):
+                message = self.conn.recv()
+                if message[0] == wanted:
+                    return message
+                self._on_reply(message)
+        except (EOFError, OSError):
+            pass
+        return None
+
+    def _effects_state(self, effects):
+        return tuple(
+            (self._remote_id(e), e.__class__.__name__, e.active, tuple(sorted(e.parameters.items())))
+            for e in effects
+        )
+
+    def _track_state(self, track):
+        clips = tuple(
+            (self._share_source(c.data), c.start_time, c.start_offset, c.duration)
+            for c in track.clips if c.data is not None
+        )
+        return (
+            self._remote_id(track), track.volume, track.pan, track.is_muted, track.is_soloed,
+            getattr(track, 'fx_bypass', False), getattr(track, 'pipelined', False),
+            clips, self._effects_state(track.effects)
+        )
+
+    def sync(self):
+        used_sources = set()
+        order = []
+        for track in self.tracks:
+            state = self._track_state(track)
+            track_id = state[0]
+            order.append(track_id)
+            used_sources.update(c[0] for c in state[7])
+            if self._sent_tracks.get(track_id) != state:
+                self._sent_tracks[track_id] = state
+                self._send("track", state)
+
+        if order != self._sent_order:
+            self._sent_order = order
+            self._send("order", order)
+            for track_id in list(self._sent_tracks):
+                if track_id not in order:
+                    del self._sent_tracks[track_id]
+        self._order_tracks = list(self.tracks)
+
+        master = self.master_track
+        master_state = (master.volume, master.pan, getattr(master, 'fx_bypass', False), self._effects_state(master.effects))
+        if master_state != self._sent_master:
+            self._sent_master = master_state
+            self._send("master", master_state)
+
+        # Release audio no clip refers to anymore
+        for source_id in list(self._sources):
+            if source_id not in used_sources:
+                data, shm = self._sources.pop(source_id)
+                self._send("drop_source", source_id)
+                if shm is not None:
+                    shm.close()
+                    shm.unlink()
+
+        # Forget tracks, effects and sources the server no longer gets, so
+        # they can be freed and a recycled id() never matches a stale entry
+        sent = set(order) | used_sources
+        for track_id in order:
+            sent.update(e[0] for e in self._sent_tracks[track_id][8])
+        sent.update(e[0] for e in master_state[3])
+        for key, (obj, remote_id) in list(self._object_ids.items()):
+            if remote_id not in sent:
+                del self._object_ids[key]
+
+    def poll_status(self):
+        values = self.ring.read()
+        if values is None:
+            return
+
+        self.playhead = int(values[1])
+        self.audible_sample = int(values[2])
+        self.master_peak_L = float(values[3])
+        self.master_peak_R = float(values[4])
+        self.master_peak = float(values[5])
+        self.dsp_load = float(values[7])
+        self.draft_active = values[8] > 0.5
+        self.xruns = int(values[9])
+
+        n = min(int(values[10]), len(self._order_tracks))
+        for i in range(n):
+            self.track_peaks[self._order_tracks[i]] = float(values[STATUS_FIELDS + i])
+
+    # Engine API
+
+    def tick(self):
+        self._receive()
+        self.sync()
+        self.poll_status()
+
+    def on_command_applied(self, command):
+        self.sync()
+
+    def on_source_loaded(self, track):
+        self.sync() # Shares the new audio, drops the placeholder
+
+    def get_audible_sample(self):
+        if not self.is_playing:
+            return self.playhead
+        self.poll_status()
+        return getattr(self, 'audible_sample', self.playhead)
+
+    def start_playback(self):
+        if self.is_playing: return
+        self.sync()
+        self._send("transport", "seek", self.playhead)
+        self._send("transport", "play")
+        self.is_playing = True
+
+    def pause_playback(self):
+        if not self.is_playing: return
+        self.is_playing = False
+        self._send("transport", "pause")
+        reply = self._receive("playhead", 1.0)
+        if reply is not None:
+            self.playhead = reply[1]
+
+    def stop_playback(self):
+        self.is_playing = False
+        self.playhead = 0
+        self._send("transport", "stop")
+
+    def set_playhead(self, pixel_x, px_per_second=100):
+        super().set_playhead(pixel_x, px_per_second)
+        self._send("transport", "seek", self.playhead)
+
+    def set_looping(self, enabled):
+        super().set_looping(enabled)
+        self._send("loop", self.is_looping, self.loop_region)
+
+    def set_loop_region(self, region):
+        super().set_loop_region(region)
+        self._send("loop", self.is_looping, self.loop_region)
+
+    def set_draft_mode(self, mode):
+        super().set_draft_mode(mode)
+        self._send("draft", self.draft_mode)
+
+    def set_bpm(self, bpm):
+        super().set_bpm(bpm)
+        self._send("bpm", self.bpm)
+
+    def prepare_loop_head(self):
+        pass # Done by the engine process
+
+    def start_profiler(self):
+        print("The audio thread runs in the engine server, profile it with PYDAW_PROFILE=1")
+        return None
+
+    def shutdown(self):
+        self._send("quit")
+        self.process.join(2.0)
+        if self.process.is_alive():
+            self.process.terminate()
+
+        for data, shm in self._sources.values():
+            if shm is not None:
+                shm.close()
+                shm.unlink()
+        self._sources = {}
+        self.ring = None
+        self.status_shm.close()
+        self.status_shm.unlink()
@@ -0,0 +1,173 @@
+from collections import deque
+import numpy as np
+
+class LoopRenderCache:
+    IDLE = 0
+    RECORDING = 1
+    READY = 2
+
+    PEAK_BUCKET = 1024 # samples per metering bucket
+
+    def __init__(self, max_bytes=256 * 1024 * 1024):
+        self.max_bytes = max_bytes
+        self.state = self.IDLE
+        self.loop_start = 0
+        self.loop_end = 0
+        self.record_pos = 0
+
+        self.buffer = None # Post-fader sum of the clean tracks
+        self.peaks = None # (buckets, clean tracks)
+        self.clean_tracks = []
+        self.clean_index = {}
+        self.live_tracks = set() # Tracks being edited, always rendered
+        self.fx_revisions = []
+
+        # While a stream renders from the cache, the audio thread may be
+        # between is_clean() and write() of a track. Requests from other
+        # threads are then only applied by apply_pending() at block start.
+        self.streaming = False
+        self.pending_reset = False
+        self.pending_invalidate = False
+        self.pending_dirty = deque()
+
+    def reset(self):
+        self.pending_reset = True
+        if not self.streaming: self.apply_pending()
+
+    def invalidate(self):
+        self.pending_invalidate = True
+        if not self.streaming: self.apply_pending()
+
+    def mark_dirty(self, track):
+        self.pending_dirty.append(track)
+        if not self.streaming: self.apply_pending()
+
+    def apply_pending(self):
+        # Flags are cleared first, requests posted meanwhile wait for the
+        # next block
+        if self.pending_reset:
+            self.pending_reset = False
+            self._reset()
+        while self.pending_dirty:
+            self._mark_dirty(self.pending_dirty.popleft())
+        if self.pending_invalidate:
+            self.pending_invalidate = False
+            self._invalidate()
+
+    def _reset(self):
+        # Loop changed: drop everything, including the edit history
+        self._invalidate()
+        self.live_tracks = set()
+        self.buffer = None
+        self.peaks = None
+
+    def _invalidate(self):
+        self.state = self.IDLE
+        self.record_pos = 0
+        self.clean_tracks = []
+        self.clean_index = {}
+        self.fx_revisions = []
+
+    def _mark_dirty(self, track):
+        if track in self.live_tracks:
+            return
+        self.live_tracks.add(track)
+        if track in self.clean_index:
+            # The cached sum contains this track, it has to be recorded again
+            self._invalidate()
+
+    def is_clean(self, track):
+        return track in self.clean_index
+
+    def memory_usage(self):
+        total = 0
+        if self.buffer is not None: total += self.buffer.nbytes
+        if self.peaks is not None: total += self.peaks.nbytes
+        return total
+
+    # Recording
+
+    def begin(self, tracks, loop_start, loop_end, sample_rate):
+        loop_len = loop_end - loop_start
+        if loop_len <= 0:
+            return False
+
+        clean = [t for t in tracks if t not in self.live_tracks and self.tail_fits(t, loop_len, sample_rate)]
+        if not clean:
+            return False
+
+        num_buckets = (loop_len + self.PEAK_BUCKET - 1) // self.PEAK_BUCKET
+        needed = loop_len * 2 * 4 + num_buckets * len(clean) * 4
+        if needed > self.max_bytes:
+            return False # Loop too long for the memory bound
+
+        if self.buffer is None or len(self.buffer) != loop_len:
+            self.buffer = np.zeros((loop_len, 2), dtype='float32')
+        else:
+            self.buffer.fill(0.0)
+        self.peaks = np.zeros((num_buckets, len(clean)), dtype='float32')
+
+        self.loop_start = loop_start
+        self.loop_end = loop_end
+        self.record_pos = 0
+        self.clean_tracks = clean
+        self.clean_index = {t: i for i, t in enumerate(clean)}
+        self.fx_revisions = [(e, e.revision, t) for t in clean for e in getattr(t, 'effects', [])]
+        self.state = self.RECORDING
+        return True
+
+    def tail_fits(self, track, loop_len, sample_rate):
+        # A recorded pass holds the tail of the pass before it. Tails longer
+        # than the loop also carry the passes before that, so such tracks
+        # are always rendered live.
+        if getattr(track, 'fx_bypass', False):
+            return True
+        tail = sum(e.get_tail_length(sample_rate) for e in getattr(track, 'effects', []) if e.active)
+        return tail <= loop_len
+
+    def is_recording_at(self, start_sample):
+        return self.state == self.RECORDING and start_sample == self.loop_start + self.record_pos
+
+    def write(self, track, start_sample, contribution, peak):
+        offset = start_sample - self.loop_start
+        self.buffer[offset:offset + len(contribution)] += contribution
+
+        idx = self.clean_index[track]
+        first = offset // self.PEAK_BUCKET
+        last = (offset + len(contribution) - 1) // self.PEAK_BUCKET + 1
+        column = self.peaks[first:last, idx]
+        np.maximum(column, peak, out=column)
+
+    def advance(self, num_frames):
+        self.record_pos += num_frames
+        if self.record_pos >= self.loop_end - self.loop_start:
+            self.state = self.READY
+
+    # Playback
+
+    def covers(self, start_sample, num_frames, loop_start, loop_end):
+        if self.state != self.READY:
+            return False
+        if loop_start != self.loop_start or loop_end != self.loop_end:
+            self._reset()
+            return False
+        if start_sample < self.loop_start or start_sample + num_frames > self.loop_end:
+            return False
+
+        # Parameter tweaks that did not go through a command
+        for effect, revision, track in self.fx_revisions:
+            if effect.revision != revision:
+                self._mark_dirty(track)
+                return False
+        return True
+
+    def read(self, start_sample, num_frames, track_peaks):
+        offset = start_sample - self.loop_start
+
+        first = offset // self.PEAK_BUCKET
+        last = (offset + num_frames - 1) // self.PEAK_BUCKET + 1
+        block_peaks = np.max(self.peaks[first:last], axis=0)
+        for track, peak in zip(self.clean_tracks, block_peaks):
+            track_peaks[track] = float(peak)
+
+        return self.buffer[offset:offset + num_frames]
@@ -18,6 +18,7 @@ class AudioTrackData:
         self.is_soloed = False
         self.effects = [] # List of AudioEffect objects
         self.fx_bypass = False
+        self.pipelined = False # Run the effect chain as a multi-core pipeline
         self.volume = 1.0
         self.pan = 0.0
         self.color = "#4466aa" # Default color
@@ -0,0 +1,187 @@
+import struct
+import numpy as np
+
+# Waveform overview of a source: per-bucket minimum and maximum over all
+# channels (and optionally RMS). Built in one pass over the decoded audio,
+# a chunk of whole buckets at a time, so the temporaries stay bounded no
+# matter how long the file is.
+
+PEAKS_PER_SECOND = 100
+CHUNK_BUCKETS = 2048 # Buckets reduced per vectorized step
+
+class Peaks:
+    def __init__(self, mins, maxs, rms, rate):
+        self.mins = mins
+        self.maxs = maxs
+        self.rms = rms # None unless requested
+        self.rate = rate # Buckets per second of audio
+
+    def __len__(self):
+        return len(self.maxs)
+
+class PeakBuilder:
+    def __init__(self, sample_rate, per_second=PEAKS_PER_SECOND, rms=False):
+        self.bucket = max(1, int(sample_rate / per_second))
+        self.rate = sample_rate / self.bucket
+        self.with_rms = rms
+        self.mins = []
+        self.maxs = []
+        self.rms = []
+        self.carry = None # Frames short of a whole bucket from the last add
+
+    def add(self, chunk):
+        # Chunks may be any length, partial buckets carry over to the next add
+        if self.carry is not None:
+            chunk = np.concatenate([self.carry, chunk])
+            self.carry = None
+        whole = len(chunk) // self.bucket * self.bucket
+        step = CHUNK_BUCKETS * self.bucket
+        for start in range(0, whole, step):
+            end = min(start + step, whole)
+            self._reduce(chunk[start:end].reshape(-1, self.bucket * chunk.shape[1]))
+        if whole < len(chunk):
+            self.carry = chunk[whole:].copy()
+
+    def _reduce(self, blocks):
+        # One row per bucket, channels interleaved within the row
+        self.mins.append(blocks.min(axis=1))
+        self.maxs.append(blocks.max(axis=1))
+        if self.with_rms:
+            self.rms.append(np.sqrt(np.einsum('ij,ij->i', blocks, blocks) / blocks.shape[1]))
+
+    def finish(self):
+        if self.carry is not None:
+            self._reduce(self.carry.reshape(1, -1))
+            self.carry = None
+        mins = np.concatenate(self.mins).astype('float32') if self.mins else np.zeros(0, dtype='float32')
+        maxs = np.concatenate(self.maxs).astype('float32') if self.maxs else np.zeros(0, dtype='float32')
+        rms = None
+        if self.with_rms:
+            rms = np.concatenate(self.rms).astype('float32') if self.rms else np.zeros(0, dtype='float32')
+        return Peaks(mins, maxs, rms, self.rate)
+
+def build_peaks(data, sample_rate, per_second=PEAKS_PER_SECOND, rms=False):
+    data = np.asarray(data, dtype='float32')
+    if data.ndim == 1:
+        data = data[:, None]
+    builder = PeakBuilder(sample_rate, per_second, rms)
+    builder.add(data)
+    return builder.finish()
+
+# Peak pyramid: the finest level has a bucket of BASE_BUCKET samples, every
+# further level merges LEVEL_FACTOR buckets of the one below. Painting
+# picks the level with about one bucket per pixel, so the work follows the
+# number of visible pixels at any zoom; past the finest level it reads the
+# samples themselves.
+
+BASE_BUCKET = 16
+LEVEL_FACTOR = 4
+MIN_LEVEL_LENGTH = 64 # Stop once a level is this short
+
+def _merge(values, factor, reduce):
+    # Group `factor` neighbours, the short tail group repeats its last value
+    pad = -len(values) % factor
+    if pad:
+        values = np.concatenate([values, np.repeat(values[-1:], pad)])
+    return reduce(values.reshape(-1, factor), axis=1)
+
+def coarsen(peaks, factor=LEVEL_FACTOR):
+    rms = None
+    if peaks.rms is not None:
+        rms = np.sqrt(_merge(peaks.rms * peaks.rms, factor, np.mean)).astype('float32')
+    return Peaks(_merge(peaks.mins, factor, np.min), _merge(peaks.maxs, factor, np.max), rms, peaks.rate / factor)
+
+class PeakPyramid:
+    def __init__(self, levels):
+        self.levels = levels # Finest first
+
+    def __len__(self):
+        return len(self.levels[0])
+
+    def level_for(self, pixels_per_second):
+        # Coarsest level that still has a bucket per pixel, None when even
+        # the finest is too coarse and the samples should be read instead
+        if pixels_per_second > self.levels[0].rate:
+            return None
+        chosen = self.levels[0]
+        for level in self.levels:
+            if level.rate < pixels_per_second:
+                break
+            chosen = level
+        return chosen
+
+def build_pyramid(data, sample_rate, rms=True):
+    base = build_peaks(data, sample_rate, sample_rate / BASE_BUCKET, rms)
+    levels = [base]
+    while len(levels[-1]) > MIN_LEVEL_LENGTH:
+        levels.append(coarsen(levels[-1]))
+    return PeakPyramid(levels)
+
+def sample_peaks(data, sample_rate, start, end):
+    # Level built from the samples start:end, for zoom beyond the pyramid
+    block = np.asarray(data[start:end], dtype='float32')
+    if block.ndim == 1:
+        block = block[:, None]
+    return Peaks(block.min(axis=1), block.max(axis=1), None, sample_rate)
+
+def column_peaks(peaks, edges):
+    # Reduce the buckets of each pixel column. `edges` holds the first
+    # bucket of every column plus the end of the last one, and must start
+    # inside the level. A column narrower than a bucket repeats it.
+    first = int(edges[0])
+    last = min(max(int(edges[-1]), first + 1), len(peaks))
+    starts = np.minimum(edges[:-1], last - 1) - first
+    mins = np.minimum.reduceat(peaks.mins[first:last], starts)
+    maxs = np.maximum.reduceat(peaks.maxs[first:last], starts)
+    rms = None
+    if peaks.rms is not None:
+        squares = peaks.rms[first:last] * peaks.rms[first:last]
+        counts = np.maximum(np.diff(np.append(starts, last - first)), 1)
+        rms = np.sqrt(np.add.reduceat(squares, starts) / counts)
+    return mins, maxs, rms
+
+# Cache file: header, one (length, rate) record per level, then the float32
+# arrays of every level back to back (mins, maxs, rms). Everything is 4-byte
+# aligned, so reading maps the file once and takes views of it.
+
+FILE_MAGIC = b"PYDAWPK1"
+HEADER = struct.Struct("<8sII") # magic, level count, has rms
+LEVEL = struct.Struct("<Qd") # length, rate
+
+def write_pyramid(f, pyramid):
+    has_rms = pyramid.levels[0].rms is not None
+    f.write(HEADER.pack(FILE_MAGIC, len(pyramid.levels), int(has_rms)))
+    for level in pyramid.levels:
+        f.write(LEVEL.pack(len(level), level.rate))
+    for level in pyramid.levels:
+        f.write(np.ascontiguousarray(level.mins, dtype='<f4').tobytes())
+        f.write(np.ascontiguousarray(level.maxs, dtype='<f4').tobytes())
+        if has_rms:
+            f.write(np.ascontiguousarray(level.rms, dtype='<f4').tobytes())
+
+def read_pyramid(file_path):
+    # Memory-mapped pyramid, None if the file is not a valid cache entry
+    try:
+        raw = np.memmap(file_path, dtype=np.uint8, mode='r')
+        magic, count, has_rms = HEADER.unpack_from(raw, 0)
+        if magic != FILE_MAGIC:
+            return None
+        offset = HEADER.size
+        records = []
+        for _ in range(count):
+            records.append(LEVEL.unpack_from(raw, offset))
+            offset += LEVEL.size
+
+        levels = []
+        for length, rate in records:
+            arrays = []
+            for _ in range(3 if has_rms else 2):
+                end = offset + length * 4
+                if end > len(raw):
+                    return None # Truncated
+                arrays.append(raw[offset:end].view('<f4'))
+                offset = end
+            levels.append(Peaks(arrays[0], arrays[1], arrays[2] if has_rms else None, rate))
+        return PeakPyramid(levels) if levels else None
+    except (OSError, ValueError, struct.error):
+        return None
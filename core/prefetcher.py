@@ -0,0 +1,72 @@
+import threading
+import time
+import numpy as np
+
+# Keeps the pages of memory-mapped sources resident just ahead of the
+# playhead. A background thread reads one value per page of every mapped
+# clip in the lookahead window, so page faults happen here and not in the
+# audio callback. In-memory sources are skipped.
+
+PAGE_BYTES = 4096
+
+class SourcePrefetcher:
+    def __init__(self, engine, lookahead=2.0, interval=0.05):
+        self.engine = engine
+        self.lookahead = lookahead # Seconds ahead of the playhead
+        self.interval = interval
+        self.running = False
+        self.thread = None
+
+    def start(self):
+        if self.running: return
+        self.running = True
+        self.thread = threading.Thread(target=self.run, name="source-prefetch", daemon=True)
+        self.thread.start()
+
+    def stop(self):
+        self.running = False
+        if self.thread is not None:
+            self.thread.join(1.0)
+            self.thread = None
+
+    def run(self):
+        while self.running:
+            try:
+                self.prefetch()
+            except Exception as e:
+                # Tracks and clips change under us, the next pass sees the new state
+                print(f"[Prefetch] {e}")
+            time.sleep(self.interval)
+
+    def windows(self):
+        # Sample ranges playback reaches within the lookahead
+        engine = self.engine
+        start = engine.playhead
+        end = start + int(self.lookahead * engine.sample_rate)
+        if engine.is_looping and engine.loop_start_sample < engine.loop_end_sample <= end:
+            wrap = end - engine.loop_end_sample
+            return [(start, engine.loop_end_sample),
+                    (engine.loop_start_sample, engine.loop_start_sample + min(wrap, engine.loop_end_sample - engine.loop_start_sample))]
+        return [(start, end)]
+
+    def prefetch(self):
+        engine = self.engine
+        sample_rate = engine.sample_rate
+        windows = self.windows()
+        for track in list(engine.tracks):
+            for clip in list(track.clips):
+                data = clip.data
+                if not isinstance(data, np.memmap) or len(data) == 0: continue
+                clip_start = int(clip.start_time * sample_rate)
+                clip_end = clip_start + int(clip.duration * sample_rate)
+                source_offset = int(clip.start_offset * sample_rate) - clip_start
+                for window_start, window_end in windows:
+                    start = max(window_start, clip_start) + source_offset
+                    end = min(window_end, clip_end) + source_offset
+                    self.touch(data, max(start, 0), min(end, len(data)))
+
+    def touch(self, data, start, end):
+        if start >= end: return
+        stride = max(1, PAGE_BYTES // (data.shape[1] * data.itemsize))
+        # Summing forces every page of the strided read in
+        np.add.reduce(data[start:end:stride, 0])
@@ -2,15 +2,18 @@ import json
 import os
 from core.models import AudioTrackData
 from core.track_loader import TrackLoader
+from core.tracing import traced
 
 class ProjectManager:
     def __init__(self):
         pass
 
+    @traced("save_project", "project")
     def save_project(self, file_path, audio_engine):
         project_data = {
             "version": "1.0",
             "bpm": getattr(audio_engine, "bpm", 120),
+            "loop_region": getattr(audio_engine, "loop_region", None),
             "master": {
                 "volume": getattr(audio_engine.master_track, "volume", 1.0),
                 "pan": getattr(audio_engine.master_track, "pan", 0.0),
@@ -39,6 +42,7 @@ class ProjectManager:
                 "volume": getattr(track, "volume", 1.0), 
                 "pan": getattr(track, "pan", 0.0),
                 "fx_bypass": getattr(track, "fx_bypass", False),
+                "pipelined": getattr(track, "pipelined", False),
                 "color": getattr(track, "color", "#4466aa"), # Save color
                 "effects": [],
                 "clips": []
@@ -76,6 +80,7 @@ class ProjectManager:
     def load_project(self, file_path):
         return self.parse_project_file(file_path)
 
+    @traced("parse_project", "project")
     def parse_project_file(self, file_path):
         try:
             with open(file_path, 'r') as f:
@@ -0,0 +1,114 @@
+import math
+import numpy as np
+import scipy.signal
+
+# Streaming polyphase resampler. Produces the same output as
+# scipy.signal.resample_poly (same Kaiser FIR, same alignment), but consumes
+# the input in chunks and carries the filter history between them, so a
+# whole file can be resampled straight from the decoder with memory bounded
+# by the chunk size.
+
+READ_CHUNK = 65536 # Frames decoded per step
+GATHER_BLOCK = 4096 # Output frames per vectorized step, bounds the temporaries
+
+def design_filter(up, down, window=('kaiser', 5.0)):
+    # As resample_poly does it
+    max_rate = max(up, down)
+    half_len = 10 * max_rate
+    taps = scipy.signal.firwin(2 * half_len + 1, 1.0 / max_rate, window=window) * up
+    return taps, half_len
+
+class StreamingResampler:
+    def __init__(self, source_rate, target_rate, channels):
+        g = math.gcd(int(source_rate), int(target_rate))
+        self.up = int(target_rate) // g
+        self.down = int(source_rate) // g
+        self.channels = channels
+        self.total_in = 0
+        self.next_out = 0
+        self.passthrough = self.up == self.down
+        if self.passthrough: return
+
+        taps, self.delay = design_filter(self.up, self.down)
+        # Polyphase matrix: phase p uses taps p, p + up, p + 2*up, ...
+        self.num_taps = -(-len(taps) // self.up)
+        padded = np.zeros(self.num_taps * self.up)
+        padded[:len(taps)] = taps
+        self.phases = padded.reshape(self.num_taps, self.up).T.astype('float32')
+        self.tap_offsets = np.arange(self.num_taps)
+
+        # Input history, starting num_taps zeros before the first sample
+        self.history = np.zeros((self.num_taps, channels), dtype='float32')
+        self.history_start = -self.num_taps
+
+    def output_length(self, input_length):
+        return -(-input_length * self.up // self.down)
+
+    def process(self, chunk, limit=None):
+        chunk = np.asarray(chunk, dtype='float32')
+        if chunk.ndim == 1:
+            chunk = chunk[:, None]
+        if self.passthrough:
+            self.total_in += len(chunk)
+            self.next_out = self.total_in
+            return chunk.copy()
+        buffer = np.concatenate([self.history, chunk]) if len(chunk) else self.history
+        self.total_in += len(chunk)
+
+        # Outputs whose newest input sample has arrived
+        end = (self.total_in * self.up - 1 - self.delay) // self.down + 1
+        if limit is not None:
+            end = min(end, limit)
+        end = max(end, self.next_out)
+
+        output = np.empty((end - self.next_out, self.channels), dtype='float32')
+        for block_start in range(self.next_out, end, GATHER_BLOCK):
+            n = np.arange(block_start, min(block_start + GATHER_BLOCK, end))
+            position = n * self.down + self.delay
+            newest = position // self.up
+            index = newest[:, None] - self.tap_offsets[None, :] - self.history_start
+            weights = self.phases[position % self.up]
+            output[block_start - self.next_out:block_start - self.next_out + len(n)] = \
+                np.einsum('nk,nkc->nc', weights, buffer[index])
+        self.next_out = end
+
+        # Keep what the next outputs still reach back to
+        keep = min(len(buffer), self.num_taps)
+        self.history = buffer[len(buffer) - keep:].copy()
+        self.history_start = self.total_in - keep
+        return output
+
+    def flush(self):
+        # Remaining outputs, reading zeros past the end like resample_poly
+        total = self.output_length(self.total_in)
+        if self.passthrough or self.next_out >= total:
+            return np.zeros((0, self.channels), dtype='float32')
+        tail = -(-(self.delay + self.down) // self.up) + self.num_taps
+        consumed = self.total_in
+        output = self.process(np.zeros((tail, self.channels), dtype='float32'), limit=total)
+        self.total_in = consumed
+        return output
+
+def resample_blocks(sound_file, target_rate, chunk_frames=READ_CHUNK):
+    # Resampled blocks of an open soundfile.SoundFile, as they are decoded
+    resampler = StreamingResampler(sound_file.samplerate, target_rate, sound_file.channels)
+    for block in sound_file.blocks(blocksize=chunk_frames, dtype='float32', always_2d=True):
+        out = resampler.process(block)
+        if len(out):
+            yield out
+    out = resampler.flush()
+    if len(out):
+        yield out
+
+def resample_file(sound_file, target_rate, chunk_frames=READ_CHUNK):
+    # Decode and resample an open soundfile.SoundFile block by block into one
+    # preallocated float32 array
+    channels = sound_file.channels
+    length = StreamingResampler(sound_file.samplerate, target_rate, channels).output_length(sound_file.frames)
+    output = np.empty((length, channels), dtype='float32')
+
+    written = 0
+    for out in resample_blocks(sound_file, target_rate, chunk_frames):
+        output[written:written + len(out)] = out
+        written += len(out)
+    return output[:written]
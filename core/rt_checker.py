@@ -0,0 +1,189 @@
+import gc
+import io
+import os
+import sys
+import threading
+import traceback
+import tracemalloc
+
+# Debug-only checker for the audio callback. While a block renders it
+# watches memory (tracemalloc), explicit NumPy allocations and blocking
+# calls (a profile hook on the callback thread) and garbage collections.
+# Everything it finds is grouped by call site and reported with a stack.
+# Far too slow for normal use: enable with PYDAW_RT_CHECK=1.
+
+ALLOC_BUDGET = 4096 # Bytes a block may allocate (Python bookkeeping) before it counts
+
+NUMPY_ALLOC_FUNCS = {
+    "zeros", "ones", "empty", "full", "array",
+    "zeros_like", "ones_like", "empty_like", "full_like", "arange", "linspace",
+    "concatenate", "stack", "hstack", "vstack", "column_stack", "repeat", "tile",
+    "copy", "pad", "where", "clip", "abs", "maximum", "minimum", "outer",
+}
+NDARRAY_ALLOC_METHODS = {"copy", "astype", "flatten", "repeat", "tolist", "sum", "mean", "max", "min"}
+
+BLOCKING_BUILTINS = {"print", "open", "input", "sleep", "acquire", "wait", "join", "select", "poll"}
+BLOCKING_MODULES = ("queue.py", "threading.py", "logging" + os.sep, "subprocess.py", "socket.py")
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+class Finding:
+    def __init__(self, kind, name, site, stack):
+        self.kind = kind
+        self.name = name
+        self.site = site
+        self.stack = stack
+        self.count = 0
+        self.bytes = 0
+
+class RealtimeChecker:
+    def __init__(self, engine, budget=ALLOC_BUDGET):
+        self.engine = engine
+        self.budget = budget
+        self.findings = {} # (kind, name, site) -> Finding
+        self.blocks = 0
+        self.alloc_blocks = 0 # Blocks over the allocation budget
+        self.max_alloc = 0
+        self.gc_collections = 0
+        self.start_xruns = engine.xruns
+
+        self.thread = None
+        self.in_block = False
+        self.effect_stack = [] # (process frame, traced bytes at entry)
+        self.block_peak = 0
+
+        self.owns_tracing = not tracemalloc.is_tracing() # Someone else's tracing is left running
+        if self.owns_tracing:
+            tracemalloc.start(16)
+        gc.callbacks.append(self._on_gc)
+
+    def close(self):
+        if self._on_gc in gc.callbacks:
+            gc.callbacks.remove(self._on_gc)
+        if self.owns_tracing:
+            tracemalloc.stop()
+            self.owns_tracing = False
+
+    # Per block
+
+    def run(self, render, *args):
+        self.thread = threading.get_ident()
+        self.effect_stack = []
+        tracemalloc.reset_peak()
+        base, _ = tracemalloc.get_traced_memory()
+        self.block_peak = base
+        self.in_block = True
+        sys.setprofile(self._profile)
+        try:
+            render(*args)
+        finally:
+            sys.setprofile(None)
+            self.in_block = False
+            _, peak = tracemalloc.get_traced_memory()
+            self._end_block(max(self.block_peak, peak) - base)
+
+    def _end_block(self, allocated):
+        self.blocks += 1
+        self.max_alloc = max(self.max_alloc, allocated)
+        if allocated > self.budget:
+            self.alloc_blocks += 1
+
+    def _track_peak(self):
+        current, peak = tracemalloc.get_traced_memory()
+        self.block_peak = max(self.block_peak, peak)
+        tracemalloc.reset_peak()
+        return current
+
+    # Hooks
+
+    def _profile(self, frame, event, arg):
+        if event == "call":
+            code = frame.f_code
+            if code.co_name == "process" and self._is_effect(frame):
+                self.effect_stack.append((frame, self._track_peak()))
+            elif code.co_filename.endswith(BLOCKING_MODULES) and not self._caller_in(frame, BLOCKING_MODULES):
+                self._record("blocking", f"{os.path.basename(code.co_filename)}:{code.co_name}", frame.f_back)
+            elif os.sep + "numpy" + os.sep in code.co_filename and code.co_name in NUMPY_ALLOC_FUNCS \
+                    and not self._caller_in(frame, (os.sep + "numpy" + os.sep,)):
+                self._record("numpy", f"np.{code.co_name}", frame.f_back)
+        elif event == "return":
+            if self.effect_stack and self.effect_stack[-1][0] is frame:
+                _, entry = self.effect_stack.pop()
+                _, peak = tracemalloc.get_traced_memory()
+                self.block_peak = max(self.block_peak, peak)
+                allocated = peak - entry
+                if allocated > self.budget:
+                    effect = frame.f_locals.get("self")
+                    finding = self._record("effect-alloc", getattr(effect, "name", "?"), frame)
+                    finding.bytes = max(finding.bytes, allocated)
+        elif event == "c_call":
+            name = getattr(arg, "__name__", "")
+            owner = getattr(arg, "__self__", None)
+            module = getattr(arg, "__module__", None) or type(owner).__module__
+            if name in BLOCKING_BUILTINS and module in ("builtins", "time", "_thread", "select", None):
+                self._record("blocking", name, frame)
+            elif isinstance(owner, io.IOBase) and name in ("write", "read", "flush", "readline"):
+                self._record("blocking", f"file.{name}", frame)
+            elif module == "numpy" and name in NUMPY_ALLOC_FUNCS:
+                self._record("numpy", f"np.{name}", frame)
+            elif type(owner).__name__ == "ndarray" and name in NDARRAY_ALLOC_METHODS:
+                self._record("numpy", f"ndarray.{name}", frame)
+
+    def _on_gc(self, phase, info):
+        if phase != "start" or not self.in_block or threading.get_ident() != self.thread:
+            return
+        self.gc_collections += 1
+        self._record("gc", f"generation {info.get('generation')}", sys._getframe(1))
+
+    def _outside_checker(self, frame):
+        while frame is not None and frame.f_code.co_filename == __file__:
+            frame = frame.f_back
+        return frame
+
+    def _is_effect(self, frame):
+        from core.effects.base import AudioEffect
+        return isinstance(frame.f_locals.get("self"), AudioEffect)
+
+    def _caller_in(self, frame, markers):
+        caller = frame.f_back
+        return caller is not None and any(m in caller.f_code.co_filename for m in markers)
+
+    def _record(self, kind, name, frame):
+        # Group by the innermost frame in our own code
+        frame = self._outside_checker(frame)
+        site_frame = frame
+        while site_frame is not None and not site_frame.f_code.co_filename.startswith(REPO_ROOT):
+            site_frame = site_frame.f_back
+        if site_frame is None:
+            site_frame = frame
+        site = f"{os.path.relpath(site_frame.f_code.co_filename, REPO_ROOT)}:{site_frame.f_lineno}"
+
+        key = (kind, name, site)
+        finding = self.findings.get(key)
+        if finding is None:
+            finding = Finding(kind, name, site, traceback.format_stack(frame, limit=10))
+            self.findings[key] = finding
+        finding.count += 1
+        return finding
+
+    # Results
+
+    def violations(self):
+        return len(self.findings) + self.alloc_blocks + (self.engine.xruns - self.start_xruns)
+
+    def report(self, stacks=True):
+        out = io.StringIO()
+        xruns = self.engine.xruns - self.start_xruns
+        print(f"Real-time check: {self.blocks} blocks, {self.alloc_blocks} over the {self.budget} byte "
+              f"allocation budget (max {self.max_alloc} bytes), {self.gc_collections} GC runs, {xruns} xruns", file=out)
+
+        order = {"effect-alloc": 0, "numpy": 1, "blocking": 2, "gc": 3}
+        findings = sorted(self.findings.values(), key=lambda f: (order.get(f.kind, 9), -f.count))
+        for finding in findings:
+            per_block = finding.count / max(1, self.blocks)
+            extra = f", up to {finding.bytes} bytes" if finding.bytes else ""
+            print(f"  [{finding.kind}] {finding.name} at {finding.site}: {finding.count}x ({per_block:.1f}/block{extra})", file=out)
+            if stacks:
+                for line in finding.stack:
+                    out.write("      " + line.replace("\n", "\n      ").rstrip(" "))
+        return out.getvalue()
@@ -0,0 +1,64 @@
+import os
+import weakref
+from core.models import AudioTrackData
+
+# Session-wide pool of loaded sources, keyed by file identity and rate.
+# Entries are weak: tracks, clips and the undo history hold the audio and
+# peaks, and when the last of them lets go Python frees the arrays and the
+# entry disappears with them. While anything still uses a source, loading
+# the same file again returns the same arrays instead of a second copy.
+
+def sample_key(file_path, target_sr):
+    try:
+        st = os.stat(file_path)
+    except OSError:
+        return None
+    return (os.path.realpath(file_path), st.st_size, st.st_mtime_ns, target_sr)
+
+def share(track_data):
+    # New track object on the same audio and peaks
+    shared = AudioTrackData(
+        name=track_data.name,
+        file_path=track_data.file_path,
+        data=track_data.source_data,
+        sample_rate=track_data.sample_rate
+    )
+    shared.waveform = track_data.waveform
+    return shared
+
+class SamplePool:
+    def __init__(self):
+        self.entries = {} # key -> (weakref to data, weakref to waveform or None, AudioTrackData fields)
+
+    def get(self, key):
+        # AudioTrackData sharing a live source, or None
+        entry = self.entries.get(key)
+        if entry is None:
+            return None
+        data_ref, waveform_ref, (name, file_path, sample_rate) = entry
+        data = data_ref()
+        waveform = waveform_ref() if waveform_ref is not None else None
+        if data is None or (waveform_ref is not None and waveform is None):
+            return None
+        track_data = AudioTrackData(name=name, file_path=file_path, data=data, sample_rate=sample_rate)
+        track_data.waveform = waveform
+        return track_data
+
+    def add(self, key, track_data):
+        if key is None: return
+
+        def release(ref, key=key):
+            # May run on whichever thread dropped the last reference
+            entry = self.entries.get(key)
+            if entry is not None and ref in (entry[0], entry[1]):
+                self.entries.pop(key, None)
+
+        data_ref = weakref.ref(track_data.source_data, release)
+        waveform_ref = weakref.ref(track_data.waveform, release) if track_data.waveform is not None else None
+        self.entries[key] = (data_ref, waveform_ref, (track_data.name, track_data.file_path, track_data.sample_rate))
+
+    def stats(self):
+        # (live sources, bytes they hold)
+        live = [entry[0]() for entry in list(self.entries.values())]
+        live = [data for data in live if data is not None]
+        return len(live), sum(data.nbytes for data in live)
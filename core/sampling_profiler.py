@@ -0,0 +1,98 @@
+import sys
+import threading
+import time
+from collections import Counter
+
+# Statistical profiler for the audio threads. A background thread wakes up
+# every few milliseconds, reads the current stack of the audio callback
+# thread and the pipeline stage threads (sys._current_frames) and counts
+# each stack. Nothing runs on the audio threads themselves, so timings stay
+# realistic. Output is the folded format flamegraph.pl / speedscope read:
+#
+#   audio;core/audio_engine.py:audio_callback;...;core/effects/eq.py:process 42
+
+class SamplingProfiler:
+    def __init__(self, engine, interval=0.005):
+        self.engine = engine
+        self.interval = interval
+        self.stacks = Counter()
+        self.samples = 0
+        self.labels = {} # code object -> "file:function"
+        self.running = False
+        self.thread = None
+
+    def start(self):
+        if self.running: return
+        self.running = True
+        self.thread = threading.Thread(target=self.run, name="sampling-profiler", daemon=True)
+        self.thread.start()
+
+    def stop(self):
+        self.running = False
+        if self.thread is not None:
+            self.thread.join(1.0)
+            self.thread = None
+
+    def _targets(self):
+        targets = {}
+        callback_thread = self.engine.callback_thread
+        if callback_thread is not None:
+            targets[callback_thread] = "audio"
+        for thread in threading.enumerate():
+            if thread.name.startswith("fx-"): # Pipeline stages
+                targets[thread.ident] = "pipeline"
+        return targets
+
+    def _label(self, code):
+        label = self.labels.get(code)
+        if label is None:
+            path = code.co_filename.replace("\\", "/")
+            for marker in ("/core/", "/ui/", "/site-packages/", "/lib/python"):
+                index = path.rfind(marker)
+                if index >= 0:
+                    path = path[index + 1:]
+                    break
+            label = f"{path}:{code.co_name}"
+            self.labels[code] = label
+        return label
+
+    def run(self):
+        targets = self._targets()
+        last_refresh = time.perf_counter()
+        while self.running:
+            time.sleep(self.interval)
+
+            now = time.perf_counter()
+            callback_thread = self.engine.callback_thread
+            if now - last_refresh > 1.0 or (callback_thread is not None and callback_thread not in targets):
+                # Threads come and go with the stream and the pipelines
+                targets = self._targets()
+                last_refresh = now
+
+            frames = sys._current_frames()
+            for ident, root in targets.items():
+                frame = frames.get(ident)
+                if frame is None: continue # Thread is outside Python, idle
+                labels = []
+                while frame is not None:
+                    labels.append(self._label(frame.f_code))
+                    frame = frame.f_back
+                labels.append(root)
+                self.stacks[";".join(reversed(labels))] += 1
+                self.samples += 1
+            del frames
+
+    def folded(self):
+        return "".join(f"{stack} {count}\n" for stack, count in self.stacks.most_common())
+
+    def write_folded(self, file_path):
+        with open(file_path, "w") as f:
+            f.write(self.folded())
+        return self.samples
+
+    def top(self, count=15):
+        # Self time per function, for a quick look without a flame graph
+        leaves = Counter()
+        for stack, hits in self.stacks.items():
+            leaves[stack.rsplit(";", 1)[-1]] += hits
+        return leaves.most_common(count)
@@ -0,0 +1,144 @@
+import json
+import os
+import threading
+import time
+from functools import wraps
+
+# Opt-in span recorder that dumps to the Chrome Trace Event format
+# (chrome://tracing, Perfetto). Every thread writes into its own fixed-size
+# ring, so recording takes no lock and never grows memory; only the first
+# event of a new thread registers its ring.
+#
+#   start = tracer.start()          # 0.0 while tracing is off
+#   ...
+#   tracer.end("name", "cat", start)
+#
+# Enabled from the Performance menu or with PYDAW_TRACE=1.
+
+RING_SIZE = 32768 # Events kept per thread
+
+class TraceRing:
+    def __init__(self, capacity):
+        self.events = [None] * capacity
+        self.count = 0
+        self.thread_name = threading.current_thread().name
+
+    def add(self, event):
+        self.events[self.count % len(self.events)] = event
+        self.count += 1
+
+    def snapshot(self):
+        count = self.count
+        capacity = len(self.events)
+        if count <= capacity:
+            return self.events[:count]
+        split = count % capacity
+        return self.events[split:] + self.events[:split]
+
+class Tracer:
+    def __init__(self, capacity=RING_SIZE):
+        self.capacity = capacity
+        self.enabled = False
+        self.rings = {} # thread ident -> TraceRing
+        self.origin = time.perf_counter()
+
+    def enable(self):
+        self.enabled = True
+
+    def disable(self):
+        self.enabled = False
+
+    def clear(self):
+        self.rings = {}
+        self.origin = time.perf_counter()
+
+    def _ring(self):
+        ident = threading.get_ident()
+        ring = self.rings.get(ident)
+        if ring is None:
+            ring = TraceRing(self.capacity)
+            self.rings[ident] = ring
+        return ring
+
+    def start(self):
+        return time.perf_counter() if self.enabled else 0.0
+
+    def end(self, name, category, start, args=None):
+        if not start or not self.enabled: return
+        self.add(name, category, start, time.perf_counter(), args)
+
+    def add(self, name, category, start, end, args=None):
+        # For callers that already timed the span
+        self._ring().add((name, category, start, end, args))
+
+    def instant(self, name, category, args=None):
+        if not self.enabled: return
+        now = time.perf_counter()
+        self._ring().add((name, category, now, None, args))
+
+    def span(self, name, category, args=None):
+        return TraceSpan(self, name, category, args)
+
+    def to_chrome(self):
+        pid = os.getpid()
+        events = []
+        for ident, ring in list(self.rings.items()):
+            events.append({"name": "thread_name", "ph": "M", "pid": pid, "tid": ident,
+                           "args": {"name": ring.thread_name}})
+            for event in ring.snapshot():
+                if event is None: continue
+                name, category, start, end, args = event
+                entry = {
+                    "name": name, "cat": category, "pid": pid, "tid": ident,
+                    "ts": (start - self.origin) * 1e6,
+                }
+                if end is None:
+                    entry["ph"] = "i"
+                    entry["s"] = "t"
+                else:
+                    entry["ph"] = "X"
+                    entry["dur"] = (end - start) * 1e6
+                if args:
+                    entry["args"] = args
+                events.append(entry)
+        return {"traceEvents": events, "displayTimeUnit": "ms"}
+
+    def dump(self, file_path):
+        data = self.to_chrome()
+        with open(file_path, "w") as f:
+            json.dump(data, f)
+        return len(data["traceEvents"])
+
+class TraceSpan:
+    # Context manager for the non-real-time paths (UI, loading, saving)
+    def __init__(self, tracer, name, category, args):
+        self.tracer = tracer
+        self.name = name
+        self.category = category
+        self.args = args
+        self.start = 0.0
+
+    def __enter__(self):
+        self.start = self.tracer.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.tracer.end(self.name, self.category, self.start, self.args)
+        return False
+
+def traced(name, category):
+    # Decorator form of tracer.span
+    def decorate(function):
+        @wraps(function)
+        def wrapper(*args, **kwargs):
+            start = tracer.start()
+            try:
+                return function(*args, **kwargs)
+            finally:
+                tracer.end(name, category, start)
+        return wrapper
+    return decorate
+
+tracer = Tracer()
+if os.environ.get("PYDAW_TRACE") == "1":
+    tracer.enable()
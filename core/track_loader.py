@@ -1,11 +1,82 @@
-import numpy as np
 import soundfile as sf
-import scipy.signal
 import os
 from PySide6.QtCore import QThread, Signal
 from core.models import AudioTrackData 
+from core.tracing import tracer
+from core.resampling import resample_file, resample_blocks, READ_CHUNK
+from core.peaks import build_pyramid, write_pyramid, read_pyramid
+from core.disk_cache import DiskCache, cache_key, file_fingerprint
+from core.audio_cache import audio_cache_key, cached_audio, store_audio
+
+PEAK_CACHE_LIMIT = 512 << 20
+peak_cache = DiskCache("peaks", PEAK_CACHE_LIMIT, ".peaks")
+
+def peak_cache_key(file_path, target_sr):
+    st = os.stat(file_path)
+    return cache_key(os.path.abspath(file_path), st.st_size, st.st_mtime_ns, file_fingerprint(file_path), target_sr)
+
+def cached_peaks(file_path, target_sr):
+    # Peak pyramid from an earlier load of the same file, memory-mapped
+    try:
+        path = peak_cache.get(peak_cache_key(file_path, target_sr))
+    except OSError:
+        return None
+    return read_pyramid(path) if path else None
+
+def decode_blocks(sound_file, target_sr):
+    # Float32 blocks at the session rate, resampled while decoding if needed
+    if sound_file.samplerate == target_sr:
+        return sound_file.blocks(blocksize=READ_CHUNK, dtype='float32', always_2d=True)
+    return resample_blocks(sound_file, target_sr)
+
+def load_track(file_path, target_sr):
+    # Decode, resample and build the waveform. Runs on a worker thread,
+    # raises on unreadable files.
+    trace_args = {"file": os.path.basename(file_path)}
+    
+    # Sources are memory-mapped from the audio cache, decoded into it once.
+    # The user's own files are never mapped: another program truncating or
+    # rewriting one would crash the audio thread with SIGBUS.
+    start = tracer.start()
+    audio_key = audio_cache_key(file_path, target_sr)
+    data = cached_audio(audio_key, target_sr)
+    if data is not None:
+        tracer.end("map", "loader", start, trace_args)
+    else:
+        with sf.SoundFile(file_path) as sound_file:
+            data = store_audio(audio_key, decode_blocks(sound_file, target_sr), sound_file.channels, target_sr)
+        if data is None:
+            # Cache not writable: Load Audio into memory
+            with sf.SoundFile(file_path) as sound_file:
+                if sound_file.samplerate == target_sr:
+                    data = sound_file.read(dtype='float32', always_2d=True)
+                else:
+                    data = resample_file(sound_file, target_sr)
+        tracer.end("decode", "loader", start, trace_args)
+
+    # Min/max/RMS peak pyramid for the UI, built once per file
+    start = tracer.start()
+    peak_key = peak_cache_key(file_path, target_sr)
+    path = peak_cache.get(peak_key)
+    waveform = read_pyramid(path) if path else None
+    if waveform is None:
+        waveform = build_pyramid(data, target_sr)
+        peak_cache.put(peak_key, lambda f: write_pyramid(f, waveform))
+    tracer.end("waveform", "loader", start, trace_args)
+
+    # Create the Data Object
+    track_obj = AudioTrackData(
+        name=os.path.basename(file_path),
+        file_path=file_path,
+        data=data.astype('float32', copy=False),
+        sample_rate=target_sr
+    )
+    # Attach the peaks to the object
+    track_obj.waveform = waveform
+    return track_obj
 
 class TrackLoader(QThread):
+    # Single file on its own thread; batches go through core.decode_pool
     loaded = Signal(object) 
     failed = Signal(str)
 
@@ -16,48 +87,6 @@ class TrackLoader(QThread):
 
     def run(self):
         try:
-            # Load Audio
-            data, fs = sf.read(self.file_path, dtype='float32', always_2d=True)
-            
-            # Resample if needed
-            if fs != self.target_sr:
-                number_of_samples = round(len(data) * float(self.target_sr) / fs)
-                
-                try:
-                    # Attempt High-Quality Resampling
-                    data = scipy.signal.resample(data, number_of_samples)
-                except MemoryError:
-                    print("[TrackLoader] Low RAM fallback for resampling")
-                    indices = np.linspace(0, len(data) - 1, number_of_samples)
-                    left = np.interp(indices, np.arange(len(data)), data[:, 0])
-                    right = np.interp(indices, np.arange(len(data)), data[:, 1])
-                    data = np.column_stack((left, right))
-
-            # Generate Waveform for UI
-            step = int(self.target_sr / 100)
-            if step < 1: step = 1       # Safety check for very short sounds
-            
-            # Convert to Mono & Absolute value for visualization
-            mono_abs = np.mean(np.abs(data), axis=1)
-            
-            # Decimate (take every Nth sample)
-            waveform = mono_abs[::step]
-            
-            # Normalize waveform (0.0 to 1.0)
-            if np.max(waveform) > 0:
-                waveform = waveform / np.max(waveform)
-
-            # Create the Data Object
-            track_obj = AudioTrackData(
-                name=os.path.basename(self.file_path),
-                file_path=self.file_path,
-                data=data.astype('float32'),
-                sample_rate=self.target_sr
-            )
-            # Attach the calculated waveform to the object
-            track_obj.waveform = waveform
-
-            self.loaded.emit(track_obj)
-            
+            self.loaded.emit(load_track(self.file_path, self.target_sr))
         except Exception as e:
-            self.failed.emit(str(e))
\ No newline at end of file
+            self.failed.emit(str(e))
@@ -0,0 +1,77 @@
+# Time EQ3Band and SimpleDelay on the silent tail after a burst of noise.
+# Without protection the recursive state decays into denormals and the
+# per-block cost jumps; with it the tail costs the same as the signal.
+#
+#   python -m tools.bench_denormals [--no-flush] [--seconds 60]
+
+import argparse
+import time
+import numpy as np
+
+from core.effects import base
+from core.effects.eq import EQ3Band
+from core.effects.delay import SimpleDelay
+
+SAMPLE_RATE = 44100
+BLOCK = 2048
+
+def make_chain():
+    eq = EQ3Band()
+    eq.parameters.update({"low_gain": 9.0, "mid_gain": -6.0, "high_gain": 6.0})
+    delay = SimpleDelay()
+    delay.parameters.update({"time": 0.01, "feedback": 0.95, "mix": 0.5})
+    return [eq, delay]
+
+def run(seconds, burst_seconds=1.0):
+    chain = make_chain()
+    rng = np.random.default_rng(0)
+    silence = np.zeros((BLOCK, 2), dtype='float32')
+
+    num_blocks = int(seconds * SAMPLE_RATE / BLOCK)
+    burst_blocks = int(burst_seconds * SAMPLE_RATE / BLOCK)
+    timings = np.zeros(num_blocks)
+
+    for i in range(num_blocks):
+        if i < burst_blocks:
+            block = (rng.standard_normal((BLOCK, 2)) * 0.3).astype('float32')
+        else:
+            block = silence
+
+        t0 = time.perf_counter()
+        for effect in chain:
+            block = effect.process(block, SAMPLE_RATE)
+        timings[i] = time.perf_counter() - t0
+
+    return timings, burst_blocks
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--no-flush", action="store_true", help="disable denormal protection")
+    parser.add_argument("--seconds", type=float, default=60.0)
+    args = parser.parse_args()
+
+    base.denormal_protection = not args.no_flush
+    timings, burst_blocks = run(args.seconds)
+
+    block_ms = BLOCK / SAMPLE_RATE * 1000.0
+    signal = timings[:burst_blocks]
+    tail = timings[burst_blocks:]
+    num_windows = 6
+    windows = np.array_split(tail, num_windows)
+
+    print(f"Denormal protection: {'on' if base.denormal_protection else 'off'}")
+    print(f"Block: {BLOCK} frames ({block_ms:.1f} ms)")
+    print(f"Signal:        {np.median(signal) * 1000:.3f} ms/block  ({np.median(signal) * 1000 / block_ms * 100:.1f}% DSP)")
+    offset = burst_blocks
+    for window in windows:
+        start_s = offset * BLOCK / SAMPLE_RATE
+        offset += len(window)
+        end_s = offset * BLOCK / SAMPLE_RATE
+        med = np.median(window) * 1000
+        print(f"Tail {start_s:5.1f}-{end_s:5.1f}s: {med:.3f} ms/block  ({med / block_ms * 100:.1f}% DSP)")
+
+    ratio = np.max([np.median(w) for w in windows]) / np.median(signal)
+    print(f"Worst tail / signal: {ratio:.2f}x")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,239 @@
+# Mixer benchmark. Builds AudioEngine sessions without any Qt widgets and
+# sweeps track count, clips per track, blocksize and effect mix. For every
+# configuration it times mix_chunk block by block (p50/p99, realtime factor),
+# counts the allocations a block makes and the transient memory it uses
+# (separate tracemalloc pass so timings stay clean) and times export_audio
+# once per session.
+#
+#   python -m tools.bench_mixer [--quick] [--out bench.json] [--compare old.json]
+#
+# The JSON output is stable across commits; --compare prints the change per
+# configuration and exits non-zero when a realtime factor regressed by more
+# than --threshold.
+
+import argparse
+import contextlib
+import io
+import itertools
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+import numpy as np
+
+from core.audio_engine import AudioEngine
+from core.models import AudioTrackData, AudioClip
+from core.effects import create_effect
+
+SAMPLE_RATE = 44100
+
+EFFECT_MIXES = {
+    "none": [],
+    "light": ["Distortion"],
+    "mixed": ["EQ3Band", "SimpleDelay", "Distortion"],
+    "heavy": ["EQ3Band", "SimpleDelay", "EQ3Band"],
+}
+
+FULL_SWEEP = {
+    "tracks": [8, 32, 128],
+    "clips": [1, 4],
+    "blocksize": [512, 2048],
+    "effects": ["none", "light", "mixed", "heavy"],
+}
+
+QUICK_SWEEP = {
+    "tracks": [8, 64],
+    "clips": [2],
+    "blocksize": [2048],
+    "effects": ["none", "mixed"],
+}
+
+def make_effect(type_name):
+    effect = create_effect(type_name)
+    # Non-neutral settings so nothing takes an early-out path
+    if type_name == "EQ3Band":
+        effect.parameters.update({"low_gain": 4.0, "mid_gain": -3.0, "high_gain": 2.0})
+    elif type_name == "Distortion":
+        effect.parameters["drive"] = 0.5
+    return effect
+
+def build_session(num_tracks, clips_per_track, effect_mix, seconds, seed=0):
+    rng = np.random.default_rng(seed)
+    with contextlib.redirect_stdout(io.StringIO()):
+        engine = AudioEngine()
+
+    source_frames = int(seconds * SAMPLE_RATE)
+    chain = EFFECT_MIXES[effect_mix]
+    clip_seconds = seconds / clips_per_track
+
+    for i in range(num_tracks):
+        source = (rng.standard_normal((source_frames, 2)) * 0.1).astype('float32')
+        track = AudioTrackData(f"Track {i + 1}", None, source, SAMPLE_RATE)
+        track.volume = float(rng.uniform(0.5, 1.0))
+        track.pan = float(rng.uniform(-1, 1))
+        track.clips = [
+            AudioClip(source, c * clip_seconds, c * clip_seconds, clip_seconds, f"Clip {c + 1}")
+            for c in range(clips_per_track)
+        ]
+        # Every other track carries the chain, like a typical session
+        if i % 2 == 0:
+            track.effects = [make_effect(name) for name in chain]
+        engine.add_track_data(track)
+
+    return engine
+
+def time_blocks(engine, blocksize, seconds):
+    total = int(seconds * SAMPLE_RATE)
+    timings = []
+    for start in range(0, total - blocksize + 1, blocksize):
+        t0 = time.perf_counter()
+        engine.mix_chunk(start, blocksize)
+        timings.append(time.perf_counter() - t0)
+    return np.array(timings)
+
+def measure_allocations(engine, blocksize, num_blocks=20):
+    # Memory blocks a block allocates (summed per line from snapshot diffs,
+    # so arrays freed again within the block are not counted) and the bytes
+    # allocated and released within one block (transient peak)
+    tracemalloc.start()
+    ignore = [tracemalloc.Filter(False, tracemalloc.__file__)]
+    try:
+        counts = []
+        transient = []
+        for n in range(num_blocks):
+            before = tracemalloc.take_snapshot().filter_traces(ignore)
+            tracemalloc.reset_peak()
+            base, _ = tracemalloc.get_traced_memory()
+            engine.mix_chunk(n * blocksize, blocksize)
+            _, peak = tracemalloc.get_traced_memory()
+            after = tracemalloc.take_snapshot().filter_traces(ignore)
+            transient.append(peak - base)
+            counts.append(sum(max(stat.count_diff, 0) for stat in after.compare_to(before, 'lineno')))
+    finally:
+        tracemalloc.stop()
+    return float(np.median(counts)), float(np.median(transient))
+
+def time_export(engine, seconds):
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "bench.wav")
+        with contextlib.redirect_stdout(io.StringIO()):
+            t0 = time.perf_counter()
+            engine.export_audio(path, seconds)
+            return time.perf_counter() - t0
+
+def run_config(num_tracks, clips, blocksize, effect_mix, seconds, with_export):
+    engine = build_session(num_tracks, clips, effect_mix, seconds)
+    engine.mix_chunk(0, blocksize) # Warm up (filter design, buffers)
+
+    timings = time_blocks(engine, blocksize, seconds)
+    block_seconds = blocksize / SAMPLE_RATE
+    result = {
+        "tracks": num_tracks,
+        "clips": clips,
+        "blocksize": blocksize,
+        "effects": effect_mix,
+        "blocks": len(timings),
+        "block_p50_ms": float(np.percentile(timings, 50) * 1000),
+        "block_p99_ms": float(np.percentile(timings, 99) * 1000),
+        "block_max_ms": float(timings.max() * 1000),
+        "realtime_factor": float(block_seconds * len(timings) / timings.sum()),
+        "dsp_load_p99": float(np.percentile(timings, 99) / block_seconds),
+    }
+    result["allocs_per_block"], result["transient_bytes_per_block"] = measure_allocations(engine, blocksize)
+
+    if with_export:
+        export_engine = build_session(num_tracks, clips, effect_mix, seconds)
+        result["export_realtime_factor"] = float(seconds / time_export(export_engine, seconds))
+    return result
+
+def config_key(result):
+    return f"{result['tracks']}t/{result['clips']}c/{result['blocksize']}b/{result['effects']}"
+
+def git_revision():
+    try:
+        return subprocess.check_output(["git", "rev-parse", "--short", "HEAD"], text=True, stderr=subprocess.DEVNULL).strip()
+    except Exception:
+        return None
+
+def compare(results, old_path, threshold):
+    with open(old_path) as f:
+        old = {config_key(r): r for r in json.load(f)["results"]}
+
+    regressions = 0
+    print(f"\nCompared with {old_path}:")
+    for result in results:
+        key = config_key(result)
+        before = old.get(key)
+        if before is None:
+            print(f"  {key:28s} new configuration")
+            continue
+        change = result["realtime_factor"] / before["realtime_factor"] - 1.0
+        flag = ""
+        if change < -threshold:
+            flag = "  REGRESSION"
+            regressions += 1
+        print(f"  {key:28s} realtime {before['realtime_factor']:7.1f}x -> {result['realtime_factor']:7.1f}x "
+              f"({change * 100:+.1f}%)  p99 {before['block_p99_ms']:.2f} -> {result['block_p99_ms']:.2f} ms{flag}")
+    return regressions
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--quick", action="store_true", help="small sweep for a fast check")
+    parser.add_argument("--seconds", type=float, default=5.0, help="audio rendered per configuration")
+    parser.add_argument("--no-export", action="store_true", help="skip export_audio timing")
+    parser.add_argument("--out", default=None, help="write results to this JSON file")
+    parser.add_argument("--compare", default=None, help="earlier JSON to compare against")
+    parser.add_argument("--threshold", type=float, default=0.10, help="realtime factor drop counted as regression")
+    args = parser.parse_args()
+
+    sweep = QUICK_SWEEP if args.quick else FULL_SWEEP
+    results = []
+    exported = set()
+
+    header = f"{'tracks':>6} {'clips':>5} {'block':>5} {'effects':>7} {'p50 ms':>8} {'p99 ms':>8} {'RT x':>7} {'allocs':>6} {'temp KB':>8} {'export RT x':>11}"
+    print(header)
+    print("-" * len(header))
+
+    for num_tracks, clips, blocksize, effect_mix in itertools.product(
+            sweep["tracks"], sweep["clips"], sweep["blocksize"], sweep["effects"]):
+        # Export does not depend on the playback blocksize, time it once per session
+        session = (num_tracks, clips, effect_mix)
+        with_export = not args.no_export and session not in exported
+        exported.add(session)
+
+        result = run_config(num_tracks, clips, blocksize, effect_mix, args.seconds, with_export)
+        results.append(result)
+
+        export = f"{result['export_realtime_factor']:.1f}" if "export_realtime_factor" in result else "-"
+        print(f"{num_tracks:>6} {clips:>5} {blocksize:>5} {effect_mix:>7} {result['block_p50_ms']:>8.2f} "
+              f"{result['block_p99_ms']:>8.2f} {result['realtime_factor']:>7.1f} "
+              f"{result['allocs_per_block']:>6.0f} {result['transient_bytes_per_block'] / 1024:>8.1f} {export:>11}")
+
+    report = {
+        "revision": git_revision(),
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "machine": platform.machine(),
+        "cpu_count": os.cpu_count(),
+        "sample_rate": SAMPLE_RATE,
+        "seconds": args.seconds,
+        "results": results,
+    }
+    if args.out:
+        with open(args.out, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"\nWrote {args.out}")
+
+    if args.compare:
+        regressions = compare(results, args.compare, args.threshold)
+        if regressions:
+            print(f"{regressions} configuration(s) regressed by more than {args.threshold * 100:.0f}%")
+            sys.exit(1)
+
+if __name__ == "__main__":
+    main()
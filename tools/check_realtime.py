@@ -0,0 +1,54 @@
+# Real-time safety check. Drives AudioEngine.audio_callback with the
+# debug checker attached (core/rt_checker.py) and lists everything the
+# callback did that it should not: allocations over budget, NumPy calls
+# that allocate, blocking calls and GC runs, each with a stack.
+#
+#   python -m tools.check_realtime [--tracks 8] [--effects mixed] [--blocks 200]
+#
+# Exits non-zero when anything was found, so "no allocation on the hot
+# path" can be checked like a test.
+
+import argparse
+import sys
+import numpy as np
+
+from tools.bench_mixer import build_session, EFFECT_MIXES, SAMPLE_RATE
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--tracks", type=int, default=8)
+    parser.add_argument("--clips", type=int, default=2)
+    parser.add_argument("--effects", choices=sorted(EFFECT_MIXES), default="mixed")
+    parser.add_argument("--blocksize", type=int, default=512)
+    parser.add_argument("--blocks", type=int, default=200)
+    parser.add_argument("--budget", type=int, default=None, help="bytes a block may allocate")
+    parser.add_argument("--loop", action="store_true", help="play a looped region")
+    parser.add_argument("--no-stacks", action="store_true")
+    args = parser.parse_args()
+
+    seconds = args.blocks * args.blocksize / SAMPLE_RATE + 1.0
+    engine = build_session(args.tracks, args.clips, args.effects, seconds)
+    engine.blocksize = args.blocksize
+    engine.draft_mode = "off" # The checker's own overhead would trigger draft playback
+    if args.loop:
+        engine.is_looping = True
+        engine.loop_start_sample = 0
+        engine.loop_end_sample = int(seconds * SAMPLE_RATE / 2)
+
+    outdata = np.zeros((args.blocksize, 2), dtype='float32')
+    engine.audio_callback(outdata, args.blocksize, None, None) # Warm up
+
+    engine.enable_rt_check()
+    if args.budget is not None:
+        engine.rt_checker.budget = args.budget
+    for _ in range(args.blocks):
+        engine.audio_callback(outdata, args.blocksize, None, None)
+
+    checker = engine.rt_checker
+    print(checker.report(stacks=not args.no_stacks))
+    violations = checker.violations()
+    checker.close()
+    sys.exit(1 if violations else 0)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,420 @@
+# Render random synthetic projects with a frozen, straightforward reference
+# mixer and with the production AudioEngine, then compare sample by sample.
+# Any optimization in mix_chunk or the effects that changes the sound shows
+# up here. Headless, NumPy/SciPy only.
+#
+#   python -m tools.render_equivalence [--projects 25] [--seed 0] [--mixer both]
+#
+# On a mismatch the first differing sample is reported together with the
+# first track that differs when rendered on its own. The same projects are
+# then played in a loop through the audio callback, and passes replayed
+# from the loop cache are compared with live ones.
+
+import argparse
+import contextlib
+import io
+import sys
+import numpy as np
+from scipy.signal import sosfilt
+
+from core.audio_engine import AudioEngine
+from core.models import AudioTrackData, AudioClip
+from core.effects import create_effect
+from core.effects.delay import MIN_DELAY_SECONDS
+
+SAMPLE_RATE = 44100
+
+# Absolute tolerance each effect may add on top of float32 mixing noise.
+# EQ and delay run recursive filters in float32/float64 with denormal
+# flushing and tail sleep, distortion is a pure function.
+BASE_TOLERANCE = 1e-5
+EFFECT_TOLERANCE = {
+    "EQ3Band": 1e-4,
+    "SimpleDelay": 1e-4,
+    "Distortion": 2e-5,
+}
+
+# Project generation
+
+def random_effect(rng):
+    type_name = rng.choice(list(EFFECT_TOLERANCE))
+    if type_name == "EQ3Band":
+        params = {
+            "low_gain": float(rng.uniform(-12, 12)),
+            "mid_gain": float(rng.choice([0.0, rng.uniform(-12, 12)])),
+            "high_gain": float(rng.uniform(-12, 12)),
+            "low_freq": float(rng.uniform(60, 600)),
+            "high_freq": float(rng.uniform(2000, 12000)),
+        }
+    elif type_name == "SimpleDelay":
+        params = {
+            "time": float(rng.choice([0.0, rng.uniform(0.0, 0.01), rng.uniform(0.01, 0.8)], p=[0.15, 0.15, 0.7])),
+            "feedback": float(rng.uniform(0.0, 0.9)),
+            "mix": float(rng.uniform(0.0, 1.0)),
+        }
+    else:
+        params = {
+            "drive": float(rng.uniform(0.0, 1.0)),
+            "mix": float(rng.uniform(0.0, 1.0)),
+        }
+    return {"type": str(type_name), "active": bool(rng.random() > 0.15), "params": params}
+
+def random_source(rng, seconds):
+    frames = int(seconds * SAMPLE_RATE)
+    t = np.arange(frames) / SAMPLE_RATE
+    tone = np.sin(2 * np.pi * rng.uniform(50, 2000) * t)[:, None]
+    noise = rng.standard_normal((frames, 2))
+    envelope = np.abs(np.sin(np.pi * t / seconds * rng.integers(1, 6)))[:, None]
+    data = (tone * rng.uniform(0, 0.4) + noise * rng.uniform(0, 0.2)) * envelope
+    if rng.random() < 0.2:
+        data[int(frames * 0.3):int(frames * 0.6)] = 0.0 # Silent stretch, exercises tail sleep
+    return data.astype('float32')
+
+def random_project(rng, seconds):
+    tracks = []
+    any_solo = rng.random() < 0.2
+    for i in range(int(rng.integers(1, 9))):
+        source_seconds = float(rng.uniform(0.5, seconds))
+        source = random_source(rng, source_seconds)
+
+        clips = []
+        for _ in range(int(rng.integers(1, 4))):
+            # Trimmed region of the source...
+            offset = float(rng.uniform(0, source_seconds * 0.5))
+            duration = float(rng.uniform(0.05, source_seconds - offset + 0.5)) # May run past the source
+            start = float(rng.uniform(0, seconds * 0.8))
+            if rng.random() < 0.4:
+                # ...or split into two adjacent clips
+                cut = float(rng.uniform(0.01, duration))
+                clips.append((start, offset, cut))
+                clips.append((start + cut, offset + cut, duration - cut))
+            else:
+                clips.append((start, offset, duration))
+
+        tracks.append({
+            "name": f"Track {i + 1}",
+            "source": source,
+            "clips": clips,
+            "volume": float(rng.uniform(0, 1)),
+            "pan": float(rng.uniform(-1, 1)),
+            "muted": bool(rng.random() < 0.15),
+            "soloed": bool(any_solo and rng.random() < 0.5),
+            "fx_bypass": bool(rng.random() < 0.1),
+            "effects": [random_effect(rng) for _ in range(int(rng.integers(0, 4)))],
+        })
+
+    return {
+        "seconds": seconds,
+        "blocksize": int(rng.choice([64, 333, 1024, 2048, 4096])),
+        "tracks": tracks,
+        "master": {
+            "volume": float(rng.uniform(0.3, 1)),
+            "pan": float(rng.uniform(-1, 1)),
+            "fx_bypass": bool(rng.random() < 0.2),
+            "effects": [random_effect(rng) for _ in range(int(rng.integers(0, 2)))],
+        },
+    }
+
+def chain_tolerance(effects, bypass):
+    if bypass: return BASE_TOLERANCE
+    return BASE_TOLERANCE + sum(EFFECT_TOLERANCE[e["type"]] for e in effects if e["active"])
+
+# Frozen reference. Whole-signal processing, no blocks, no caches. Do not
+# "optimize" anything below, it is the yardstick.
+
+def ref_pan_gains(pan):
+    return (1.0 if pan <= 0 else 1.0 - pan), (1.0 if pan >= 0 else 1.0 + pan)
+
+def ref_biquad(kind, freq, fs, gain_db, q=0.707):
+    A = 10 ** (gain_db / 40.0)
+    freq = min(freq, 0.45 * fs)
+    w = 2 * np.pi * freq / fs
+    sn, cs = np.sin(w), np.cos(w)
+    alpha = sn / (2 * q)
+    beta = np.sqrt(A + A)
+    if kind == "low_shelf":
+        b = [A * ((A + 1) - (A - 1) * cs + beta * sn), 2 * A * ((A - 1) - (A + 1) * cs), A * ((A + 1) - (A - 1) * cs - beta * sn)]
+        a = [(A + 1) + (A - 1) * cs + beta * sn, -2 * ((A - 1) + (A + 1) * cs), (A + 1) + (A - 1) * cs - beta * sn]
+    elif kind == "high_shelf":
+        b = [A * ((A + 1) + (A - 1) * cs + beta * sn), -2 * A * ((A - 1) + (A + 1) * cs), A * ((A + 1) + (A - 1) * cs - beta * sn)]
+        a = [(A + 1) - (A - 1) * cs + beta * sn, 2 * ((A - 1) - (A + 1) * cs), (A + 1) - (A - 1) * cs - beta * sn]
+    else:
+        b = [1 + alpha * A, -2 * cs, 1 - alpha * A]
+        a = [1 + alpha / A, -2 * cs, 1 - alpha / A]
+    b = np.array(b) / a[0]
+    a = np.array(a) / a[0]
+    return np.array([[b[0], b[1], b[2], 1.0, a[1], a[2]]])
+
+def ref_effect(effect, x):
+    p = effect["params"]
+    if effect["type"] == "EQ3Band":
+        if abs(p["low_gain"]) > 0.01:
+            x = sosfilt(ref_biquad("low_shelf", p["low_freq"], SAMPLE_RATE, p["low_gain"]), x, axis=0)
+        if abs(p["mid_gain"]) > 0.01:
+            center = (p["low_freq"] + p["high_freq"]) / 2
+            x = sosfilt(ref_biquad("peaking", center, SAMPLE_RATE, p["mid_gain"], q=1.0), x, axis=0)
+        if abs(p["high_gain"]) > 0.01:
+            x = sosfilt(ref_biquad("high_shelf", p["high_freq"], SAMPLE_RATE, p["high_gain"]), x, axis=0)
+        return x
+
+    if effect["type"] == "SimpleDelay":
+        if p["mix"] <= 0.001: return x
+        delay = max(int(MIN_DELAY_SECONDS * SAMPLE_RATE), 1, min(int(p["time"] * SAMPLE_RATE), int(2.0 * SAMPLE_RATE) - 1))
+        # Feedback comb: w[n] = x[n] + fb * w[n - D], the tap reads w[n - D]
+        w = x.copy()
+        for start in range(delay, len(w), delay):
+            end = min(start + delay, len(w))
+            w[start:end] += p["feedback"] * w[start - delay:end - delay]
+        delayed = np.zeros_like(w)
+        delayed[delay:] = w[:-delay]
+        return x * (1.0 - p["mix"]) + delayed * p["mix"]
+
+    if p["drive"] <= 0.001: return x
+    wet = (2.0 / np.pi) * np.arctan(x * (1.0 + p["drive"] * 20.0))
+    return x * (1.0 - p["mix"]) + wet * p["mix"]
+
+def ref_chain(effects, bypass, x):
+    if bypass: return x
+    for effect in effects:
+        if effect["active"]:
+            x = ref_effect(effect, x)
+    return x
+
+def ref_track(track, frames):
+    out = np.zeros((frames, 2))
+    source = track["source"].astype('float64')
+    for start, offset, duration in track["clips"]:
+        clip_start = int(start * SAMPLE_RATE)
+        clip_end = min(frames, clip_start + int(duration * SAMPLE_RATE))
+        src = int(offset * SAMPLE_RATE)
+        count = min(clip_end - clip_start, len(source) - src)
+        if count > 0:
+            out[clip_start:clip_start + count] += source[src:src + count]
+    out = ref_chain(track["effects"], track["fx_bypass"], out)
+    left, right = ref_pan_gains(track["pan"])
+    return out * np.array([left, right]) * track["volume"]
+
+def ref_is_audible(track, tracks):
+    if any(t["soloed"] for t in tracks):
+        return track["soloed"]
+    return not track["muted"]
+
+def ref_master(project, mix):
+    master = project["master"]
+    mix = ref_chain(master["effects"], master["fx_bypass"], mix)
+    left, right = ref_pan_gains(master["pan"])
+    return mix * master["volume"] * np.array([left, right])
+
+def ref_render(project, only=None):
+    frames = int(project["seconds"] * SAMPLE_RATE)
+    tracks = project["tracks"]
+    mix = np.zeros((frames, 2))
+    for i, track in enumerate(tracks):
+        if only is not None and i != only: continue
+        if ref_is_audible(track, tracks):
+            mix += ref_track(track, frames)
+    return ref_master(project, mix)
+
+# Production
+
+def build_engine(project, batch_mixing, only=None):
+    with contextlib.redirect_stdout(io.StringIO()):
+        engine = AudioEngine()
+    engine.batch_mixing = batch_mixing
+
+    def make_effects(specs):
+        effects = []
+        for spec in specs:
+            effect = create_effect(spec["type"])
+            effect.active = spec["active"]
+            effect.parameters.update(spec["params"])
+            effects.append(effect)
+        return effects
+
+    for i, spec in enumerate(project["tracks"]):
+        track = AudioTrackData(spec["name"], None, spec["source"], SAMPLE_RATE)
+        track.volume = spec["volume"]
+        track.pan = spec["pan"]
+        track.is_muted = spec["muted"]
+        track.is_soloed = spec["soloed"]
+        if only is not None:
+            # Keep just this track, with the audibility it has in the full project
+            track.is_muted = i != only or not ref_is_audible(spec, project["tracks"])
+            track.is_soloed = False
+        track.fx_bypass = spec["fx_bypass"]
+        track.effects = make_effects(spec["effects"])
+        track.clips = [AudioClip(spec["source"], s, o, d, "clip") for s, o, d in spec["clips"]]
+        engine.add_track_data(track)
+
+    master = project["master"]
+    engine.master_track.volume = master["volume"]
+    engine.master_track.pan = master["pan"]
+    engine.master_track.fx_bypass = master["fx_bypass"]
+    engine.master_track.effects = make_effects(master["effects"])
+    return engine
+
+def production_render(project, batch_mixing, only=None):
+    engine = build_engine(project, batch_mixing, only)
+    frames = int(project["seconds"] * SAMPLE_RATE)
+    block = project["blocksize"]
+    out = np.zeros((frames, 2), dtype='float32')
+    for start in range(0, frames, block):
+        count = min(block, frames - start)
+        out[start:start + count] = engine.mix_chunk(start, count)
+    return out
+
+def loop_render(project, batch_mixing, cached, loop, passes):
+    # Several passes over a loop through the audio callback, with the loop
+    # cache on or, for the live reference, unable to record
+    engine = build_engine(project, batch_mixing)
+    engine.set_draft_mode("off")
+    if not cached:
+        engine.loop_cache.max_bytes = 0
+    engine.set_loop_region(loop)
+    engine.set_looping(True)
+    engine.playhead = engine.loop_start_sample
+    frames = (engine.loop_end_sample - engine.loop_start_sample) * passes
+    block = project["blocksize"]
+    out = np.zeros((frames + block, 2), dtype='float32')
+    for start in range(0, frames, block):
+        engine.audio_callback(out[start:start + block], block, None, None)
+    return out[:frames], engine
+
+def delay_loop_project():
+    # Delay whose tail fits the loop, so it is cached and its echoes wrap
+    # over the seam, next to a dry track
+    rng = np.random.default_rng(1)
+    seconds = 2.0
+    effect = {"type": "SimpleDelay", "active": True, "params": {"time": 0.1, "feedback": 0.2, "mix": 0.5}}
+    tracks = []
+    for i, effects in enumerate([[effect], []]):
+        tracks.append({
+            "name": f"Track {i + 1}", "source": random_source(rng, seconds), "clips": [(0.0, 0.0, seconds)],
+            "volume": 0.8, "pan": 0.0, "muted": False, "soloed": False, "fx_bypass": False, "effects": effects,
+        })
+    return {
+        "seconds": seconds, "blocksize": 512, "tracks": tracks,
+        "master": {"volume": 1.0, "pan": 0.0, "fx_bypass": False, "effects": []},
+    }
+
+# Comparison
+
+def first_difference(reference, production, tolerance):
+    errors = np.abs(reference - production) > tolerance
+    if not errors.any():
+        return None
+    index = int(np.argmax(errors.any(axis=1)))
+    channel = int(np.argmax(errors[index]))
+    return index, channel
+
+def describe_track(project, i):
+    track = project["tracks"][i]
+    chain = ", ".join(e["type"] + ("" if e["active"] else " (off)") for e in track["effects"]) or "no effects"
+    return f"track {i} '{track['name']}' [{chain}]"
+
+def check_project(project, batch_mixing):
+    tracks = project["tracks"]
+    master_scale = project["master"]["volume"]
+    master_tol = chain_tolerance(project["master"]["effects"], project["master"]["fx_bypass"])
+    tolerance = master_scale * sum(chain_tolerance(t["effects"], t["fx_bypass"]) for t in tracks) + master_tol
+
+    reference = ref_render(project)
+    production = production_render(project, batch_mixing)
+    diff = first_difference(reference, production, tolerance)
+    if diff is None:
+        return None
+
+    index, channel = diff
+    lines = [
+        f"first difference at sample {index} ({index / SAMPLE_RATE:.4f} s), channel {'LR'[channel]}: "
+        f"reference {reference[index, channel]:.6f}, production {production[index, channel]:.6f}, "
+        f"tolerance {tolerance:.1e}"
+    ]
+
+    # Localize: render each track on its own
+    for i, track in enumerate(tracks):
+        tol = master_scale * chain_tolerance(track["effects"], track["fx_bypass"]) + master_tol
+        track_diff = first_difference(ref_render(project, only=i), production_render(project, batch_mixing, only=i), tol)
+        if track_diff is not None:
+            lines.append(f"first differing {describe_track(project, i)} at sample {track_diff[0]}")
+            break
+    else:
+        lines.append("no single track differs on its own (interaction between tracks or in the master)")
+    return lines
+
+def check_loop_cache(project, batch_mixing, passes=4):
+    # Passes replayed from the loop cache must sound like live passes,
+    # effect tails wrapping over the loop seam included
+    loop = (0.25, min(1.25, project["seconds"]))
+    tracks = project["tracks"]
+    master_tol = chain_tolerance(project["master"]["effects"], project["master"]["fx_bypass"])
+    tolerance = project["master"]["volume"] * sum(chain_tolerance(t["effects"], t["fx_bypass"]) for t in tracks) + master_tol
+
+    live, _ = loop_render(project, batch_mixing, False, loop, passes)
+    cached, engine = loop_render(project, batch_mixing, True, loop, passes)
+    cache = engine.loop_cache
+    clean = [engine.tracks.index(t) for t in cache.clean_tracks] if cache.state == cache.READY else []
+
+    diff = first_difference(live, cached, tolerance)
+    if diff is None:
+        return None, clean
+    index, channel = diff
+    loop_len = engine.loop_end_sample - engine.loop_start_sample
+    return [
+        f"pass {index // loop_len + 1}, sample {index % loop_len} of the loop, channel {'LR'[channel]}: "
+        f"live {live[index, channel]:.6f}, cached {cached[index, channel]:.6f}, tolerance {tolerance:.1e}"
+    ], clean
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--projects", type=int, default=25)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--seconds", type=float, default=3.0)
+    parser.add_argument("--mixer", choices=["batched", "per-track", "both"], default="both")
+    args = parser.parse_args()
+
+    mixers = {"batched": [True], "per-track": [False], "both": [True, False]}[args.mixer]
+    failures = 0
+
+    for n in range(args.projects):
+        seed = args.seed + n
+        project = random_project(np.random.default_rng(seed), args.seconds)
+        for batch_mixing in mixers:
+            label = f"project seed={seed} ({len(project['tracks'])} tracks, block {project['blocksize']}, " \
+                    f"{'batched' if batch_mixing else 'per-track'})"
+            problems = check_project(project, batch_mixing)
+            if problems is None:
+                print(f"ok    {label}")
+            else:
+                failures += 1
+                print(f"FAIL  {label}")
+                for line in problems:
+                    print(f"      {line}")
+
+    total = args.projects * len(mixers)
+    print(f"{total - failures}/{total} renders match the reference")
+
+    # Loop cache: cached passes against live ones
+    loop_failures = 0
+    projects = [("delay project", delay_loop_project())]
+    projects += [(f"project seed={args.seed + n}", random_project(np.random.default_rng(args.seed + n), args.seconds))
+                 for n in range(args.projects)]
+    for name, project in projects:
+        for batch_mixing in mixers:
+            label = f"loop {name} ({'batched' if batch_mixing else 'per-track'})"
+            problems, clean = check_loop_cache(project, batch_mixing)
+            if name == "delay project" and 0 not in clean:
+                problems = (problems or []) + ["the delay track was not replayed from the cache"]
+            if problems is None:
+                print(f"ok    {label}, {len(clean)} cached track(s)")
+            else:
+                loop_failures += 1
+                print(f"FAIL  {label}")
+                for line in problems:
+                    print(f"      {line}")
+    loop_total = len(projects) * len(mixers)
+    print(f"{loop_total - loop_failures}/{loop_total} cached loops match live playback")
+    sys.exit(1 if failures or loop_failures else 0)
+
+if __name__ == "__main__":
+    main()
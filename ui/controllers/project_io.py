@@ -20,7 +20,9 @@ class ProjectIO(QObject):
         if not self.check_save_changes():
             return
             
+        self.track_manager.session_handler.cancel_load()
         self.track_manager.clear_all_tracks()
+        self.mw.perform_loop_region_change(None)
         self.undo_stack.clear()
         self.current_project_path = None
         self.clean_command = None
@@ -1,5 +1,5 @@
 
-from PySide6.QtWidgets import QWidget, QVBoxLayout, QHBoxLayout, QPushButton, QComboBox, QListWidget, QListWidgetItem, QLabel, QSizePolicy, QAbstractItemView
+from PySide6.QtWidgets import QWidget, QVBoxLayout, QHBoxLayout, QPushButton, QComboBox, QListWidget, QListWidgetItem, QLabel, QSizePolicy, QAbstractItemView, QCheckBox
 from PySide6.QtCore import Qt, Signal, QSize
 from ui.effects.unit import EffectUnit
 
@@ -74,6 +74,7 @@ class EffectsRack(QWidget):
         super().__init__(parent)
         self.undo_stack = undo_stack
         self.current_track = None
+        self.units = []
         
         self.main_layout = QVBoxLayout(self)
         self.main_layout.setContentsMargins(5, 5, 5, 5)
@@ -92,6 +93,12 @@ class EffectsRack(QWidget):
         self.combo_add.currentIndexChanged.connect(self.on_add_effect)
         
         header.addWidget(self.combo_add)
+        
+        self.chk_pipeline = QCheckBox("Pipeline")
+        self.chk_pipeline.setToolTip("Run each effect on its own core (adds a few blocks of latency)")
+        self.chk_pipeline.toggled.connect(self.on_pipeline_toggled)
+        header.addWidget(self.chk_pipeline)
+        
         self.main_layout.addLayout(header)
         
         self.list_widget = EffectsListWidget()
@@ -104,14 +111,20 @@ class EffectsRack(QWidget):
         if not track_data:
             self.lbl_title.setText("Effects Rack (No Track Selected)")
             self.combo_add.setEnabled(False)
+            self.chk_pipeline.setEnabled(False)
             self.clear_rack()
         else:
             self.lbl_title.setText(f"Effects: {track_data.name}")
             self.combo_add.setEnabled(True)
+            self.chk_pipeline.setEnabled(True)
+            self.chk_pipeline.blockSignals(True)
+            self.chk_pipeline.setChecked(getattr(track_data, 'pipelined', False))
+            self.chk_pipeline.blockSignals(False)
             self.refresh_rack()
             
     def clear_rack(self):
         self.list_widget.clear()
+        self.units = []
                 
     def refresh_rack(self):
         self.clear_rack()
@@ -121,6 +134,7 @@ class EffectsRack(QWidget):
         
         for effect in self.current_track.effects:
             unit = EffectUnit(effect, self.undo_stack)
+            self.units.append(unit)
             
             # wrapper to add delete button and drag handle
             wrapper = QWidget()
@@ -149,6 +163,15 @@ class EffectsRack(QWidget):
             
             self.list_widget.setItemWidget(item, wrapper)
             
+    def update_cpu_loads(self, meter):
+        for unit in self.units:
+            unit.set_cpu_load(meter.effect_load(unit.effect))
+            
+    def on_pipeline_toggled(self, checked):
+        # Picked up by the engine on its next tick
+        if self.current_track:
+            self.current_track.pipelined = checked
+
     def on_add_effect(self, index):
         if index <= 0: return
         
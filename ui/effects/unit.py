@@ -22,6 +22,14 @@ class EffectUnit(QGroupBox):
         
         self.setup_ui()
         
+        self.lbl_cpu = QLabel("")
+        self.lbl_cpu.setStyleSheet("color: #888; font-size: 10px;")
+        self.lbl_cpu.setToolTip("CPU")
+        self.layout.addWidget(self.lbl_cpu, 0, Qt.AlignTop | Qt.AlignRight)
+        
+    def set_cpu_load(self, load):
+        self.lbl_cpu.setText("" if load is None else f"{load * 100:.1f}%")
+        
     def on_toggle(self, active):
         if self.effect.active != active:
              cmd = ToggleEffectCommand(self, self.effect)
@@ -76,16 +84,16 @@ class EffectUnit(QGroupBox):
 
     def on_val_change(self, name, value, scale):
         real_val = value * scale
-        self.effect.parameters[name] = real_val
+        self.effect.set_param(name, real_val)
         
     def on_gain_change(self, name, value):
         fraction = value / 100.0
         db = (fraction * 24) - 12
-        self.effect.parameters[name] = db
+        self.effect.set_param(name, db)
         
     def on_freq_change(self, name, value):
         freq = 20 + (value * 100)
-        self.effect.parameters[name] = freq
+        self.effect.set_param(name, freq)
 
     def map_freq_to_dial(self, freq):
         return int((freq - 20) / 100)
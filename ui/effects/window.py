@@ -21,6 +21,8 @@ class EffectsWindow(QWidget):
         
         self.rack = EffectsRack(self.undo_stack)
         self.rack.set_track(track_data)
+        if track_data is main_window.audio.master_track:
+            self.rack.chk_pipeline.hide() # Only track chains are pipelined
         
         self.layout.addWidget(self.rack)
         
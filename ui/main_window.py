@@ -1,9 +1,9 @@
 import os
 from PySide6.QtWidgets import (QMainWindow, QWidget, QVBoxLayout, 
                                QHBoxLayout, QPushButton, QScrollArea, QSplitter, 
-                               QFrame, QSizePolicy, QApplication, QScrollBar, QStyle)
+                               QFrame, QSizePolicy, QApplication, QScrollBar, QStyle, QFileDialog)
 from PySide6.QtGui import QShortcut, QKeySequence
-from PySide6.QtCore import Qt, QTimer, QEvent
+from PySide6.QtCore import Qt, QTimer, QEvent, QSettings
 
 from core.audio_engine import AudioEngine
 from ui.widgets.timeline import TimelineRuler
@@ -12,7 +12,7 @@ from ui.widgets.ribbon import Ribbon
 from ui.tracks.manager import TrackManager
 from core.command_stack import UndoStack
 from core.project_manager import ProjectManager
-from core.commands import ChangeBPMCommand, ToggleLoopCommand, ToggleSnapCommand
+from core.commands import ChangeBPMCommand, ToggleLoopCommand, ToggleSnapCommand, SetLoopRegionCommand
 from ui.theme_manager import ThemeManager
 
 # Controllers
@@ -26,13 +26,26 @@ class MainWindow(QMainWindow):
         self.resize(1200, 800)
 
         # AUDIO ENGINE
-        self.audio = AudioEngine() 
+        if os.environ.get("PYDAW_ENGINE_SERVER") == "1":
+            from core.engine_server import RemoteAudioEngine
+            self.audio = RemoteAudioEngine()
+        else:
+            self.audio = AudioEngine()
         self.undo_stack = UndoStack()
         self.undo_stack.stack_changed.connect(self.update_undo_redo_buttons)
+        self.undo_stack.command_applied.connect(self.audio.on_command_applied)
         
         self.ui_timer = QTimer()
-        self.ui_timer.interval = 30 # 30ms refresh rate
+        self.ui_timer.setInterval(30) # 30ms refresh rate
         self.ui_timer.timeout.connect(self.update_ui)
+        self.ui_frames = 0 # update_ui calls, read by the performance HUD
+        
+        # Effect CPU labels, refreshed slowly so they cost next to nothing
+        from core.cpu_meter import CpuMeter
+        self.cpu_meter = CpuMeter()
+        self.cpu_timer = QTimer()
+        self.cpu_timer.setInterval(500)
+        self.cpu_timer.timeout.connect(self.update_cpu_loads)
 
         # UI SETUP
         self.lanes = [] 
@@ -80,10 +93,11 @@ class MainWindow(QMainWindow):
 
         # Initialize Logic States from UI Defaults
         self.audio.set_looping(self.ribbon.btn_loop.isChecked())
+        self.timeline.set_loop_enabled(self.ribbon.btn_loop.isChecked())
         self.track_manager.set_snap_enabled(self.ribbon.btn_snap.isChecked())
         
         # Connect Loading Signals
-        self.track_manager.loading_started.connect(lambda: self.ribbon.show_loading("Loading Project..."))
+        self.track_manager.loading_started.connect(self.on_project_loading)
         self.track_manager.loading_progress.connect(self.ribbon.update_loading)
         self.track_manager.loading_finished.connect(self.on_project_loaded)
         self.track_manager.status_update.connect(self.ribbon.set_status)
@@ -168,8 +182,74 @@ class MainWindow(QMainWindow):
         
         self.ribbon.playhead_seeked.connect(self.on_ribbon_seek)
         
+        self.ribbon.draft_mode_changed.connect(self.on_draft_mode_changed)
+        draft_mode = QSettings("PyDAW", "AudioEditor").value("draft_mode", "auto")
+        self.audio.set_draft_mode(draft_mode)
+        self.ribbon.set_draft_mode(self.audio.draft_mode)
+        
+        from ui.widgets.perf_hud import PerfHud
+        self.perf_hud = PerfHud(self)
+        self.ribbon.hud_toggled.connect(self.perf_hud.set_visible)
+        self.addAction(self.ribbon.action_hud) # F12 works without opening the menu
+        
+        from core.tracing import tracer
+        self.ribbon.action_trace.setChecked(tracer.enabled)
+        self.ribbon.trace_toggled.connect(self.on_trace_toggled)
+        self.ribbon.trace_save_requested.connect(self.on_save_trace)
+        
+        self.ribbon.action_profiler.setChecked(self.audio.profiler is not None)
+        self.ribbon.profiler_toggled.connect(self.on_profiler_toggled)
+        
         self.main_layout.addWidget(self.ribbon)
 
+    def on_draft_mode_changed(self, mode):
+        self.audio.set_draft_mode(mode)
+        QSettings("PyDAW", "AudioEditor").setValue("draft_mode", mode)
+
+    def on_trace_toggled(self, enabled):
+        from core.tracing import tracer
+        if enabled and not tracer.enabled:
+            tracer.clear() # Start a fresh recording
+            tracer.enable()
+        elif not enabled:
+            tracer.disable()
+
+    def on_save_trace(self):
+        from core.tracing import tracer
+        file_path, _ = QFileDialog.getSaveFileName(self, "Save Trace", "trace.json", "Chrome Trace (*.json)")
+        if not file_path: return
+        try:
+            count = tracer.dump(file_path)
+            self.ribbon.set_status(f"Saved {count} trace events")
+        except OSError as e:
+            print(f"Error saving trace: {e}")
+            self.ribbon.set_status("Could not save trace")
+
+    def on_profiler_toggled(self, enabled):
+        if enabled:
+            if self.audio.start_profiler() is None:
+                self.ribbon.action_profiler.blockSignals(True)
+                self.ribbon.action_profiler.setChecked(False)
+                self.ribbon.action_profiler.blockSignals(False)
+            return
+        
+        profiler = self.audio.stop_profiler()
+        if profiler is None or not profiler.samples:
+            self.ribbon.set_status("No profiler samples (was playback running?)")
+            return
+        
+        for label, hits in profiler.top(10):
+            print(f"{hits * 100 / profiler.samples:5.1f}%  {label}")
+        
+        file_path, _ = QFileDialog.getSaveFileName(self, "Save Profile", "audio_profile.folded", "Folded Stacks (*.folded *.txt)")
+        if not file_path: return
+        try:
+            samples = profiler.write_folded(file_path)
+            self.ribbon.set_status(f"Saved {samples} profiler samples")
+        except OSError as e:
+            print(f"Error saving profile: {e}")
+            self.ribbon.set_status("Could not save profile")
+
     def on_tool_changed(self, tool_name):
         self.track_manager.set_active_tool(tool_name)
 
@@ -240,6 +320,7 @@ class MainWindow(QMainWindow):
 
         self.timeline = TimelineRuler()
         self.timeline.set_bpm(self.audio.bpm)
+        self.timeline.loop_region_selected.connect(self.on_loop_region_selected)
         
         self.timeline_scroll = QScrollArea()
         self.timeline_scroll.setWidgetResizable(True)
@@ -297,9 +378,13 @@ class MainWindow(QMainWindow):
         splitter.setStretchFactor(1, 1)
         splitter.setSizes([340, 1000])
 
+    def on_project_loading(self):
+        # Placeholder tracks are in, the arrangement is already complete
+        self.ribbon.show_loading("Loading Project...")
+        self.viewport_controller.zoom_to_fit()
+
     def on_project_loaded(self):
         self.ribbon.hide_loading()
-        self.viewport_controller.zoom_to_fit()
 
     def update_zoom(self, px_per_sec):
         self.viewport_controller.update_zoom(px_per_sec)
@@ -335,16 +420,19 @@ class MainWindow(QMainWindow):
             self.audio.start_playback()
             self.ribbon.set_play_state(True)
             self.ui_timer.start()
+            self.cpu_timer.start()
 
     def pause_playback(self):
         self.audio.pause_playback()
         self.ribbon.set_play_state(False)
         self.ui_timer.stop()
+        self.stop_cpu_meter()
 
     def stop_playback(self):
         self.audio.stop_playback()
         self.ribbon.set_play_state(False)
         self.ui_timer.stop()
+        self.stop_cpu_meter()
 
         # SNAP BACK TO CURSOR
         cursor_x_pixels = int(getattr(self, 'edit_cursor_time', 0.0) * self.timeline.pixels_per_second)
@@ -358,7 +446,10 @@ class MainWindow(QMainWindow):
         self.viewport_controller.update_playhead_visuals(pixels, scroll_to_view=True)
 
     def update_ui(self):
-        current_time = self.audio.get_playhead_time()
+        self.ui_frames += 1
+        
+        # Draw what is being heard, the engine renders ahead by the device latency
+        current_time = self.audio.get_audible_time()
         
         # Auto-expand if near end
         if current_time > self.timeline.duration - 5:
@@ -367,10 +458,21 @@ class MainWindow(QMainWindow):
         x_pixel = int(current_time * self.timeline.pixels_per_second)
         self.viewport_controller.update_playhead_visuals(x_pixel, scroll_to_view=True)
         
+        self.audio.tick()
         
         self.track_manager.update_meters()
         self.ribbon.update_playhead_position(current_time, self.timeline.duration)
         self.ribbon.update_master_levels(self.audio.master_peak_L, self.audio.master_peak_R)
+        self.ribbon.set_draft_active(self.audio.draft_active)
+
+    def update_cpu_loads(self):
+        self.cpu_meter.update(self.audio)
+        self.track_manager.update_cpu_loads(self.cpu_meter)
+
+    def stop_cpu_meter(self):
+        self.cpu_timer.stop()
+        self.cpu_meter.reset()
+        self.track_manager.update_cpu_loads(self.cpu_meter)
 
     def zoom_in_step(self):
         self.viewport_controller.perform_zoom_step(1)
@@ -441,6 +543,7 @@ class MainWindow(QMainWindow):
 
     def closeEvent(self, event):
         if self.project_io.check_save_changes():
+            self.audio.shutdown()
             event.accept()
         else:
             event.ignore()
@@ -469,6 +572,8 @@ class MainWindow(QMainWindow):
         if old_bpm != new_bpm and old_bpm > 0:
             scale_factor = old_bpm / new_bpm
             self.track_manager.scale_project_time(scale_factor)
+            self.audio.scale_loop_region(scale_factor)
+            self.timeline.set_loop_region(self.audio.loop_region)
             
         self.audio.set_bpm(new_bpm)
         self.timeline.set_bpm(new_bpm)
@@ -498,4 +603,26 @@ class MainWindow(QMainWindow):
         self.ribbon.btn_loop.blockSignals(True)
         self.ribbon.btn_loop.setChecked(enabled)
         self.ribbon.btn_loop.blockSignals(False)
-        self.audio.set_looping(enabled)
\ No newline at end of file
+        self.audio.set_looping(enabled)
+        self.timeline.set_loop_enabled(enabled)
+
+    def on_loop_region_selected(self, start_x, end_x):
+        pps = self.timeline.pixels_per_second
+        start = start_x / pps
+        end = end_x / pps
+        
+        if self.track_manager.snap_enabled:
+            beat_duration = 60.0 / self.audio.bpm
+            start = round(start / beat_duration) * beat_duration
+            end = round(end / beat_duration) * beat_duration
+        
+        new_region = (start, end) if end - start > 0.01 else None
+        old_region = self.audio.loop_region
+        if new_region == old_region: return
+        
+        cmd = SetLoopRegionCommand(self, old_region, new_region)
+        self.undo_stack.push(cmd)
+
+    def perform_loop_region_change(self, region):
+        self.audio.set_loop_region(region)
+        self.timeline.set_loop_region(self.audio.loop_region)
\ No newline at end of file
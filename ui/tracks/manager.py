@@ -3,8 +3,8 @@ from PySide6.QtCore import QObject, Slot, Signal
 from PySide6.QtWidgets import QFileDialog, QMessageBox
 
 from ui.widgets.track_header import TrackHeader
-from ui.widgets.track_lane import TrackLane
-from core.track_loader import TrackLoader
+from ui.widgets.track_lane import TrackLane, TRACK_HEIGHT
+from core.decode_pool import DecodePool
 from core.commands import AddTrackCommand, DeleteTrackCommand
 from core.models import AudioClip
 
@@ -37,6 +37,8 @@ class TrackManager(QObject):
         
         self.clip_ops = ClipOperations(self)
         self.channel_ops = ChannelOperations(self)
+        self.decode_pool = DecodePool(parent=self)
+        self.decode_pool.idle.connect(self.status_update.emit)
         self.session_handler = SessionHandler(self)
 
     def set_active_tool(self, tool_name):
@@ -71,11 +73,10 @@ class TrackManager(QObject):
             self.btn_add_track.setText("Loading...") 
             self.btn_add_track.setEnabled(False) 
             
-            # Use Thread
-            self.loader_thread = TrackLoader(file_path, self.audio.sample_rate)
-            self.loader_thread.loaded.connect(self.on_track_loaded)
-            self.loader_thread.failed.connect(self.on_import_failed)
-            self.loader_thread.start()
+            # Decoded on the shared pool, ahead of any queued project tracks
+            self.import_job = self.decode_pool.submit(file_path, self.audio.sample_rate, priority=-1, group="import")
+            self.import_job.loaded.connect(self.on_track_loaded)
+            self.import_job.failed.connect(self.on_import_failed)
 
     def on_import_failed(self, error_msg):
         QMessageBox.critical(self.main_window, "Import Failed", f"Could not load audio:\n{error_msg}")
@@ -104,7 +105,7 @@ class TrackManager(QObject):
 
         # Pass data to Audio Engine
         if index is not None:
-            self.audio.tracks.insert(index, track_data) 
+            self.audio.insert_track_data(index, track_data)
         else:
             self.audio.add_track_data(track_data)
             index = len(self.audio.tracks) - 1
@@ -211,6 +212,11 @@ class TrackManager(QObject):
         
         self.update_global_duration()
 
+    def visible_track_count(self):
+        scroll = getattr(self.main_window, 'right_scroll', None)
+        if scroll is None: return 0
+        return scroll.viewport().height() // TRACK_HEIGHT + 1
+
     def clear_all_tracks(self):
         # Remove all tracks from last to first
         for i in range(len(self.audio.tracks) - 1, -1, -1):
@@ -422,6 +428,16 @@ class TrackManager(QObject):
         for lane in self.lanes:
             lane.set_playhead(x)
 
+    def update_cpu_loads(self, meter):
+        for i, track in enumerate(self.audio.tracks):
+            header = self.get_header_widget(i)
+            if header and hasattr(header, 'set_cpu_load'):
+                header.set_cpu_load(meter.chain_load(track))
+        
+        for window in self.channel_ops.fx_windows.values():
+            if window.isVisible():
+                window.rack.update_cpu_loads(meter)
+
     def update_meters(self):
         # Master Track
         if hasattr(self.audio, 'master_peak') and hasattr(self.main_window, 'master_track_widget'):
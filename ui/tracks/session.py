@@ -2,17 +2,15 @@ from PySide6.QtCore import QObject, Signal
 import os
 import numpy as np
 from core.project_manager import ProjectManager
-from core.track_loader import TrackLoader
+from core.tracing import traced
 from core.models import AudioClip, AudioTrackData
-from core.effects.eq import EQ3Band
-from core.effects.delay import SimpleDelay
-from core.effects.distortion import Distortion
+from core.effects import create_effect
 
 class SessionHandler(QObject):
     def __init__(self, track_manager):
         super().__init__()
         self.tm = track_manager
-        self.active_loaders = []
+        self.active_jobs = []
         self.pending_tracks = []
         self.loaded_count = 0
 
@@ -24,12 +22,25 @@ class SessionHandler(QObject):
     def main_window(self):
         return self.tm.main_window
 
+    def cancel_load(self):
+        # Results of a previous, unfinished load are no longer wanted
+        self.tm.decode_pool.cancel("project")
+        was_loading = bool(self.pending_tracks)
+        self.active_jobs = []
+        self.pending_tracks = []
+        self.loaded_count = 0
+        if was_loading:
+            self.tm.loading_finished.emit()
+
+    @traced("load_project", "project")
     def load_project(self, file_path):
         pm = ProjectManager()
         project_data = pm.parse_project_file(file_path)
         
         if not project_data:
             return
+        
+        self.cancel_load()
 
         # Set BPM
         bpm = project_data.get("bpm", 120)
@@ -38,6 +49,11 @@ class SessionHandler(QObject):
 
         self.tm.clear_all_tracks()
 
+        # Loop Region
+        loop_region = project_data.get("loop_region")
+        if hasattr(self.main_window, 'perform_loop_region_change'):
+            self.main_window.perform_loop_region_change(tuple(loop_region) if loop_region else None)
+
         master_data = project_data.get("master")
         if master_data and hasattr(self.main_window, 'master_track_widget'):
             # Model
@@ -73,103 +89,140 @@ class SessionHandler(QObject):
         if total_tracks == 0:
             return
 
-        self.pending_tracks = [None] * total_tracks
+        # The arrangement shows up right away with placeholder audio (empty
+        # arrays that render as silence); each track is filled in as its
+        # file finishes decoding, so playback can start immediately
+        self.pending_tracks = []
+        for track_info in tracks_list:
+            track = self.build_track(track_info)
+            self.tm.perform_add_track(track)
+            self.tm.lanes[-1].set_loading(True)
+            self.pending_tracks.append(track)
+
         self.loaded_count = 0
         self.tm.loading_started.emit()
         self.tm.loading_progress.emit(0, total_tracks)
         
-        for i, track_info in enumerate(tracks_list):
+        # Tracks that fit in the arrangement view decode first
+        visible_tracks = self.tm.visible_track_count()
+        
+        for i, (track, track_info) in enumerate(zip(self.pending_tracks, tracks_list)):
             file_path = track_info.get("file_path")
             
             if not os.path.exists(file_path):
                 print(f"File not found: {file_path}")
-                # Treat as loaded but empty/error
-                self.on_project_track_loaded(None, track_info, i, None)
+                # Keeps its placeholder, counts as done
+                self.on_project_track_loaded(None, track, None)
                 continue
                 
-            loader = TrackLoader(file_path, self.audio.sample_rate)
-            # Pass index 'i' to callback
-            loader.loaded.connect(lambda data, info=track_info, idx=i, l=loader: self.on_project_track_loaded(data, info, idx, l))
-            loader.failed.connect(lambda err, info=track_info, idx=i, l=loader: self.on_project_track_loaded(None, info, idx, l))
-            loader.start()
-            self.active_loaders.append(loader)
-
-    def on_project_track_loaded(self, loaded_track_data, track_info, track_index, loader):
-        if loader and loader in self.active_loaders:
-            self.active_loaders.remove(loader)
-            
-        # Store result
-        self.pending_tracks[track_index] = (loaded_track_data, track_info)
+            priority = 0 if i < visible_tracks else 1
+            job = self.tm.decode_pool.submit(file_path, self.audio.sample_rate, priority, group="project")
+            job.peaks.connect(lambda waveform, t=track: self.on_project_track_peaks(t, waveform))
+            job.loaded.connect(lambda data, t=track, j=job: self.on_project_track_loaded(data, t, j))
+            job.failed.connect(lambda err, t=track, j=job: self.on_project_track_loaded(None, t, j))
+            self.active_jobs.append(job)
+
+    def on_project_track_peaks(self, track, waveform):
+        # Lanes draw from the peak cache while the audio decodes
+        if track.waveform is not None: return
+        track.waveform = waveform
+        for clip in track.clips:
+            if clip.data is track.source_data:
+                clip.waveform = waveform
+        if track in self.audio.tracks:
+            self.tm.refresh_lane(self.audio.tracks.index(track))
+
+    def on_project_track_loaded(self, loaded_track_data, track, job):
+        if job and job in self.active_jobs:
+            self.active_jobs.remove(job)
+
+        if loaded_track_data is not None:
+            self.fill_track(track, loaded_track_data)
+        elif track in self.audio.tracks:
+            self.tm.lanes[self.audio.tracks.index(track)].set_loading(False)
+
         self.loaded_count += 1
-        
         total_tracks = len(self.pending_tracks)
         self.tm.loading_progress.emit(self.loaded_count, total_tracks)
         
         if self.loaded_count == total_tracks:
-            self.finalize_batch_load()
+            self.tm.loading_finished.emit()
+            self.pending_tracks = []
+            self.loaded_count = 0
 
-    def finalize_batch_load(self):
-        for i, item in enumerate(self.pending_tracks):
-            if item is None: continue
-            
-            loaded_track_data, track_info = item
-            
-            if loaded_track_data is None:
-                # Handle error case
-                dummy_data = np.zeros((1, 2), dtype='float32')
-                track = AudioTrackData(
-                    name=track_info.get("name", "Error Loading"),
-                    file_path=track_info.get("file_path"),
-                    data=dummy_data,
-                    sample_rate=self.audio.sample_rate
-                )
-            else:
-                track = loaded_track_data
-                track.name = track_info.get("name", track.name)
-
-            # Apply saved state
-            track.is_muted = track_info.get("is_muted", False)
-            track.is_soloed = track_info.get("is_soloed", False)
-            track.volume = track_info.get("volume", 1.0) 
-            track.pan = track_info.get("pan", 0.0)
-            track.color = track_info.get("color", "#4466aa") # Load saved color
-            track.fx_bypass = track_info.get("fx_bypass", False)
-            
-            # Restore Effects
-            effects_data = track_info.get("effects", [])
-            for fx_data in effects_data:
-                fx_type = fx_data.get("type")
-                effect = self.create_effect(fx_type)
-                    
-                if effect:
-                    effect.active = fx_data.get("active", True)
-                    # Restore parameters
-                    for k, v in fx_data.get("parameters", {}).items():
-                        if k in effect.parameters:
-                            effect.parameters[k] = v
-                    track.effects.append(effect)
-
-            # Reconstruct Clips
-            track.clips = []
-            for clip_info in track_info.get("clips", []):
-                clip = AudioClip(
-                    data=track.source_data,
-                    start_time=clip_info.get("start_time", 0),
-                    start_offset=clip_info.get("start_offset", 0),
-                    duration=clip_info.get("duration", 0),
-                    name=clip_info.get("name", "Clip"),
-                    waveform=track.waveform
-                )
-                track.clips.append(clip)
-            
-            self.tm.perform_add_track(track)
-            
-        self.tm.loading_finished.emit()
-        self.pending_tracks = []
-        self.loaded_count = 0
+    def build_track(self, track_info):
+        # Track with the saved state and clips, audio still to come
+        file_path = track_info.get("file_path")
+        track = AudioTrackData(
+            name=track_info.get("name", os.path.basename(file_path or "Track")),
+            file_path=file_path,
+            data=np.zeros((0, 2), dtype='float32'),
+            sample_rate=self.audio.sample_rate
+        )
+        # Apply saved state
+        track.is_muted = track_info.get("is_muted", False)
+        track.is_soloed = track_info.get("is_soloed", False)
+        track.volume = track_info.get("volume", 1.0) 
+        track.pan = track_info.get("pan", 0.0)
+        track.color = track_info.get("color", "#4466aa") # Load saved color
+        track.fx_bypass = track_info.get("fx_bypass", False)
+        track.pipelined = track_info.get("pipelined", False)
+        
+        # Restore Effects
+        effects_data = track_info.get("effects", [])
+        for fx_data in effects_data:
+            fx_type = fx_data.get("type")
+            effect = self.create_effect(fx_type)
+                
+            if effect:
+                effect.active = fx_data.get("active", True)
+                # Restore parameters
+                for k, v in fx_data.get("parameters", {}).items():
+                    if k in effect.parameters:
+                        effect.parameters[k] = v
+                track.effects.append(effect)
+
+        # Reconstruct Clips
+        for clip_info in track_info.get("clips", []):
+            clip = AudioClip(
+                data=track.source_data,
+                start_time=clip_info.get("start_time", 0),
+                start_offset=clip_info.get("start_offset", 0),
+                duration=clip_info.get("duration", 0),
+                name=clip_info.get("name", "Clip"),
+                waveform=track.waveform
+            )
+            track.clips.append(clip)
+        return track
+
+    @traced("fill_track", "project")
+    def fill_track(self, track, loaded_track_data):
+        # Swap the decoded audio in for the placeholder. Clips split or
+        # duplicated in the meantime share the placeholder and are swapped too.
+        # Each assignment is a single reference store, the audio thread sees
+        # either the empty placeholder or the full array.
+        placeholder = track.source_data
+        track.source_data = loaded_track_data.source_data
+        track.waveform = loaded_track_data.waveform
+        resized = False
+        for clip in track.clips:
+            if clip.data is placeholder:
+                clip.waveform = track.waveform
+                clip.data = track.source_data
+                # The default clip of a track saved without clips was made
+                # from the empty placeholder, it spans the whole file
+                if clip.duration <= 0 and clip.start_offset == 0:
+                    clip.duration = len(track.source_data) / track.sample_rate
+                    resized = True
+
+        # The track may have been deleted meanwhile, an undo brings it back filled
+        if track in self.audio.tracks:
+            index = self.audio.tracks.index(track)
+            self.tm.refresh_lane(index)
+            self.tm.lanes[index].set_loading(False)
+            self.audio.on_source_loaded(track)
+            if resized:
+                self.tm.update_global_duration()
 
     def create_effect(self, fx_type):
-        if fx_type == "EQ3Band": return EQ3Band()
-        elif fx_type == "SimpleDelay": return SimpleDelay()
-        elif fx_type == "Distortion": return Distortion()
-        return None
+        return create_effect(fx_type)
@@ -0,0 +1,162 @@
+import os
+import time
+from functools import wraps
+from PySide6.QtCore import Qt, QTimer, QEvent
+from PySide6.QtWidgets import QLabel
+from core.tracing import tracer
+
+class PaintStats:
+    # Time spent in the instrumented paintEvents, only collected while the
+    # HUD is visible
+    def __init__(self):
+        self.enabled = False
+        self.totals = {} # name -> [seconds, paints]
+
+    def add(self, name, seconds):
+        entry = self.totals.get(name)
+        if entry is None:
+            self.totals[name] = [seconds, 1]
+        else:
+            entry[0] += seconds
+            entry[1] += 1
+
+    def take(self):
+        totals = self.totals
+        self.totals = {}
+        return totals
+
+paint_stats = PaintStats()
+
+def timed_paint(name):
+    def decorate(paint_event):
+        @wraps(paint_event)
+        def wrapper(self, event):
+            if not paint_stats.enabled and not tracer.enabled:
+                return paint_event(self, event)
+            start = time.perf_counter()
+            try:
+                return paint_event(self, event)
+            finally:
+                end = time.perf_counter()
+                if paint_stats.enabled:
+                    paint_stats.add(name, end - start)
+                if tracer.enabled:
+                    tracer.add("paint " + name, "ui", start, end)
+        return wrapper
+    return decorate
+
+def process_memory():
+    # Resident set size in bytes, None where it cannot be read cheaply
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, AttributeError):
+        pass
+    try:
+        import resource
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak if os.uname().sysname == "Darwin" else peak * 1024
+    except (ImportError, AttributeError):
+        return None
+
+class PerfHud(QLabel):
+    # Overlay in the top right corner of the window. Nothing runs while it
+    # is hidden: its timers stop and paint timing is switched off.
+    REFRESH_MS = 500
+    PROBE_MS = 50
+
+    def __init__(self, main_window):
+        super().__init__(main_window)
+        self.main_window = main_window
+        self.setAttribute(Qt.WA_TransparentForMouseEvents)
+        self.setTextFormat(Qt.PlainText)
+        self.setStyleSheet(
+            "background-color: rgba(0, 0, 0, 170); color: #cfe8cf; "
+            "font-family: monospace; font-size: 11px; padding: 6px; border-radius: 4px;"
+        )
+        self.hide()
+
+        self.refresh_timer = QTimer(self)
+        self.refresh_timer.setInterval(self.REFRESH_MS)
+        self.refresh_timer.timeout.connect(self.refresh)
+
+        # Event loop latency: how late a short periodic timer fires
+        self.probe_timer = QTimer(self)
+        self.probe_timer.setInterval(self.PROBE_MS)
+        self.probe_timer.setTimerType(Qt.PreciseTimer)
+        self.probe_timer.timeout.connect(self.on_probe)
+
+        self.last_refresh = 0.0
+        self.last_frames = 0
+        self.last_probe = 0.0
+        self.max_latency = 0.0
+
+        main_window.installEventFilter(self)
+
+    def set_visible(self, visible):
+        paint_stats.enabled = visible
+        paint_stats.take()
+        if visible:
+            self.last_refresh = time.perf_counter()
+            self.last_frames = self.main_window.ui_frames
+            self.last_probe = self.last_refresh
+            self.max_latency = 0.0
+            self.refresh_timer.start()
+            self.probe_timer.start()
+            self.setText("Performance HUD")
+            self.show()
+            self.reposition()
+            self.raise_()
+        else:
+            self.refresh_timer.stop()
+            self.probe_timer.stop()
+            self.hide()
+
+    def eventFilter(self, obj, event):
+        if event.type() == QEvent.Resize and self.isVisible():
+            self.reposition()
+        return False
+
+    def reposition(self):
+        self.adjustSize()
+        x = self.main_window.width() - self.width() - 12
+        ribbon = getattr(self.main_window, 'ribbon', None)
+        y = ribbon.mapTo(self.main_window, ribbon.rect().bottomLeft()).y() + 12 if ribbon else 12
+        self.move(max(0, x), y)
+
+    def on_probe(self):
+        now = time.perf_counter()
+        self.max_latency = max(self.max_latency, now - self.last_probe - self.PROBE_MS / 1000.0)
+        self.last_probe = now
+
+    def refresh(self):
+        now = time.perf_counter()
+        elapsed = max(now - self.last_refresh, 1e-6)
+        frames = self.main_window.ui_frames
+        fps = (frames - self.last_frames) / elapsed
+        self.last_refresh = now
+        self.last_frames = frames
+
+        audio = self.main_window.audio
+        lines = [
+            f"UI frames   {fps:6.1f} /s",
+            f"Loop lag    {max(self.max_latency, 0.0) * 1000:6.1f} ms max",
+        ]
+        self.max_latency = 0.0
+
+        totals = paint_stats.take()
+        for name in ("lanes", "ruler"):
+            seconds, paints = totals.get(name, (0.0, 0))
+            avg = seconds / paints * 1000 if paints else 0.0
+            lines.append(f"Paint {name:5s} {seconds / elapsed * 100:6.1f} %  ({paints} x {avg:.2f} ms)")
+
+        draft = " draft" if audio.draft_active else ""
+        lines.append(f"DSP load    {audio.dsp_load * 100:6.1f} %{draft}")
+        lines.append(f"Xruns       {getattr(audio, 'xruns', 0):6d}")
+
+        memory = process_memory()
+        if memory is not None:
+            lines.append(f"Memory      {memory / (1024 * 1024):6.1f} MB")
+
+        self.setText("\n".join(lines))
+        self.reposition()
@@ -1,6 +1,6 @@
 from PySide6.QtWidgets import QFrame, QHBoxLayout, QPushButton, QButtonGroup, QProgressBar, QLabel, QSpacerItem, QSizePolicy, QToolButton, QDialog, QColorDialog, QSpinBox, QCheckBox, QGridLayout, QMenu
 from PySide6.QtCore import Signal, QSize, Qt, QTimer, QEvent, QPointF
-from PySide6.QtGui import QIcon, QFontMetrics, QAction, QPixmap, QPainter, QPolygonF, QColor, QPen, QFontDatabase
+from PySide6.QtGui import QIcon, QFontMetrics, QAction, QActionGroup, QPixmap, QPainter, QPolygonF, QColor, QPen, QFontDatabase
 
 from ui.theme_manager import ThemeManager
 from ui.widgets.timeline_slider import TimelineSlider
@@ -87,6 +87,12 @@ class Ribbon(QFrame):
     tool_changed = Signal(str)
     
     playhead_seeked = Signal(float)
+    
+    draft_mode_changed = Signal(str) # "off", "auto", "on"
+    hud_toggled = Signal(bool)
+    trace_toggled = Signal(bool)
+    trace_save_requested = Signal()
+    profiler_toggled = Signal(bool)
 
     def __init__(self):
         super().__init__()
@@ -343,6 +349,47 @@ class Ribbon(QFrame):
         
         # RIGHT GROUP
         
+        # Performance
+        self.btn_perf = create_icon_btn("gauge", "Performance")
+        self.btn_perf.setFixedWidth(50)
+        perf_menu = QMenu(self.btn_perf)
+        
+        draft_menu = perf_menu.addMenu("Draft Playback")
+        self.draft_group = QActionGroup(self)
+        self.draft_actions = {}
+        for mode, label in (("off", "Off (Full Quality)"), ("auto", "Auto (By DSP Load)"), ("on", "Always On")):
+            action = QAction(label, self)
+            action.setCheckable(True)
+            action.triggered.connect(lambda checked=False, m=mode: self.draft_mode_changed.emit(m))
+            self.draft_group.addAction(action)
+            draft_menu.addAction(action)
+            self.draft_actions[mode] = action
+        
+        perf_menu.addSeparator()
+        self.action_hud = QAction("Performance HUD", self)
+        self.action_hud.setCheckable(True)
+        self.action_hud.setShortcut("F12")
+        self.action_hud.toggled.connect(self.hud_toggled.emit)
+        perf_menu.addAction(self.action_hud)
+        
+        self.action_trace = QAction("Record Trace", self)
+        self.action_trace.setCheckable(True)
+        self.action_trace.toggled.connect(self.trace_toggled.emit)
+        perf_menu.addAction(self.action_trace)
+        
+        action_save_trace = QAction("Save Trace...", self)
+        action_save_trace.triggered.connect(self.trace_save_requested.emit)
+        perf_menu.addAction(action_save_trace)
+        
+        perf_menu.addSeparator()
+        self.action_profiler = QAction("Profile Audio Thread", self)
+        self.action_profiler.setCheckable(True)
+        self.action_profiler.toggled.connect(self.profiler_toggled.emit)
+        perf_menu.addAction(self.action_profiler)
+        
+        self.btn_perf.setMenu(perf_menu)
+        right_layout.addWidget(self.btn_perf)
+        
         # Stereo Meter
         self.meter = StereoMeter()
         self.meter.setToolTip("Master Output Levels")
@@ -390,6 +437,8 @@ class Ribbon(QFrame):
         self.btn_stop.setIcon(self.load_icon("stop", theme_name))
         self.btn_loop.setIcon(self.load_icon("loop", theme_name))
         self.btn_snap.setIcon(self.load_icon("magnet", theme_name))
+        draft_color = "#ddaa33" if self.btn_perf.property("draft_active") else None
+        self.btn_perf.setIcon(self.load_icon("gauge", theme_name, color_override=draft_color))
         
         # Play/Pause needs logic check
         is_playing = self.btn_play.toolTip().startswith("Pause")
@@ -448,6 +497,17 @@ class Ribbon(QFrame):
             self.btn_play.setIcon(self.load_icon("play"))
             self.btn_play.setToolTip("Play (Space)")
 
+    def set_draft_mode(self, mode):
+        action = self.draft_actions.get(mode)
+        if action: action.setChecked(True)
+
+    def set_draft_active(self, active):
+        if self.btn_perf.property("draft_active") == active: return
+        self.btn_perf.setProperty("draft_active", active)
+        color = "#ddaa33" if active else None
+        self.btn_perf.setIcon(self.load_icon("gauge", color_override=color))
+        self.btn_perf.setToolTip("Performance (Draft playback active)" if active else "Performance")
+
     def update_undo_redo_state(self, can_undo, can_redo):
         self.btn_undo.setEnabled(can_undo)
         self.btn_redo.setEnabled(can_redo)
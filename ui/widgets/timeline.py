@@ -1,12 +1,14 @@
-from PySide6.QtCore import Signal, Qt, QPointF
+from PySide6.QtCore import Signal, Qt, QPointF, QRectF
 from PySide6.QtGui import QColor, QPainter, QPen
 from PySide6.QtWidgets import QWidget
+from ui.widgets.perf_hud import timed_paint
 
 class TimelineRuler(QWidget):
     position_changed = Signal(int)
     zoom_request = Signal(float, object) # delta, global_pos
     drag_started = Signal()
     drag_finished = Signal()
+    loop_region_selected = Signal(float, float) # start_x, end_x
 
     def __init__(self):
         super().__init__()
@@ -18,6 +20,12 @@ class TimelineRuler(QWidget):
         self.duration = 60
         self.bpm = 120
         self.is_dragging = False
+        
+        # Loop Region (seconds)
+        self.loop_region = None
+        self.loop_enabled = False
+        self.loop_drag_start_x = None
+        self.loop_drag_x = None
 
     def set_playhead(self, x):
         self.playhead_x = x
@@ -27,6 +35,14 @@ class TimelineRuler(QWidget):
         self.cursor_x = x
         self.update()
 
+    def set_loop_region(self, region):
+        self.loop_region = region
+        self.update()
+
+    def set_loop_enabled(self, enabled):
+        self.loop_enabled = enabled
+        self.update()
+
     def set_zoom(self, px_per_sec):
         self.pixels_per_second = px_per_sec
         self.update_width()
@@ -52,24 +68,52 @@ class TimelineRuler(QWidget):
             self.drag_started.emit()
             x = max(0, event.pos().x())
             self.position_changed.emit(x)
+        elif event.button() == Qt.RightButton:
+            # Right-drag selects the loop region
+            self.loop_drag_start_x = max(0, event.pos().x())
+            self.loop_drag_x = self.loop_drag_start_x
+            self.update()
 
     def mouseMoveEvent(self, event):
         if event.buttons() & Qt.LeftButton:
             x = max(0, event.pos().x())
             self.position_changed.emit(x)
+        elif event.buttons() & Qt.RightButton and self.loop_drag_start_x is not None:
+            self.loop_drag_x = max(0, event.pos().x())
+            self.update()
 
     def mouseReleaseEvent(self, event):
         if event.button() == Qt.LeftButton:
             self.is_dragging = False
             self.drag_finished.emit()
+        elif event.button() == Qt.RightButton and self.loop_drag_start_x is not None:
+            start_x = min(self.loop_drag_start_x, self.loop_drag_x)
+            end_x = max(self.loop_drag_start_x, self.loop_drag_x)
+            self.loop_drag_start_x = None
+            self.loop_drag_x = None
+            self.loop_region_selected.emit(float(start_x), float(end_x)) # Click without drag clears
+            self.update()
 
     def set_bpm(self, bpm):
         self.bpm = bpm
         self.update()
 
+    @timed_paint("ruler")
     def paintEvent(self, event):
         painter = QPainter(self)
         painter.setRenderHint(QPainter.Antialiasing)
+        
+        # Draw Loop Region
+        loop_rect = None
+        if self.loop_drag_start_x is not None:
+            loop_rect = (min(self.loop_drag_start_x, self.loop_drag_x), max(self.loop_drag_start_x, self.loop_drag_x))
+        elif self.loop_region is not None:
+            loop_rect = (self.loop_region[0] * self.pixels_per_second, self.loop_region[1] * self.pixels_per_second)
+        
+        if loop_rect is not None:
+            loop_color = QColor(68, 170, 102, 90 if self.loop_enabled else 35)
+            painter.fillRect(QRectF(loop_rect[0], 0, loop_rect[1] - loop_rect[0], self.height()), loop_color)
+        
         painter.setPen(QColor(150, 150, 150))
         
         # Calculations
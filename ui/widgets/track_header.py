@@ -1,6 +1,7 @@
 from PySide6.QtCore import Qt, Signal
 from PySide6.QtWidgets import QFrame, QLabel, QPushButton, QHBoxLayout, QGridLayout, QWidget, QSizePolicy, QMenu, QDial
 from ui.widgets.slider import ModernSlider
+from ui.widgets.track_lane import TRACK_HEIGHT
 from PySide6.QtGui import QAction, QColor
 
 class ColorStrip(QFrame):
@@ -70,7 +71,7 @@ class TrackHeader(QFrame):
     def __init__(self, name, color_hex):
         super().__init__()
         self.setObjectName("TrackHeader")
-        self.setFixedHeight(80)
+        self.setFixedHeight(TRACK_HEIGHT)
         self.setMinimumWidth(0)
         self.setSizePolicy(QSizePolicy.Expanding, QSizePolicy.Fixed)
         self.is_muted = False
@@ -100,6 +101,12 @@ class TrackHeader(QFrame):
         self.lbl_name.setObjectName("TrackNameLabel")
         self.lbl_name.setSizePolicy(QSizePolicy.Ignored, QSizePolicy.Preferred)
         
+        # CPU load of the effect chain, empty while nothing is measured
+        self.lbl_cpu = QLabel("")
+        self.lbl_cpu.setObjectName("TrackCpuLabel")
+        self.lbl_cpu.setStyleSheet("color: #888; font-size: 10px;")
+        self.lbl_cpu.setToolTip("Effect chain CPU")
+        
         # Buttons Container
         btn_container = QWidget()
         btn_layout = QHBoxLayout(btn_container)
@@ -172,6 +179,7 @@ class TrackHeader(QFrame):
 
         # Layout widgets in Grid
         grid.addWidget(self.lbl_name, 0, 0)
+        grid.addWidget(self.lbl_cpu, 0, 0, Qt.AlignRight)
         grid.addWidget(btn_container, 1, 0)
 
     def toggle_mute_visual(self):
@@ -266,4 +274,7 @@ class TrackHeader(QFrame):
             self.btn_fx.setProperty("active_fx", False)
         
         self.btn_fx.style().unpolish(self.btn_fx)
-        self.btn_fx.style().polish(self.btn_fx)
\ No newline at end of file
+        self.btn_fx.style().polish(self.btn_fx)
+
+    def set_cpu_load(self, load):
+        self.lbl_cpu.setText("" if load is None else f"{load * 100:.1f}%")
@@ -3,6 +3,10 @@ from PySide6.QtGui import QColor, QPainter, QPen, QBrush, QPolygonF, QPalette, Q
 import numpy as np
 import os
 from PySide6.QtWidgets import QFrame, QApplication
+from ui.widgets.perf_hud import timed_paint
+from core.peaks import column_peaks, sample_peaks
+
+TRACK_HEIGHT = 80 # Fixed height of a lane and its header
 
 class TrackLane(QFrame):
     clip_moved = Signal(int, float, float) 
@@ -16,7 +20,7 @@ class TrackLane(QFrame):
     def __init__(self):
         super().__init__()
         self.setObjectName("TrackLane")
-        self.setFixedHeight(80)
+        self.setFixedHeight(TRACK_HEIGHT)
         self.setMinimumWidth(3000)
         self.clips = [] 
         self.playhead_x = 0
@@ -40,6 +44,7 @@ class TrackLane(QFrame):
         self.setFocusPolicy(Qt.StrongFocus)
         self.active_tool = "MOVE"
         self.selected_clip_index = -1
+        self.loading = False # Audio still decoding, clips are placeholders
 
     def set_selection(self, index):
         self.selected_clip_index = index
@@ -53,6 +58,10 @@ class TrackLane(QFrame):
         snap_interval = beat_duration / 4.0 # 1/4 beat
         return round(time / snap_interval) * snap_interval
 
+    def set_loading(self, loading):
+        self.loading = loading
+        self.update()
+
     def set_tool(self, tool_name):
         self.active_tool = tool_name
         self.update()
@@ -323,6 +332,7 @@ class TrackLane(QFrame):
                 self.dragging_clip_index = -1
                 self.drag_mode = None
 
+    @timed_paint("lanes")
     def paintEvent(self, event):
         painter = QPainter(self)
         painter.setRenderHint(QPainter.Antialiasing)
@@ -363,8 +373,10 @@ class TrackLane(QFrame):
                 stroke_color = QColor(wave_color)
                 stroke_color.setAlpha(255)
 
+                rms_color = QColor(wave_color)
+                rms_color.setAlpha(170)
+
                 waveform = clip['waveform']
-                original_sps = 100 
 
                 # View Culling: Determine visible range
                 view_min_x = event.rect().left()
@@ -379,46 +391,38 @@ class TrackLane(QFrame):
                 if draw_start_x < draw_end_x:
                      points_top = []
                      points_bottom = []
-                     if clip.get('waveform') is not None:
-                         waveform = clip['waveform']
-                         
-                         clip_offset = clip['start_offset']
-                         
-                         step = 2
-                         delta = int(draw_start_x - start_x)
-                         k = (delta + step - 1) // step if delta > 0 else 0 
-                         aligned_start_x = int(start_x + k * step)
-                         
-                         for x_screen in range(aligned_start_x, int(draw_end_x), step): 
-                             t = (x_screen - start_x) / self.pixels_per_second + clip_offset
-                             wf_idx = int(t * original_sps)
-                             
-                             if 0 <= wf_idx < len(waveform):
-                                 val = float(waveform[wf_idx])
-                                 
-                                 # Top 
-                                 y_top = mid_y - (val * 35)
-                                 points_top.append(QPointF(x_screen, y_top))
-                                 
-                                 # Bottom
-                                 y_bottom = mid_y + (val * 35)
-                                 points_bottom.append(QPointF(x_screen, y_bottom))
+                     points_rms_top = []
+                     points_rms_bottom = []
+                     clip_offset = clip['start_offset']
+                     
+                     step = 2
+                     delta = int(draw_start_x - start_x)
+                     k = (delta + step - 1) // step if delta > 0 else 0 
+                     aligned_start_x = int(start_x + k * step)
+                     
+                     xs = np.arange(aligned_start_x, int(draw_end_x), step)
+                     peaks, edges = self._column_level(clip, xs, step, start_x, clip_offset)
+                     if peaks is not None:
+                         count = int(np.searchsorted(edges[:-1], len(peaks)))
+                         if count > 0:
+                             xs = xs[:count].tolist()
+                             # Top is the column maximum, bottom the minimum
+                             mins, maxs, rms = column_peaks(peaks, edges[:count + 1])
+                             points_top = [QPointF(x, mid_y - v * 35) for x, v in zip(xs, maxs.tolist())]
+                             points_bottom = [QPointF(x, mid_y - v * 35) for x, v in zip(xs, mins.tolist())]
+                             if rms is not None:
+                                 points_rms_top = [QPointF(x, mid_y - v * 35) for x, v in zip(xs, rms.tolist())]
+                                 points_rms_bottom = [QPointF(x, mid_y + v * 35) for x, v in zip(xs, rms.tolist())]
 
                      if points_top and points_bottom:
-                         # Create Polygon for Fill
-
-                         fill_poly = QPolygonF()
-                         for p in points_top:
-                             fill_poly.append(p)
-                         for p in reversed(points_bottom):
-                             fill_poly.append(p)
-                         
-                         # Close the loop
-                         fill_poly.append(points_top[0])
-
                          painter.setBrush(QBrush(fill_color))
                          painter.setPen(Qt.NoPen)
-                         painter.drawPolygon(fill_poly)
+                         painter.drawPolygon(self._band_polygon(points_top, points_bottom))
+
+                         # Denser band for the RMS level inside the peaks
+                         if points_rms_top:
+                             painter.setBrush(QBrush(rms_color))
+                             painter.drawPolygon(self._band_polygon(points_rms_top, points_rms_bottom))
 
                          # Draw Strokes (Outline)
                          painter.setBrush(Qt.NoBrush)
@@ -429,6 +433,8 @@ class TrackLane(QFrame):
             # Draw Clip Name Overlay
             painter.setPen(palette.color(QPalette.Text))
             display_name = os.path.basename(clip['name'])
+            if self.loading:
+                display_name += "  (loading...)"
             painter.drawText(clip_rect.adjusted(5, 5, 0, 0), Qt.AlignLeft | Qt.AlignTop, display_name)
 
         # Draw Playhead
@@ -437,6 +443,31 @@ class TrackLane(QFrame):
         
         painter.drawLine(QPointF(self.playhead_x, 0), QPointF(self.playhead_x, self.height()))
 
+    def _column_level(self, clip, xs, step, start_x, clip_offset):
+        # Pyramid level with about one bucket per column, and the first
+        # bucket of every column in it (plus the end of the last)
+        if len(xs) == 0:
+            return None, None
+        times = (np.append(xs, xs[-1] + step) - start_x) / self.pixels_per_second + clip_offset
+        peaks = clip['waveform'].level_for(self.pixels_per_second / step)
+        if peaks is not None:
+            return peaks, np.floor(times * peaks.rate).astype(np.int64)
+
+        # Zoomed in past the finest level, reduce the samples themselves
+        data = clip['data']
+        if data is None:
+            return None, None
+        positions = np.floor(times * clip['sample_rate']).astype(np.int64)
+        first = int(positions[0])
+        last = min(int(positions[-1]) + 1, len(data))
+        if first >= last:
+            return None, None
+        return sample_peaks(data, clip['sample_rate'], first, last), positions - first
+
+    def _band_polygon(self, points_top, points_bottom):
+        # Closed outline: along the top, back along the bottom
+        return QPolygonF(points_top + points_bottom[::-1] + points_top[:1])
+
     def contextMenuEvent(self, event):
         pass
 